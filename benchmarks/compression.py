@@ -0,0 +1,95 @@
+# Compares how fast the zlib-stream and zstd-stream transport compressions decode gateway traffic.
+#
+# Record traffic by dumping every raw gateway payload as one JSON object per line, then run:
+#     python benchmarks/compression.py recorded.jsonl
+# Without a file, a synthetic GUILD_CREATE/MESSAGE_CREATE mix is used instead.
+
+import argparse
+import json
+import time
+import zlib
+from typing import List
+
+from wharf.compression import HAS_ZSTD, ZlibStreamDecompressor, ZstdStreamDecompressor
+
+
+def synthetic_traffic(count: int = 2000) -> List[bytes]:
+    payloads = []
+
+    for i in range(count):
+        if i % 20 == 0:
+            d = {
+                "id": str(10**17 + i),
+                "name": f"guild {i}",
+                "channels": [{"id": str(10**17 + i * 100 + c), "name": f"channel-{c}", "type": 0} for c in range(50)],
+                "members": [
+                    {"user": {"id": str(10**17 + m), "username": f"user{m}", "discriminator": "0001"}, "roles": []}
+                    for m in range(200)
+                ],
+            }
+            t = "GUILD_CREATE"
+        else:
+            d = {"id": str(10**18 + i), "content": "hello " * 10, "author": {"id": str(10**17 + i % 300)}}
+            t = "MESSAGE_CREATE"
+
+        payloads.append(json.dumps({"op": 0, "s": i, "t": t, "d": d}).encode())
+
+    return payloads
+
+
+def zlib_frames(payloads: List[bytes]) -> List[bytes]:
+    compressor = zlib.compressobj()
+    return [compressor.compress(p) + compressor.flush(zlib.Z_SYNC_FLUSH) for p in payloads]
+
+
+def zstd_frames(payloads: List[bytes]) -> List[bytes]:
+    import zstandard
+
+    compressor = zstandard.ZstdCompressor().compressobj()
+    return [compressor.compress(p) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK) for p in payloads]
+
+
+def bench(name: str, frames: List[bytes], decompressor_cls, raw_size: int, rounds: int):
+    best = float("inf")
+
+    for _ in range(rounds):
+        decompressor = decompressor_cls()
+        start = time.perf_counter()
+
+        for frame in frames:
+            decompressor.decompress(frame)
+
+        best = min(best, time.perf_counter() - start)
+
+    wire_size = sum(len(f) for f in frames)
+    print(
+        f"{name:<12} {wire_size / raw_size:6.1%} of raw size  "
+        f"{best * 1000:8.2f} ms  {raw_size / best / 1024 / 1024:8.1f} MiB/s decoded"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("recording", nargs="?", help="A file with one gateway payload per line")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.recording:
+        with open(args.recording, "rb") as f:
+            payloads = [line.rstrip(b"\n") for line in f if line.strip()]
+    else:
+        payloads = synthetic_traffic()
+
+    raw_size = sum(len(p) for p in payloads)
+    print(f"{len(payloads)} payloads, {raw_size / 1024 / 1024:.1f} MiB raw")
+
+    bench("zlib-stream", zlib_frames(payloads), ZlibStreamDecompressor, raw_size, args.rounds)
+
+    if HAS_ZSTD:
+        bench("zstd-stream", zstd_frames(payloads), ZstdStreamDecompressor, raw_size, args.rounds)
+    else:
+        print("zstd-stream  skipped, zstandard is not installed")
+
+
+if __name__ == "__main__":
+    main()
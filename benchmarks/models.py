@@ -0,0 +1,131 @@
+# Measures how much memory every cached model takes per object, with and without keeping raw payloads.
+#
+#     python benchmarks/models.py --count 20000
+#
+# Payloads are made fresh for every object and dropped right after, so without keep_payloads only what the
+# model itself holds on to is counted.
+
+import argparse
+import tracemalloc
+from typing import Any, Callable, Dict
+
+from wharf.impl import Guild, Member, Message, Role, TextChannel, User
+from wharf.impl.cache import Cache
+
+
+def user_payload(i: int) -> Dict[str, Any]:
+    return {
+        "id": str(10**17 + i),
+        "username": f"user{i}",
+        "discriminator": f"{i % 10000:04}",
+        "avatar": "a" * 32,
+        "avatar_decoration": None,
+        "public_flags": 0,
+        "bot": False,
+    }
+
+
+def guild_payload(i: int) -> Dict[str, Any]:
+    return {"id": str(10**17 + i), "name": f"guild {i}", "icon": "b" * 32, "banner": None, "owner_id": "1"}
+
+
+PAYLOADS: Dict[str, Callable[[int], Dict[str, Any]]] = {
+    "User": user_payload,
+    "Member": lambda i: {
+        "user": user_payload(i),
+        "nick": None,
+        "avatar": None,
+        "roles": [str(10**17 + r) for r in range(3)],
+        "joined_at": "2022-01-01T00:00:00.000000+00:00",
+        "deaf": False,
+        "mute": False,
+    },
+    # The same users again and again, like a bot whose members share a lot of guilds
+    "Member (shared users)": lambda i: {
+        "user": user_payload(i % 100),
+        "nick": None,
+        "avatar": None,
+        "roles": [str(10**17 + r) for r in range(3)],
+        "joined_at": "2022-01-01T00:00:00.000000+00:00",
+    },
+    "Guild": guild_payload,
+    "TextChannel": lambda i: {
+        "id": str(10**17 + i),
+        "type": 0,
+        "guild_id": "1",
+        "name": f"channel-{i}",
+        "topic": None,
+        "position": i,
+        "parent_id": None,
+        "nsfw": False,
+        "permission_overwrites": [],
+        "rate_limit_per_user": 0,
+    },
+    "Role": lambda i: {
+        "id": str(10**17 + i),
+        "name": f"role {i}",
+        "color": 0,
+        "hoist": False,
+        "position": i,
+        "permissions": "0",
+        "managed": False,
+        "mentionable": False,
+    },
+    "Message": lambda i: {
+        "id": str(10**18 + i),
+        "channel_id": "1",
+        "guild_id": "1",
+        "author": user_payload(i),
+        "content": "hello " * 10,
+        "timestamp": "2022-01-01T00:00:00.000000+00:00",
+        "embeds": [],
+        "attachments": [],
+        "mentions": [],
+    },
+}
+
+
+def build(name: str, payload: Dict[str, Any], cache: Cache, guild: Guild):
+    if name == "User":
+        return User(payload, cache)
+    if name.startswith("Member"):
+        return Member(payload, guild.id, cache)
+    if name == "Guild":
+        return Guild(payload, cache)
+    if name == "TextChannel":
+        return TextChannel(payload, cache)
+    if name == "Role":
+        return Role(payload, cache)
+    return Message(payload, cache)  # type: ignore
+
+
+def measure(name: str, count: int, keep_payloads: bool) -> float:
+    cache = Cache(None, keep_payloads=keep_payloads)  # type: ignore
+    guild = Guild(guild_payload(0), cache)
+    make_payload = PAYLOADS[name]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    objects = [build(name, make_payload(i), cache, guild) for i in range(count)]
+
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del objects
+    return (after - before) / count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'model':<22} {'bytes/object':>14} {'keep_payloads':>15}")
+
+    for name in PAYLOADS:
+        print(f"{name:<22} {measure(name, args.count, False):14.0f} {measure(name, args.count, True):15.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import wharf
 
-client = wharf.Bot(token="SomeToken", intents=wharf.Intents.all())
+# Intents are worked out from the listeners, reading message content has to be asked for on top of that
+client = wharf.Bot(token="SomeToken", intents=wharf.Intents.auto(message_content=True))
 
 
 @client.listen("ready")
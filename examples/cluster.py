@@ -0,0 +1,29 @@
+# In this example, ill show how you can spread your shards over multiple processes with wharf.ClusterLauncher!
+
+import wharf
+
+
+# The launcher calls this function inside every process it spawns, so it has to be defined at the module level
+def make_bot(shard_ids, shard_count):
+    bot = wharf.Bot(token="SomeToken", intents=wharf.Intents.default(), shard_ids=shard_ids, shard_count=shard_count)
+
+    @bot.listen("ready")
+    async def ready():
+        # Every cluster can ask the other clusters questions through bot.cluster
+        guild_counts = await bot.cluster.query("guild_count")
+        print(f"Cluster {bot.cluster.cluster_id} is ready! other clusters have {sum(guild_counts)} guilds")
+
+    async def guild_count(_):
+        return len(bot.cache.guilds)
+
+    async def pre_ready():
+        bot.cluster.add_query_handler("guild_count", guild_count)
+
+    bot.pre_ready = pre_ready
+
+    return bot
+
+
+if __name__ == "__main__":  # Needed since the clusters are spawned as new processes
+    launcher = wharf.ClusterLauncher(make_bot, token="SomeToken")  # Defaults to one cluster per CPU core
+    launcher.run()
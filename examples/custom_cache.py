@@ -16,7 +16,7 @@ class MyCache(wharf.impl.Cache):  # Then now you can create your subclass of ``w
 
 # Now you can actually start defining your bot!
 bot = wharf.Bot(
-    token="SomeToken", intents=wharf.Intents.all(), cache=MyCache
+    token="SomeToken", intents="auto", cache=MyCache
 )  # You dont have to initalize the cache here as this is already done internally!
 
 
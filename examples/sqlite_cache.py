@@ -0,0 +1,16 @@
+# In this example, ill show how you can keep the cache in an SQLite database instead of in memory!
+
+import wharf
+
+# Users, guilds, members, channels and roles all go in this file instead of taking up memory
+# Queries run right on the event loop, so keep the file on a local disk
+bot = wharf.Bot(token="SomeToken", intents="auto", cache_storage=wharf.impl.SQLiteBackend("cache.db"))
+
+
+@bot.listen("guild_create")
+async def guild_create(guild: wharf.impl.Guild):
+    # Models are made from the database whenever you ask for them, so changing one doesn't change the cache
+    print(f"{guild.name} has {len(guild.members)} cached members")
+
+
+bot.run()
@@ -20,5 +20,6 @@ setup(
     license="MIT",
     description="An minimal discord api wrapper that allows you to do what you want to do",
     install_requires=requirements,
+    extras_require={"speed": ["orjson", "zstandard"], "etf": ["earl-etf"]},
     python_requires=">=3.8.0",
 )
@@ -0,0 +1,50 @@
+from wharf.impl import LRUPolicy, NeverCache
+from wharf.impl.cache import Cache
+
+
+def user(user_id: int, name: str = "user"):
+    return {"id": str(user_id), "username": name, "discriminator": "0001", "avatar": None}
+
+
+def test_members_share_their_user():
+    cache = Cache(None)  # type: ignore
+
+    for guild_id in (1, 2):
+        cache.add_guild({"id": str(guild_id)})
+        cache.add_member(guild_id, {"user": user(5), "roles": []})
+
+    cache.update_user(user(5, "renamed"))
+
+    assert cache.get_member(1, 5).user is cache.get_member(2, 5).user
+    assert cache.get_member(2, 5).name == "renamed"
+
+
+def test_evicted_users_stay_shared():
+    cache = Cache(None, policies={"users": LRUPolicy(1)})  # type: ignore
+    cache.add_guild({"id": "1"})
+    cache.add_member(1, {"user": user(5), "roles": []})
+    cache.add_member(1, {"user": user(6), "roles": []})
+
+    # User 5 got evicted by user 6, updating it has to reach the member that still points to it
+    assert cache.get_user(5) is None
+
+    cache.update_user(user(5, "renamed"))
+
+    assert cache.get_member(1, 5).name == "renamed"
+    assert cache.get_user(5) is cache.get_member(1, 5).user
+
+
+def test_members_without_their_guild():
+    cache = Cache(None, policies={"guilds": NeverCache()})  # type: ignore
+    cache.add_guild({"id": "1"})
+
+    assert cache.get_guild(1) is None
+
+    member = cache.add_member(1, {"user": user(5), "roles": []})
+    chunk = cache.add_members(1, [{"user": user(6), "roles": []}])
+    updated = cache.update_member(1, {"user": user(7), "roles": []})
+
+    assert member.guild_id == 1 and member.guild is None
+    assert [member.id for member in chunk] == [6]
+    assert updated is not None
+    assert sorted(member.id for member in cache.get_members(1)) == [5, 6, 7]
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from wharf.coalesce import Batch, Coalescer, KeepLatest
+from wharf.dispatcher import Dispatcher
+from wharf.filters import ListenerFilter
+from wharf.impl.cache import Cache
+
+
+def _collect(emitted):
+    return lambda *args: emitted.append(args)
+
+
+def test_keep_latest_keeps_newest_per_key():
+    async def main():
+        emitted = []
+        policy = KeepLatest(key="user_id", window=10)
+        policy._bind(_collect(emitted))
+
+        for i in range(5):
+            policy.add(({"user_id": i % 2, "n": i},))
+
+        policy.cancel()
+        policy.flush()
+
+        assert sorted(args[0]["n"] for args in emitted) == [3, 4]
+
+    asyncio.run(main())
+
+
+def test_batch_flushes_at_max_size():
+    async def main():
+        emitted = []
+        policy = Batch(interval=10, max_size=3)
+        policy._bind(_collect(emitted))
+
+        for i in range(7):
+            policy.add((i,))
+
+        assert emitted == [([0, 1, 2],), ([3, 4, 5],)]
+
+        policy.cancel()
+        policy.flush()
+
+        assert emitted[-1] == ([6],)
+
+    asyncio.run(main())
+
+
+def test_filtered_listeners_only_get_their_events():
+    async def main():
+        dispatcher = Dispatcher(Cache(None))  # type: ignore
+        filtered = []
+        unfiltered = []
+
+        async def on_filtered(events):
+            filtered.extend(events)
+
+        async def on_unfiltered(events):
+            unfiltered.extend(events)
+
+        dispatcher.add_callback("typing_start", on_filtered, filter=ListenerFilter(guild_id=1))
+        dispatcher.add_callback("typing_start", on_unfiltered)
+        dispatcher.coalesce("typing_start", Batch(interval=0.01))
+
+        for guild_id in ("1", "2", "3", "1"):
+            dispatcher.handle_event("TYPING_START", {"guild_id": guild_id, "user_id": "5"})
+
+        await asyncio.sleep(0.05)
+
+        assert [event["guild_id"] for event in filtered] == ["1", "1"]
+        assert len(unfiltered) == 4
+
+        await dispatcher.close()
+
+    asyncio.run(main())
+
+
+def test_coalescer_is_abstract():
+    with pytest.raises(TypeError):
+        Coalescer()  # type: ignore
@@ -0,0 +1,55 @@
+import json
+import zlib
+
+import pytest
+
+from wharf.compression import ZLIB_SUFFIX, ZlibStreamDecompressor, ZstdStreamDecompressor
+
+
+def zlib_stream(*messages: bytes):
+    """Compresses messages the way discord does, one shared stream flushed after every message."""
+    compressor = zlib.compressobj()
+    return [compressor.compress(message) + compressor.flush(zlib.Z_SYNC_FLUSH) for message in messages]
+
+
+MESSAGES = [json.dumps({"op": 0, "s": i, "d": {"content": "hello " * i}}).encode() for i in range(1, 4)]
+
+
+def test_zstd_partial_frame_is_none():
+    zstandard = pytest.importorskip("zstandard")
+    compressor = zstandard.ZstdCompressor().compressobj()
+    frames = [compressor.compress(message) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK) for message in MESSAGES]
+
+    decompressor = ZstdStreamDecompressor()
+
+    # Same as zlib-stream, None until a whole message is there
+    assert decompressor.decompress(frames[0][:4]) is None
+    assert decompressor.decompress(frames[0][4:]) == MESSAGES[0]
+    assert [decompressor.decompress(frame) for frame in frames[1:]] == MESSAGES[1:]
+
+
+def test_zlib_whole_frames():
+    decompressor = ZlibStreamDecompressor()
+
+    assert [decompressor.decompress(frame) for frame in zlib_stream(*MESSAGES)] == MESSAGES
+
+
+def test_zlib_frame_split_across_messages():
+    decompressor = ZlibStreamDecompressor()
+    first, second = zlib_stream(MESSAGES[0], MESSAGES[1])
+
+    assert decompressor.decompress(first[:5]) is None
+    assert decompressor.decompress(first[5:-2]) is None
+    assert decompressor.decompress(first[-2:]) == MESSAGES[0]
+    # The buffer is emptied again, the next message decodes on its own
+    assert decompressor.decompress(second) == MESSAGES[1]
+
+
+def test_zlib_waits_for_the_sync_flush_suffix():
+    decompressor = ZlibStreamDecompressor()
+    (frame,) = zlib_stream(MESSAGES[2])
+
+    assert frame.endswith(ZLIB_SUFFIX)
+    # Everything but the suffix is held back, even though it could be inflated already
+    assert decompressor.decompress(frame[:-4]) is None
+    assert decompressor.decompress(frame[-4:]) == MESSAGES[2]
@@ -0,0 +1,159 @@
+import asyncio
+
+from wharf.dispatcher import Dispatcher
+from wharf.enums import OverflowPolicy
+from wharf.impl.cache import Cache
+
+
+async def _read(dispatcher: Dispatcher, events):
+    """Feeds events like the gateway does, returns how many got read before the reader got stuck."""
+    read = 0
+
+    for name, data in events:
+        dispatcher.handle_event(name, data)
+        read += 1
+
+        try:
+            await asyncio.wait_for(dispatcher.wait_for_capacity(), 0.05)
+        except asyncio.TimeoutError:
+            break
+
+    return read
+
+
+def test_drop_events_never_blocks_on_droppable_events():
+    async def main():
+        release = asyncio.Event()
+        dispatcher = Dispatcher(
+            Cache(None),  # type: ignore
+            workers=1,
+            max_queue_size=3,
+            overflow=OverflowPolicy.drop_events,
+            droppable_events=["typing_start"],
+        )
+
+        async def on_typing(data):
+            await release.wait()
+
+        dispatcher.add_callback("typing_start", on_typing)
+
+        read = await _read(dispatcher, [("TYPING_START", {"guild_id": "1"})] * 50)
+
+        assert read == 50
+        # One job is running on the worker, three are queued and the rest were dropped
+        assert dispatcher.queue_depth == 3
+        assert dispatcher.dropped_events == 46
+
+        release.set()
+        await dispatcher.close()
+
+    asyncio.run(main())
+
+
+def test_drop_events_blocks_on_other_events():
+    async def main():
+        release = asyncio.Event()
+        dispatcher = Dispatcher(
+            Cache(None),  # type: ignore
+            workers=1,
+            max_queue_size=3,
+            overflow=OverflowPolicy.drop_events,
+            droppable_events=["typing_start"],
+        )
+
+        async def on_event(data):
+            await release.wait()
+
+        dispatcher.add_callback("presence_update", on_event)
+
+        read = await _read(dispatcher, [("PRESENCE_UPDATE", {"guild_id": "1"})] * 50)
+
+        assert read < 50
+        assert dispatcher.dropped_events == 0
+
+        release.set()
+        await dispatcher.wait_for_capacity()
+        await dispatcher.close()
+
+    asyncio.run(main())
+
+
+def test_close_while_lanes_drain():
+    async def main():
+        loop = asyncio.get_running_loop()
+        errors = []
+        loop.set_exception_handler(lambda loop, context: errors.append(context))
+
+        dispatcher = Dispatcher(Cache(None), ordered=True)  # type: ignore
+        calls = []
+
+        async def on_typing(data):
+            calls.append(data)
+            await asyncio.sleep(0.01)
+
+        dispatcher.add_callback("typing_start", on_typing)
+
+        for _ in range(3):
+            dispatcher.handle_event("TYPING_START", {"guild_id": "1"})
+
+        await asyncio.sleep(0)
+        await dispatcher.close()
+        await asyncio.sleep(0.05)
+
+        assert len(calls) == 1
+        assert not errors
+
+    asyncio.run(main())
+
+
+def test_default_mode_keeps_and_logs_tasks(caplog):
+    async def main():
+        dispatcher = Dispatcher(Cache(None))  # type: ignore
+        release = asyncio.Event()
+
+        async def waits(value):
+            await release.wait()
+
+        async def raises(value):
+            raise RuntimeError("boom")
+
+        dispatcher.add_callback("thing", waits)
+        dispatcher.add_callback("thing", raises)
+        dispatcher.dispatch("thing", 1)
+
+        await asyncio.sleep(0.01)
+
+        # The waiting callback is still held on to, the raising one is done and gone
+        assert len(dispatcher._tasks) == 1
+        assert "Task for 'thing' raised an exception" in caplog.text
+
+        release.set()
+        await asyncio.sleep(0.01)
+
+        assert not dispatcher._tasks
+
+        await dispatcher.close()
+
+    asyncio.run(main())
+
+
+def test_close_cancels_running_tasks():
+    async def main():
+        dispatcher = Dispatcher(Cache(None))  # type: ignore
+
+        async def forever(value):
+            await asyncio.Event().wait()
+
+        dispatcher.add_callback("thing", forever)
+        dispatcher.dispatch("thing", 1)
+
+        await asyncio.sleep(0.01)
+        (task,) = dispatcher._tasks
+
+        await dispatcher.close()
+        await asyncio.sleep(0.01)
+
+        assert task.cancelled()
+        assert not dispatcher._tasks
+
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+import struct
+
+import pytest
+
+from wharf.etf import ETFCodec
+
+pytest.importorskip("earl")
+
+
+def small_atom_utf8(name: str) -> bytes:
+    encoded = name.encode("utf-8")
+    return bytes((119, len(encoded))) + encoded
+
+
+def atom_utf8(name: str) -> bytes:
+    encoded = name.encode("utf-8")
+    return bytes((118,)) + struct.pack(">H", len(encoded)) + encoded
+
+
+def binary(value: str) -> bytes:
+    encoded = value.encode("utf-8")
+    return bytes((109,)) + struct.pack(">I", len(encoded)) + encoded
+
+
+def small_big(value: int) -> bytes:
+    digits = abs(value).to_bytes(8, "little")
+    return bytes((110, len(digits), 1 if value < 0 else 0)) + digits
+
+
+def etf_map(*items: bytes) -> bytes:
+    return bytes((116,)) + struct.pack(">I", len(items) // 2) + b"".join(items)
+
+
+def test_round_trip():
+    codec = ETFCodec()
+    payload = {
+        "op": 0,
+        "t": "GUILD_CREATE",
+        "d": {"id": 10**17, "name": "guild", "unavailable": False, "icon": None, "roles": [], "ratio": 0.5},
+    }
+
+    assert codec.loads(codec.dumps_bytes(payload)) == payload
+
+
+def test_loads_memoryview():
+    codec = ETFCodec()
+
+    assert codec.loads(memoryview(codec.dumps_bytes({"op": 11}))) == {"op": 11}
+
+
+def test_utf8_atoms():
+    # What OTP 26 and later send by default, atom keys and nil/true/false as UTF-8 atoms
+    frame = bytes((131,)) + etf_map(
+        small_atom_utf8("op"),
+        bytes((97, 0)),
+        small_atom_utf8("t"),
+        binary("MESSAGE_CREATE"),
+        small_atom_utf8("s"),
+        bytes((98,)) + struct.pack(">i", 70000),
+        small_atom_utf8("d"),
+        etf_map(
+            small_atom_utf8("id"),
+            small_big(1030000000000000001),
+            atom_utf8("guild_id"),
+            small_big(-5),
+            small_atom_utf8("content"),
+            binary("héllo"),
+            small_atom_utf8("nonce"),
+            small_atom_utf8("nil"),
+            small_atom_utf8("tts"),
+            small_atom_utf8("false"),
+            atom_utf8("pinned"),
+            atom_utf8("true"),
+            small_atom_utf8("embeds"),
+            bytes((106,)),
+            small_atom_utf8("mentions"),
+            bytes((108,)) + struct.pack(">I", 2) + binary("a") + bytes((97, 1)) + bytes((106,)),
+        ),
+    )
+
+    assert ETFCodec().loads(frame) == {
+        "op": 0,
+        "t": "MESSAGE_CREATE",
+        "s": 70000,
+        "d": {
+            "id": 1030000000000000001,
+            "guild_id": -5,
+            "content": "héllo",
+            "nonce": None,
+            "tts": False,
+            "pinned": True,
+            "embeds": [],
+            "mentions": ["a", 1],
+        },
+    }
+
+
+def test_latin1_atoms_and_small_big():
+    frame = bytes((131,)) + etf_map(
+        bytes((115, 2)) + b"op", small_big(10**17), bytes((100, 0, 4)) + b"true", bytes((97, 1))
+    )
+
+    assert ETFCodec().loads(frame) == {"op": 10**17, True: 1}
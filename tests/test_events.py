@@ -0,0 +1,146 @@
+import asyncio
+from typing import Any, Dict, List
+
+from wharf.dispatcher import Dispatcher
+from wharf.impl import Member, TextChannel, User
+from wharf.impl.cache import Cache
+
+
+def user(user_id: int, name: str = "user") -> Dict[str, Any]:
+    return {"id": str(user_id), "username": name, "discriminator": "0001", "avatar": None}
+
+
+def setup():
+    cache = Cache(None)  # type: ignore
+    cache.add_guild_payload(
+        {
+            "id": "1",
+            "name": "guild",
+            "roles": [{"id": "20", "name": "role", "permissions": "0", "position": 1}],
+            "channels": [{"id": "10", "type": 0, "name": "general", "position": 3, "topic": "hi"}],
+            "members": [{"user": user(5), "roles": ["20"], "nick": None}],
+        }
+    )
+
+    return cache, Dispatcher(cache)
+
+
+async def feed(events: Dispatcher, name: str, data: Dict[str, Any]) -> List[Any]:
+    """Runs one gateway event through the dispatcher and returns what its listener got."""
+    received: List[Any] = []
+
+    async def listener(*args):
+        received.extend(args)
+
+    events.add_callback(name.lower(), listener)
+    events.handle_event(name, data)
+    await asyncio.sleep(0)
+    events.events[name.lower()].remove(listener)
+
+    return received
+
+
+def test_channel_events():
+    async def main():
+        cache, events = setup()
+        cached = cache.get_channel(1, 10)
+
+        (updated,) = await feed(events, "CHANNEL_UPDATE", {"id": "10", "type": 0, "guild_id": "1", "name": "renamed"})
+
+        # Partial updates patch the cached channel and keep the fields they don't carry
+        assert updated is cached
+        assert cached.name == "renamed" and cached.position == 3 and cached.topic == "hi"
+
+        (created,) = await feed(events, "CHANNEL_CREATE", {"id": "11", "type": 0, "guild_id": "1", "name": "new"})
+        assert cache.get_channel(1, 11) is created
+
+        (deleted,) = await feed(events, "CHANNEL_DELETE", {"id": "10", "type": 0, "guild_id": "1"})
+        assert deleted is cached
+        assert cache.get_channel(1, 10) is None
+
+        # Deleting what isn't cached still dispatches a channel
+        (missing,) = await feed(events, "CHANNEL_DELETE", {"id": "99", "type": 0, "guild_id": "1", "name": "gone"})
+        assert isinstance(missing, TextChannel) and missing.id == 99
+
+    asyncio.run(main())
+
+
+def test_thread_events():
+    async def main():
+        cache, events = setup()
+        thread = {"id": "30", "type": 11, "guild_id": "1", "name": "thread", "parent_id": "10"}
+
+        (created,) = await feed(events, "THREAD_CREATE", thread)
+        assert cache.get_channel(1, 30) is created and created.parent_id == 10
+
+        (updated,) = await feed(events, "THREAD_UPDATE", {"id": "30", "type": 11, "guild_id": "1", "name": "renamed"})
+        assert updated is created and created.name == "renamed" and created.parent_id == 10
+
+        (deleted,) = await feed(events, "THREAD_DELETE", {"id": "30", "type": 11, "guild_id": "1", "parent_id": "10"})
+        assert deleted is created and cache.get_channel(1, 30) is None
+
+    asyncio.run(main())
+
+
+def test_role_events():
+    async def main():
+        cache, events = setup()
+        member = cache.get_member(1, 5)
+
+        (created,) = await feed(events, "GUILD_ROLE_CREATE", {"guild_id": "1", "role": {"id": "21", "name": "new"}})
+        assert cache.get_role(1, 21) is created
+
+        (updated,) = await feed(events, "GUILD_ROLE_UPDATE", {"guild_id": "1", "role": {"id": "20", "name": "renamed"}})
+        assert updated is cache.get_role(1, 20) and updated.name == "renamed" and updated.position == 1
+
+        (deleted,) = await feed(events, "GUILD_ROLE_DELETE", {"guild_id": "1", "role_id": "20"})
+        assert deleted is updated
+        assert cache.get_role(1, 20) is None and member.roles == []
+
+        (missing,) = await feed(events, "GUILD_ROLE_DELETE", {"guild_id": "1", "role_id": "99"})
+        assert missing == {"guild_id": "1", "role_id": "99"}
+
+    asyncio.run(main())
+
+
+def test_member_events():
+    async def main():
+        cache, events = setup()
+        member = cache.get_member(1, 5)
+
+        (updated,) = await feed(
+            events, "GUILD_MEMBER_UPDATE", {"guild_id": "1", "user": user(5, "renamed"), "nick": "nick", "roles": []}
+        )
+        assert updated is member
+        assert member.nick == "nick" and member.name == "renamed" and member.role_ids == []
+
+        (removed,) = await feed(events, "GUILD_MEMBER_REMOVE", {"guild_id": "1", "user": user(5)})
+        assert removed is member and cache.get_member(1, 5) is None
+
+        (missing,) = await feed(events, "GUILD_MEMBER_REMOVE", {"guild_id": "1", "user": user(6)})
+        assert isinstance(missing, User) and not isinstance(missing, Member) and missing.id == 6
+
+        (user_update,) = await feed(events, "USER_UPDATE", user(5, "again"))
+        assert user_update is member.user and member.name == "again"
+
+    asyncio.run(main())
+
+
+def test_guild_events():
+    async def main():
+        cache, events = setup()
+        guild = cache.get_guild(1)
+
+        (updated,) = await feed(events, "GUILD_UPDATE", {"id": "1", "name": "renamed"})
+        assert updated is guild and guild.name == "renamed"
+
+        # An outage keeps everything cached
+        (unavailable,) = await feed(events, "GUILD_DELETE", {"id": "1", "unavailable": True})
+        assert unavailable is guild and guild.unavailable
+        assert cache.get_channel(1, 10) is not None
+
+        (deleted,) = await feed(events, "GUILD_DELETE", {"id": "1"})
+        assert deleted is guild
+        assert cache.get_guild(1) is None and cache.get_channels(1) == [] and cache.get_members(1) == []
+
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+from wharf.dispatcher import Dispatcher
+from wharf.impl.cache import Cache
+
+MESSAGE = {"id": "1", "channel_id": "10", "author": {"id": "5", "username": "user"}, "content": "hi"}
+
+
+def write_pid(data):
+    # Has to live at module level so the spawned process can import it
+    with open(data["content"], "w") as file:
+        file.write(str(os.getpid()))
+
+
+async def _wait_for(predicate, timeout=30.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    while not predicate():
+        assert loop.time() < deadline, "the listener never ran"
+        await asyncio.sleep(0.05)
+
+
+def test_thread_listener_gets_a_snapshot():
+    async def main():
+        dispatcher = Dispatcher(Cache(None))  # type: ignore
+        calls = []
+
+        def on_message(data):
+            calls.append((threading.current_thread().name, data))
+
+        dispatcher.subscribe("raw_message_create", on_message, executor="thread")
+        dispatcher.handle_event("MESSAGE_CREATE", MESSAGE)
+
+        await _wait_for(lambda: calls)
+
+        name, data = calls[0]
+        assert name.startswith("wharf-listener")
+        assert data == MESSAGE
+        assert data is not MESSAGE
+
+        await dispatcher.close()
+
+    asyncio.run(main())
+
+
+def test_process_listener_runs_in_another_process(tmp_path):
+    async def main():
+        dispatcher = Dispatcher(Cache(None))  # type: ignore
+        path = tmp_path / "pid"
+
+        dispatcher.subscribe("raw_message_create", write_pid, executor="process")
+        dispatcher.handle_event("MESSAGE_CREATE", {**MESSAGE, "content": str(path)})
+
+        await _wait_for(lambda: path.exists() and path.read_text())
+
+        assert int(path.read_text()) != os.getpid()
+
+        await dispatcher.close()
+
+    asyncio.run(main())
+
+
+def test_subscribe_rejects_bad_listeners():
+    dispatcher = Dispatcher(Cache(None))  # type: ignore
+
+    async def coroutine(data):
+        pass
+
+    with pytest.raises(TypeError):
+        dispatcher.subscribe("raw_message_create", coroutine, executor="thread")
+
+    with pytest.raises(ValueError):
+        dispatcher.subscribe("raw_message_create", write_pid, executor="fiber")
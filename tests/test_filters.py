@@ -0,0 +1,65 @@
+import asyncio
+
+from wharf.dispatcher import Dispatcher
+from wharf.filters import ListenerFilter
+from wharf.impl.cache import Cache
+
+MESSAGE = {
+    "guild_id": "1",
+    "channel_id": "10",
+    "author": {"id": "5", "bot": False},
+    "content": "!ping",
+}
+
+
+def test_every_option_has_to_match():
+    assert ListenerFilter(guild_id=1, channel_id=[10, 11], author_bot=False, prefix="!").matches(MESSAGE)
+    assert not ListenerFilter(guild_id=2).matches(MESSAGE)
+    assert not ListenerFilter(channel_id=11).matches(MESSAGE)
+    assert not ListenerFilter(author_bot=True).matches(MESSAGE)
+    assert not ListenerFilter(prefix=("?", ".")).matches(MESSAGE)
+
+
+def test_snowflakes_match_as_ints_and_strings():
+    assert ListenerFilter(guild_id="1").matches({**MESSAGE, "guild_id": 1})
+
+
+def test_check():
+    assert not ListenerFilter(check=lambda data: data["content"].endswith("pong")).matches(MESSAGE)
+
+
+def test_from_options():
+    assert ListenerFilter.from_options(guild_id=None, prefix=None) is None
+    assert ListenerFilter.from_options(guild_id=1, prefix=None).matches(MESSAGE)
+
+
+def test_raising_check_only_skips_its_listener():
+    async def main():
+        dispatcher = Dispatcher(Cache(None))  # type: ignore
+        calls = []
+
+        async def on_message(message):
+            calls.append("unfiltered")
+
+        async def on_x(message):
+            calls.append("filtered")
+
+        dispatcher.add_callback("raw_message_create", on_message)
+        dispatcher.add_callback(
+            "raw_message_create", on_x, filter=ListenerFilter(check=lambda data: data["content"].startswith("x"))
+        )
+        dispatcher.add_callback("message_create", on_x, filter=ListenerFilter(check=lambda data: data["content"] == "x"))
+
+        # No content, like without the message content intent
+        payload = {"id": "1", "channel_id": "10", "author": {"id": "5", "username": "user"}}
+
+        for _ in range(2):
+            dispatcher.handle_event("MESSAGE_CREATE", payload)
+
+        await asyncio.sleep(0.01)
+
+        assert calls == ["unfiltered", "unfiltered"]
+
+        await dispatcher.close()
+
+    asyncio.run(main())
@@ -0,0 +1,20 @@
+from wharf.intents import Intents
+
+
+def test_for_events_picks_the_smallest_intents():
+    intents = Intents.for_events(["ready", "message_create"])
+
+    assert intents.GUILDS and intents.GUILD_MESSAGES and intents.DIRECT_MESSAGES
+    assert not intents.MESSAGE_CONTENT
+    assert not intents.GUILD_MEMBERS
+
+
+def test_raw_events_need_the_same_intents():
+    assert Intents.required_for("raw_message_create").value == Intents.required_for("message_create").value
+
+
+def test_auto_keeps_explicit_intents():
+    intents = Intents.auto(message_content=True)
+
+    assert intents.automatic
+    assert intents.MESSAGE_CONTENT
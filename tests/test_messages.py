@@ -0,0 +1,51 @@
+from wharf.impl import Message
+from wharf.impl.cache import Cache
+from wharf.impl.messages import MessageCache
+
+
+def message(message_id: int, channel_id: int = 1) -> Message:
+    payload = {"id": str(message_id), "channel_id": str(channel_id), "author": {"id": "1", "username": "user"}}
+    return Message(payload, Cache(None))  # type: ignore
+
+
+def test_deleted_messages_dont_count():
+    messages = MessageCache(per_channel=5)
+
+    for message_id in range(5):
+        messages.add(message(message_id))
+
+    for message_id in (1, 2, 3):
+        messages.remove(message_id)
+
+    messages.add(message(5))
+
+    assert [m.id for m in messages.channel_messages(1)] == [0, 4, 5]
+
+
+def test_per_channel_limit():
+    messages = MessageCache(per_channel=3)
+
+    for message_id in range(5):
+        messages.add(message(message_id))
+
+    messages.add(message(10, channel_id=2))
+
+    assert [m.id for m in messages.channel_messages(1)] == [2, 3, 4]
+    assert len(messages) == 4
+
+
+def test_rings_stay_bounded():
+    messages = MessageCache(per_channel=5)
+    messages.add(message(0))
+
+    # The oldest message never goes, so deleted ids never reach the front of the ring
+    for message_id in range(1, 1000):
+        messages.add(message(message_id))
+        messages.remove(message_id)
+
+    assert len(messages._channels[1]) <= 3
+    assert [m.id for m in messages.channel_messages(1)] == [0]
+
+    messages.remove(0)
+
+    assert not messages._channels and not messages._counts
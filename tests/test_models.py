@@ -0,0 +1,117 @@
+import asyncio
+import tracemalloc
+from typing import Any, Callable, Dict
+
+import pytest
+
+import wharf
+from wharf.impl import Guild, Member, Message, Role, TextChannel, User
+from wharf.impl.cache import Cache
+
+COUNT = 2000
+
+
+def user_payload(i: int) -> Dict[str, Any]:
+    return {
+        "id": str(10**17 + i),
+        "username": f"user{i}",
+        "discriminator": f"{i % 10000:04}",
+        "avatar": "a" * 32,
+        "avatar_decoration": None,
+        "public_flags": 0,
+        "bot": False,
+    }
+
+
+def member_payload(i: int) -> Dict[str, Any]:
+    return {
+        "user": user_payload(i),
+        "nick": None,
+        "avatar": None,
+        "roles": [str(10**17 + r) for r in range(3)],
+        "joined_at": "2022-01-01T00:00:00.000000+00:00",
+    }
+
+
+GUILD = {"id": "1", "name": "guild", "icon": "b" * 32, "banner": None, "owner_id": "1"}
+
+# model name, how to build it, the most bytes one object may take without its payload
+MODELS = [
+    ("User", lambda i, cache, guild: User(user_payload(i), cache), 400),
+    ("Member", lambda i, cache, guild: Member(member_payload(i), guild.id, cache), 800),
+    ("Member (shared users)", lambda i, cache, guild: Member(member_payload(i % 100), guild.id, cache), 450),
+    ("Guild", lambda i, cache, guild: Guild({**GUILD, "id": str(10**17 + i)}, cache), 350),
+    (
+        "TextChannel",
+        lambda i, cache, guild: TextChannel(
+            {"id": str(10**17 + i), "type": 0, "guild_id": "1", "name": f"channel-{i}", "position": i}, cache
+        ),
+        400,
+    ),
+    ("Role", lambda i, cache, guild: Role({"id": str(10**17 + i), "name": f"role {i}", "permissions": "0"}, cache), 400),
+    (
+        "Message",
+        lambda i, cache, guild: Message(
+            {"id": str(10**18 + i), "channel_id": "1", "guild_id": "1", "author": user_payload(i), "content": "hi " * 10},
+            cache,
+        ),
+        300,
+    ),
+]
+
+
+def bytes_per_object(build: Callable[..., Any], *, keep_payloads: bool = False) -> float:
+    cache = Cache(None, keep_payloads=keep_payloads)  # type: ignore
+    guild = cache.add_guild(GUILD)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    objects = [build(i, cache, guild) for i in range(COUNT)]
+
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del objects
+    return (after - before) / COUNT
+
+
+@pytest.mark.parametrize("name, build, limit", MODELS, ids=[name for name, _, _ in MODELS])
+def test_model_size(name, build, limit):
+    assert bytes_per_object(build) <= limit
+
+
+@pytest.mark.parametrize("name, build, limit", MODELS, ids=[name for name, _, _ in MODELS])
+def test_models_are_slotted(name, build, limit):
+    model = build(0, Cache(None), Guild(GUILD, Cache(None)))  # type: ignore
+
+    assert not hasattr(model, "__dict__")
+    assert model.payload is None
+
+
+def test_keep_payloads():
+    cache = Cache(None, keep_payloads=True)  # type: ignore
+    payload = user_payload(0)
+
+    assert User(payload, cache).payload is payload
+    assert bytes_per_object(MODELS[0][1], keep_payloads=True) > bytes_per_object(MODELS[0][1])
+
+
+def test_bot_makes_caches_with_only_http():
+    class OldCache(Cache):
+        def __init__(self, http):
+            super().__init__(http)
+
+    async def make(**options):
+        return wharf.Bot(token="token", intents=wharf.Intents.none(), cache=OldCache, **options).cache
+
+    assert not asyncio.run(make()).keep_payloads
+
+    with pytest.raises(TypeError):
+        asyncio.run(make(keep_payloads=True))
+
+
+def test_dm_messages_have_no_guild_or_channel():
+    message = Message({"id": "1", "channel_id": "2", "author": user_payload(1), "content": ""}, Cache(None))  # type: ignore
+
+    assert message.guild is None and message.channel is None
@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+from wharf.impl import CachePolicy, LRUPolicy, MemoryBackend, NeverCache, TTLPolicy
+
+
+def test_lru_evicts_least_recently_used():
+    evicted = []
+    store = LRUPolicy(2).make_store(lambda key, value: evicted.append(key))
+
+    store[1] = "a"
+    store[2] = "b"
+    store.get(1)
+    store[3] = "c"
+
+    assert evicted == [2]
+    assert list(store) == [1, 3]
+
+
+def test_lru_needs_room():
+    with pytest.raises(ValueError):
+        LRUPolicy(0)
+
+
+def test_ttl_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+
+    evicted = []
+    store = TTLPolicy(10).make_store(lambda key, value: evicted.append(key))
+
+    store[1] = "a"
+    now[0] += 5
+    store[2] = "b"
+    now[0] += 6
+
+    assert store.get(1) is None
+    assert store.get(2) == "b"
+    assert evicted == [1]
+
+
+def test_ttl_update_restarts_the_clock(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+
+    store = TTLPolicy(10).make_store()
+    store[1] = "a"
+    now[0] += 8
+    store[1] = "b"
+    now[0] += 8
+
+    assert store.get(1) == "b"
+
+
+def test_ttl_max_size():
+    store = TTLPolicy(60, max_size=2).make_store()
+
+    for key in range(5):
+        store[key] = key
+
+    assert list(store) == [3, 4]
+
+
+def test_never_cache():
+    store = NeverCache().make_store()
+    store[1] = "a"
+    store.update({2: "b"})
+
+    assert store.get(1) is None
+    assert len(store) == 0
+
+
+def test_ttl_len_and_iter_skip_expired(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+
+    backend = MemoryBackend({"users": TTLPolicy(10), "members": TTLPolicy(10)})
+    backend.put("users", 1, "a")
+    backend.put("members", (5, 1), "a")
+    now[0] += 5
+    backend.put("users", 2, "b")
+    now[0] += 6
+
+    assert len(backend.users) == 1
+    assert list(backend.users) == [2]
+    assert list(backend.keys("users")) == [2]
+    assert backend.count("users") == 1
+    assert list(backend.guild_ids("members")) == []
+
+
+def test_policies_are_abstract():
+    with pytest.raises(TypeError):
+        CachePolicy()  # type: ignore
@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from wharf.dispatcher import Dispatcher
+from wharf.enums import ShardStatus
+from wharf.errors import GatewayReconnect, WebsocketClosed
+from wharf.impl.cache import Cache
+from wharf.shard import ShardManager
+
+URL = "wss://gateway.discord.gg"
+
+
+class FakeGateway:
+    """Stands in for a Gateway, every connect runs the next step of a script."""
+
+    def __init__(self, shard_id, steps):
+        self.shard_id = shard_id
+        self.steps = list(steps)
+        self.urls = []
+        self.status = ShardStatus.disconnected
+        self.resume = False
+        self.resume_url = None
+        self.session_id = None
+
+    async def connect(self, url):
+        self.urls.append(url)
+        await self.steps.pop(0)(self)
+
+
+class FakeBot:
+    def __init__(self):
+        self.cache = Cache(None)  # type: ignore
+        self.dispatcher = Dispatcher(self.cache)
+
+
+def manager(*gateways):
+    shards = ShardManager(FakeBot())  # type: ignore
+    shards.reconnect_delay = 0
+    shards.shards = {gateway.shard_id: gateway for gateway in gateways}
+    shards.running = True
+    return shards
+
+
+def test_reconnect_urls():
+    async def reconnect_resuming(gateway):
+        gateway.resume = True
+        raise GatewayReconnect("wss://resume", True)
+
+    async def reconnect_new_session(gateway):
+        gateway.resume = False
+        raise GatewayReconnect("wss://resume", False)
+
+    async def dropped_resumable(gateway):
+        gateway.session_id = "session"
+        gateway.resume = True
+        gateway.resume_url = "wss://resume-2"
+
+    async def network_error(gateway):
+        gateway.resume = False
+        raise OSError("connection reset")
+
+    async def stop(gateway):
+        shards.running = False
+
+    gateway = FakeGateway(0, [reconnect_resuming, reconnect_new_session, dropped_resumable, network_error, stop])
+    shards = manager(gateway)
+
+    assert asyncio.run(shards._run_shard(gateway, URL)) is None  # type: ignore
+    assert gateway.urls == [URL, "wss://resume", URL, "wss://resume-2", "wss://resume-2"]
+
+
+def test_fatal_close_only_stops_its_shard():
+    async def main():
+        ready = asyncio.Event()
+
+        async def fatal(gateway):
+            raise WebsocketClosed(4014, "Disallowed intents")
+
+        async def run(gateway):
+            shards.bot.dispatcher.parse_ready({"shard": [1, 2]})
+            await ready.wait()
+            shards.running = False
+
+        async def on_ready():
+            ready.set()
+
+        failing, running = FakeGateway(0, [fatal]), FakeGateway(1, [run])
+        shards = manager(failing, running)
+        shards.bot.dispatcher._unready_shards = {0, 1}
+        shards.bot.dispatcher.add_callback("ready", on_ready)
+
+        results = await asyncio.wait_for(
+            asyncio.gather(shards._run_shard(failing, URL), shards._run_shard(running, URL)), 1  # type: ignore
+        )
+
+        assert isinstance(results[0], WebsocketClosed) and results[1] is None
+        assert failing.status is ShardStatus.failed
+        assert failing.urls == [URL]
+
+        await shards.bot.dispatcher.close()
+
+    asyncio.run(main())
+
+
+def test_start_raises_when_every_shard_failed(monkeypatch: pytest.MonkeyPatch):
+    async def fatal(gateway):
+        raise WebsocketClosed(4004, "Authentication failed")
+
+    class HTTP:
+        async def get_gateway_bot(self):
+            return {"url": URL, "shards": 2, "session_start_limit": {"max_concurrency": 1}}
+
+    monkeypatch.setattr("wharf.shard.Gateway", lambda *args, shard_id, **kwargs: FakeGateway(shard_id, [fatal]))
+
+    shards = manager()
+    shards.bot.http = HTTP()  # type: ignore
+
+    with pytest.raises(WebsocketClosed):
+        asyncio.run(shards.start())
+
+    assert all(status is ShardStatus.failed for status in shards.statuses.values())
@@ -0,0 +1,38 @@
+from wharf.stats import DispatcherStats
+
+
+def _make_listener():
+    async def on_message(message):
+        pass
+
+    return on_message
+
+
+def test_same_named_callbacks_keep_their_own_stats():
+    stats = DispatcherStats()
+    first, second = _make_listener(), _make_listener()
+
+    stats.callback("message_create", first).timings.record(0.002)
+    stats.callback("message_create", second).timings.record(0.5)
+    stats.callback("message_create", second).exceptions += 1
+
+    callbacks = stats.snapshot()["message_create"]["callbacks"]
+    name = f"{__name__}._make_listener.<locals>.on_message"
+
+    assert set(callbacks) == {name, f"{name}#2"}
+    assert callbacks[name]["count"] == 1 and callbacks[name]["exceptions"] == 0
+    assert callbacks[f"{name}#2"]["max"] == 0.5 and callbacks[f"{name}#2"]["exceptions"] == 1
+
+
+def test_histogram_buckets():
+    stats = DispatcherStats()
+    timings = stats.callback("ready", _make_listener()).timings
+
+    for elapsed in (0.0005, 0.003, 20.0):
+        timings.record(elapsed)
+
+    histogram = timings.snapshot()["histogram"]
+
+    assert histogram["0.001"] == 1
+    assert histogram["0.005"] == 1
+    assert histogram["+Inf"] == 1
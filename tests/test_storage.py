@@ -0,0 +1,75 @@
+import pytest
+
+from wharf.impl import MemoryBackend, SQLiteBackend
+from wharf.impl.cache import Cache
+
+
+def user(user_id: int, name: str = "user"):
+    return {"id": str(user_id), "username": name, "discriminator": "0001", "avatar": None}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request):
+    cache = Cache(None, storage=MemoryBackend() if request.param == "memory" else SQLiteBackend())  # type: ignore
+    cache.add_guild({"id": "1", "name": "guild"})
+    cache.add_role(1, {"id": "10", "name": "role", "permissions": "0"})
+    cache.add_members(1, [{"user": user(user_id), "roles": ["10"]} for user_id in range(5)])
+
+    yield cache
+
+    cache.close()
+
+
+def test_stores(cache: Cache):
+    assert cache.guilds[1].name == "guild"
+    assert 3 in cache.users and 7 not in cache.users
+    assert sorted(cache.members[1]) == list(range(5))
+    assert list(cache.members) == [1]
+    assert cache.members[1][2].name == "user"
+    assert len(cache.roles[1]) == 1
+
+    with pytest.raises(KeyError):
+        cache.members[2]
+
+
+def test_remove_role(cache: Cache):
+    assert [role.id for role in cache.get_member(1, 0).roles] == [10]
+
+    cache.remove_role(1, 10)
+
+    assert cache.get_member(1, 0).roles == []
+
+
+def test_members_are_read_with_their_users():
+    storage = SQLiteBackend()
+    cache = Cache(None, storage=storage)  # type: ignore
+    cache.add_members(1, [{"user": user(user_id, f"user{user_id}"), "roles": []} for user_id in range(50)])
+
+    queries = []
+    storage._db.set_trace_callback(queries.append)
+
+    members = cache.get_members(1)
+
+    assert len(queries) == 1
+    assert sorted(member.name for member in members) == sorted(f"user{user_id}" for user_id in range(50))
+    assert cache.get_member(1, 3).name == "user3"
+    assert cache.get_user_members(3)[0].name == "user3"
+
+
+def test_store_views_ask_the_backend():
+    storage = SQLiteBackend()
+    cache = Cache(None, storage=storage)  # type: ignore
+    cache.add_members(1, [{"user": user(user_id), "roles": []} for user_id in range(50)])
+    cache.add_members(2, [{"user": user(user_id), "roles": []} for user_id in range(3)])
+
+    queries = []
+    storage._db.set_trace_callback(queries.append)
+
+    assert len(cache.members) == 2
+    assert len(cache.members[1]) == 50
+    assert len(cache.users) == 50
+    assert 2 in cache.members and 3 not in cache.members
+
+    # Counts and distinct guild ids, no member data is read
+    assert not any("data" in query for query in queries)
+    assert storage.count("members") == 53
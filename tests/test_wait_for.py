@@ -0,0 +1,101 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from wharf.dispatcher import Dispatcher
+from wharf.impl.cache import Cache
+
+
+def dispatcher() -> Dispatcher:
+    return Dispatcher(Cache(None))  # type: ignore
+
+
+def test_indexed_waiters_only_see_their_bucket():
+    async def main():
+        events = dispatcher()
+        checked = []
+
+        def check(message):
+            checked.append(message)
+            return True
+
+        first = asyncio.ensure_future(events.wait_for("message_create", check=check, channel_id=1))
+        second = asyncio.ensure_future(events.wait_for("message_create", channel_id="2"))
+        await asyncio.sleep(0)
+
+        # A miss doesn't run any checks
+        events.dispatch("message_create", {"channel_id": "3"})
+        await asyncio.sleep(0)
+
+        assert not first.done() and not second.done()
+        assert checked == []
+
+        events.dispatch("message_create", {"channel_id": "1", "content": "hi"})
+        assert await first == {"channel_id": "1", "content": "hi"}
+        assert not second.done()
+
+        # Models are matched by attribute, string and int snowflakes are the same bucket
+        message = SimpleNamespace(channel_id=2)
+        events.dispatch("message_create", message)
+        assert await second is message
+
+        assert "message_create" not in events._waiters
+
+    asyncio.run(main())
+
+
+def test_unindexed_waiters_fall_back_to_their_check():
+    async def main():
+        events = dispatcher()
+        checked = []
+
+        def check(message):
+            checked.append(message["id"])
+            return message["id"] == 2
+
+        waiter = asyncio.ensure_future(events.wait_for("message_create", check=check))
+        failing = asyncio.ensure_future(events.wait_for("message_create", check=lambda message: message["missing"]))
+        await asyncio.sleep(0)
+
+        events.dispatch("message_create", {"id": 1})
+        events.dispatch("message_create", {"id": 2})
+
+        assert await waiter == {"id": 2}
+        assert checked == [1, 2]
+
+        # A check that raises hands the error to its waiter instead of the dispatcher
+        with pytest.raises(KeyError):
+            await failing
+
+    asyncio.run(main())
+
+
+def test_timeout_and_cancel_remove_the_bucket():
+    async def main():
+        events = dispatcher()
+
+        with pytest.raises(asyncio.TimeoutError):
+            await events.wait_for("message_create", timeout=0.01, channel_id=1)
+
+        assert events._waiters == {}
+
+        kept = asyncio.ensure_future(events.wait_for("message_create", channel_id=1))
+        cancelled = asyncio.ensure_future(events.wait_for("message_create", channel_id=1))
+        await asyncio.sleep(0)
+
+        cancelled.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+
+        assert len(events._waiters["message_create"].indexes[("channel_id",)][(1,)]) == 1
+
+        kept.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await kept
+
+        assert events._waiters == {}
+
+    asyncio.run(main())
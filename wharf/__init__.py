@@ -5,12 +5,20 @@ __license__ = "MIT"
 __copyright__ = "Copyright (c) 2022 SawshaDev"
 
 from .bot import *
+from .cluster import *
+from .coalesce import *
+from .codec import *
 from .commands import *
 from .enums import *
 from .errors import *
+from .etf import *
+from .executor import *
 from .file import *
+from .filters import *
 from .gateway import *
 from .http import *
 from .impl import *
 from .intents import *
 from .plugin import *
+from .shard import *
+from .stats import *
@@ -3,23 +3,34 @@ from __future__ import annotations
 import asyncio
 import importlib
 import logging
-from typing import Dict, List, Optional, Protocol, Union, cast, TypeVar, Callable
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Protocol, Tuple, Union, cast, TypeVar, Callable
 
 from .activities import Activity
+from .coalesce import Coalescer
 from .commands import InteractionCommand
-from .dispatcher import CoroFunc, Dispatcher
-from .enums import Status
-from .errors import GatewayReconnect
+from .dispatcher import CoroFunc, Dispatcher, MemberChunkIterator
+from .enums import OverflowPolicy, Status
+from .filters import ListenerFilter, Snowflakes
 from .gateway import Gateway
 from .http import HTTPClient
 from .impl.cache import Cache
+from .impl.messages import MessageCache
+from .impl.policies import CachePolicy
+from .impl.storage import StorageBackend
 from .intents import Intents
 from .plugin import Plugin
+from .shard import ShardManager
 
 from .impl.models import check_channel_type, User, Guild
 
+if TYPE_CHECKING:
+    from .cluster import Cluster
+
 _log = logging.getLogger(__name__) # just here in case it needs to be used!
 
+# Events whose payloads only have content with the message_content intent
+_CONTENT_EVENTS = {"message_create", "message_update"}
+
 CacheT = TypeVar("CacheT", bound=Cache)
 CaCache = Callable[..., CacheT]
 
@@ -33,13 +44,70 @@ class _ExtProtocol(Protocol): # Had to make this private to stop users from acce
 
 
 class Bot:
-    def __init__(self, *, token: str, intents: Intents, cache: CaCache = Cache):
-        self.intents = intents
+    def __init__(
+        self,
+        *,
+        token: str,
+        intents: Union[Intents, str],
+        cache: CaCache = Cache,
+        shard_count: Optional[int] = None,
+        shard_ids: Optional[List[int]] = None,
+        compress: Optional[str] = "auto",
+        encoding: str = "json",
+        chunk_guilds_at_startup: bool = False,
+        dispatch_workers: Optional[int] = None,
+        max_dispatch_queue: int = 1000,
+        dispatch_overflow: OverflowPolicy = OverflowPolicy.block,
+        droppable_events: Optional[List[str]] = None,
+        ordered_dispatch: bool = False,
+        dispatch_stats: bool = False,
+        listener_workers: Optional[int] = None,
+        keep_payloads: bool = False,
+        cache_policies: Optional[Dict[str, CachePolicy]] = None,
+        max_messages: Optional[int] = None,
+        max_messages_per_channel: int = 100,
+        cache_storage: Optional[StorageBackend] = None,
+    ):
+        if isinstance(intents, str):
+            if intents != "auto":
+                raise ValueError(f"intents has to be an Intents object or \"auto\", not {intents!r}")
+
+            intents = Intents.auto()
+
+        # What was asked for, ``intents`` is what actually gets sent once `auto` intents are worked out
+        self._requested_intents: Intents = intents
+        self.intents: Intents = intents
         self.token = token
         self._slash_commands: List[InteractionCommand] = []
         self.http = HTTPClient()
-        self.cache: Cache = cache(self.http)
-        self.dispatcher = Dispatcher(self.cache)
+        # Only passed when it's set, so caches written for a plain ``__init__(self, http)`` keep working
+        self.cache: Cache = cache(self.http, keep_payloads=True) if keep_payloads else cache(self.http)
+
+        if cache_storage is not None:
+            self.cache.set_storage(cache_storage)
+
+        for store, policy in (cache_policies or {}).items():
+            self.cache.set_policy(store, policy)
+
+        if max_messages:
+            self.cache.messages = MessageCache(max_messages, per_channel=max_messages_per_channel)
+        self.dispatcher = Dispatcher(
+            self.cache,
+            workers=dispatch_workers,
+            max_queue_size=max_dispatch_queue,
+            overflow=dispatch_overflow,
+            droppable_events=droppable_events,
+            ordered=ordered_dispatch,
+            stats=dispatch_stats,
+            executor_workers=listener_workers,
+        )
+        self.dispatcher.chunk_guilds = chunk_guilds_at_startup
+        self.shard_manager = ShardManager(
+            self, shard_ids=shard_ids, shard_count=shard_count, compress=compress, encoding=encoding
+        )
+
+        # Set when this bot is ran by a `wharf.ClusterLauncher`
+        self.cluster: Optional[Cluster] = None
 
         self.extensions: List[_ExtProtocol] = []
 
@@ -54,7 +122,7 @@ class Bot:
         self,
         *args,
     ) -> None:
-        if not self.gateway.is_closed:
+        if self.gateway is not None and not self.gateway.is_closed:
             await self.close()
 
     async def pre_ready(self):
@@ -63,22 +131,96 @@ class Bot:
         """
         pass
 
+    def _resolve_intents(self) -> Intents:
+        """Works out `auto` intents from the subscribed events, or warns about listeners the intents leave out."""
+        events = [event for event, callbacks in self.dispatcher.events.items() if callbacks]
+
+        if self.dispatcher.chunk_guilds:
+            events.append("guild_members_chunk")
+
+        requested = self._requested_intents
+
+        if requested.automatic:
+            intents = Intents.for_events(events)
+            intents.value |= requested.value
+
+            _log.info("Using intents %s worked out from listeners", [name for name, enabled in intents if enabled])
+
+            # Listeners can't be checked for whether they read message content, so this is never turned on by itself
+            message_events = [event for event in events if event.replace("raw_", "", 1) in _CONTENT_EVENTS]
+
+            if message_events and not intents.MESSAGE_CONTENT:
+                _log.warning(
+                    "Listening to %s without the message_content intent, messages outside of DMs and mentions "
+                    "will have empty content. Use Intents.auto(message_content=True) if your listeners read it",
+                    message_events,
+                )
+
+            return intents
+
+        for event in events:
+            if not requested.covers(event):
+                needed = [name for name, enabled in Intents.required_for(event) if enabled]
+                _log.warning("Nothing will be dispatched to %r listeners without one of these intents: %s", event, needed)
+
+        return requested
+
     async def login(self):
+        self.intents = self._resolve_intents()
         self.http.login(self.token, self.intents.value)
 
         await self.pre_ready()
 
     async def connect(self):
-        self.gateway = Gateway(self.dispatcher, self.cache)
+        await self.shard_manager.start()
+
+    @property
+    def gateway(self) -> Optional[Gateway]:
+        """The first shard this bot runs, kept around for bots that only ever use one shard."""
+        if not self.shard_manager.shards:
+            return None
+
+        return next(iter(self.shard_manager.shards.values()))
+
+    @property
+    def shards(self) -> Dict[int, Gateway]:
+        return self.shard_manager.shards
 
-        gateway_url: Optional[str] = None
-        self.running = True
+    @property
+    def latency(self) -> Optional[float]:
+        """The average heartbeat latency of every shard that has one."""
+        latencies = [latency for latency in self.shard_manager.latencies.values() if latency is not None]
+
+        if not latencies:
+            return None
+
+        return sum(latencies) / len(latencies)
+
+    def request_members(
+        self,
+        guild_id: int,
+        *,
+        query: Optional[str] = None,
+        limit: int = 0,
+        user_ids: Optional[List[int]] = None,
+        presences: bool = False,
+        timeout: Optional[float] = 30.0,
+    ) -> MemberChunkIterator:
+        """Requests a guilds members over the gateway, the members get cached as their chunks come in.
+
+        .. code-block:: python
+
+            async for members in bot.request_members(guild_id, query="saw"):
+                print(members)
+        """
+        gateway = self.shard_manager.shard_for_guild(guild_id)
 
-        while self.running:
-            try:
-                await self.gateway.connect(gateway_url)
-            except GatewayReconnect as gr:
-                gateway_url = gr.url
+        if gateway is None:
+            raise ValueError(f"Guild {guild_id} is not on any shard this bot runs.")
+
+        return gateway.request_members(
+            guild_id, query=query, limit=limit, user_ids=user_ids, presences=presences, timeout=timeout
+        )
 
     async def fetch_user(self, user_id: int):
         return User(await self.http.get_user(user_id), self.cache)
@@ -92,17 +234,88 @@ class Bot:
 
         return Guild(await self.http.get_guild(guild_id), self.cache)
 
-    def listen(self, name: str):
+    def listen(
+        self,
+        name: str,
+        *,
+        guild_id: Optional[Snowflakes] = None,
+        channel_id: Optional[Snowflakes] = None,
+        author_bot: Optional[bool] = None,
+        prefix: Optional[Union[str, Tuple[str, ...]]] = None,
+        check: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        executor: Optional[str] = None,
+    ):
+        """Registers a listener for an event.
+
+        The filtering keyword arguments filter events by their raw payload before any models get made,
+        see :class:`wharf.ListenerFilter` for what each of them does.
+
+        Listening to ``raw_<event>`` gets the decoded payload without building any models, and ``raw_frame``
+        gets every event as it came off the websocket along with its name and sequence.
+
+        ``executor`` can be ``"thread"`` or ``"process"`` for CPU heavy listeners, they have to be regular
+        functions and get a plain, picklable copy of the event (its raw payload when there is one) instead of
+        models, so the event loop keeps reading the gateway while they run. Listeners ran in processes have to
+        be defined at the top level of a module.
+        """
+        listener_filter = ListenerFilter.from_options(
+            guild_id=guild_id, channel_id=channel_id, author_bot=author_bot, prefix=prefix, check=check
+        )
+
         def inner(func):
-            if name not in self.dispatcher.events:
-                self.dispatcher.subscribe(name, func)
-            else:
-                self.dispatcher.add_callback(name, func)
+            self.dispatcher.subscribe(name, func, filter=listener_filter, executor=executor)
+
+            return func
 
         return inner
 
-    def subscribe(self, event: str, func: CoroFunc):
-        self.dispatcher.subscribe(event, func)
+    async def wait_for(
+        self,
+        event: str,
+        *,
+        check: Optional[Callable[..., bool]] = None,
+        timeout: Optional[float] = None,
+        **index: Any,
+    ) -> Any:
+        """Waits for the next event that passes ``check`` and returns what it was dispatched with.
+
+        Keyword arguments like ``channel_id``, ``user_id`` or ``custom_id`` index the wait so only events with
+        matching values run the check, which keeps thousands of pending waits cheap.
+
+        .. code-block:: python
+
+            message = await bot.wait_for("message_create", channel_id=channel_id, user_id=user_id, timeout=30)
+
+        Raises
+        -----------
+        :class:`asyncio.TimeoutError`
+            No matching event came in before the timeout.
+        """
+        return await self.dispatcher.wait_for(event, check=check, timeout=timeout, **index)
+
+    def coalesce(self, event: str, policy: Optional[Coalescer]):
+        """Merges bursts of an event before its listeners see them.
+
+        .. code-block:: python
+
+            # Listeners get the newest presence per member at most every 250ms
+            bot.coalesce("presence_update", wharf.KeepLatest(key=("guild_id", "user.id"), window=0.25))
+            # Listeners get a list of every typing event once a second
+            bot.coalesce("typing_start", wharf.Batch(interval=1))
+        """
+        self.dispatcher.coalesce(event, policy)
+
+    def dispatch_stats(self) -> Dict[str, Any]:
+        """Returns a snapshot of the dispatchers per event counters and callback latencies.
+
+        Needs the bot to be made with ``dispatch_stats=True``, see :meth:`Dispatcher.stats_snapshot`.
+        """
+        return self.dispatcher.stats_snapshot()
+
+    def subscribe(
+        self, event: str, func: CoroFunc, *, filter: Optional[ListenerFilter] = None, executor: Optional[str] = None
+    ):
+        self.dispatcher.subscribe(event, func, filter=filter, executor=executor)
 
     def load_extension(self, extension: str):
         if extension in self.extensions:
@@ -142,7 +355,12 @@ class Bot:
 
         for event_name, listeners in plugin._listeners.items():
             for listener in listeners:
-                self.subscribe(event_name, listener)
+                self.subscribe(
+                    event_name,
+                    listener,
+                    filter=plugin._filters.get(listener),
+                    executor=plugin._executors.get(listener),
+                )
 
         self._plugins[plugin.name] = plugin
 
@@ -155,8 +373,13 @@ class Bot:
 
         self._plugins.pop(plugin.name)  # type: ignore
 
-    async def change_presence(self, *, status: Status = Status.online, activity: Optional[Activity] = None):
-        await self.gateway._change_presence(status=status.value, activity=activity)
+    async def change_presence(
+        self, *, status: Status = Status.online, activity: Optional[Activity] = None, shard_id: Optional[int] = None
+    ):
+        shards = self.shards.values() if shard_id is None else [self.shards[shard_id]]
+
+        for gateway in shards:
+            await gateway._change_presence(status=status.value, activity=activity)
 
     async def register_app_command(self, command: InteractionCommand):
         resp = await self.http.register_app_commands(command)
@@ -179,7 +402,8 @@ class Bot:
         for plugin in self._plugins.values():
             self.remove_plugin(plugin)
 
-        if self.gateway is not None:
-            await self.gateway.close(code=1000, resume=False)
+        await self.shard_manager.close()
+        await self.dispatcher.close()
 
         await self.http.close()
+        self.cache.close()
@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import multiprocessing
+import multiprocessing.process
+import os
+import threading
+import time
+from multiprocessing.connection import Connection
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from .http import HTTPClient
+
+if TYPE_CHECKING:
+    from .bot import Bot
+
+__all__ = ("Cluster", "ClusterLauncher")
+
+_log = logging.getLogger(__name__)
+
+BotFactory = Callable[..., "Bot"]
+
+
+class ClusterOPCodes:
+    IDENTIFY = "identify"
+    IDENTIFY_OK = "identify_ok"
+    QUERY = "query"
+    RESPONSE = "response"
+    RESULT = "result"
+
+
+class _IdentifyCoordinator:
+    """The cross process version of :class:`wharf.impl.IdentifyRatelimiter`, only ever lives in the launcher."""
+
+    def __init__(self, max_concurrency: int = 1, *, delay: float = 5.0):
+        self.max_concurrency = max_concurrency
+        self.delay = delay
+        self._locks = [threading.Lock() for _ in range(max_concurrency)]
+        self._last_identify = [0.0] * max_concurrency
+
+    def acquire(self, shard_id: int):
+        key = shard_id % self.max_concurrency
+
+        with self._locks[key]:
+            wait = self._last_identify[key] + self.delay - time.monotonic()
+
+            if wait > 0:
+                time.sleep(wait)
+
+            self._last_identify[key] = time.monotonic()
+
+
+class _ClusterIdentifyRatelimiter:
+    def __init__(self, cluster: Cluster):
+        self.cluster = cluster
+
+    async def acquire(self, shard_id: int) -> None:
+        await self.cluster._request({"op": ClusterOPCodes.IDENTIFY, "shard_id": shard_id})
+
+
+class Cluster:
+    """The worker side of a cluster. Each worker process owns one of these along with its own bot.
+
+    Bots running inside a cluster can reach it through ``bot.cluster``.
+    """
+
+    def __init__(self, cluster_id: int, shard_ids: List[int], shard_count: int, conn: Connection):
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self._conn = conn
+        self._send_lock = threading.Lock()
+
+        self._nonce = 0
+        self._waiters: Dict[int, asyncio.Future[Any]] = {}
+        self._query_handlers: Dict[str, Callable[..., Any]] = {}
+
+    def _send(self, payload: Dict[str, Any]):
+        with self._send_lock:
+            self._conn.send(payload)
+
+    async def _request(self, payload: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        self._nonce += 1
+        nonce = self._nonce
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[nonce] = future
+
+        payload["nonce"] = nonce
+        self._send(payload)
+
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._waiters.pop(nonce, None)
+
+    def add_query_handler(self, name: str, func: Callable[..., Any]):
+        self._query_handlers[name] = func
+
+    def query_handler(self, name: str):
+        def inner(func):
+            self.add_query_handler(name, func)
+
+            return func
+
+        return inner
+
+    async def query(self, name: str, data: Any = None, *, timeout: Optional[float] = 10.0) -> List[Any]:
+        """Asks every other cluster to run the query handler registered under ``name`` and returns their answers.
+
+        Parameters
+        -----------
+        name: :class:`str`
+            The name the query handler was registered under.
+        data: Any
+            Picklable data passed to the query handlers.
+        timeout: Optional[:class:`float`]
+            How long to wait for every cluster to answer.
+        """
+        return await self._request({"op": ClusterOPCodes.QUERY, "name": name, "data": data}, timeout)
+
+    async def _handle_query(self, payload: Dict[str, Any]):
+        handler = self._query_handlers.get(payload["name"])
+        result = None
+
+        if handler is not None:
+            try:
+                result = handler(payload["data"])
+
+                if inspect.isawaitable(result):
+                    result = await result
+            except Exception:
+                _log.exception("Query handler %r raised an exception", payload["name"])
+                result = None
+
+        self._send({"op": ClusterOPCodes.RESPONSE, "nonce": payload["nonce"], "data": result})
+
+    def _dispatch_payload(self, payload: Dict[str, Any]):
+        if payload["op"] == ClusterOPCodes.QUERY:
+            asyncio.create_task(self._handle_query(payload))
+            return
+
+        future = self._waiters.get(payload["nonce"])
+
+        if future is not None and not future.done():
+            future.set_result(payload.get("data"))
+
+    def _read_loop(self, loop: asyncio.AbstractEventLoop):
+        # Runs in a daemon thread so a blocking recv never holds up the event loop or interpreter shutdown
+        while True:
+            try:
+                payload: Dict[str, Any] = self._conn.recv()
+            except (EOFError, OSError):
+                _log.info("Cluster %d lost its connection to the launcher", self.cluster_id)
+                return
+
+            try:
+                loop.call_soon_threadsafe(self._dispatch_payload, payload)
+            except RuntimeError:  # The loop is closed
+                return
+
+    async def start(self, bot: Bot):
+        bot.cluster = self
+        bot.shard_manager.identify_ratelimiter = _ClusterIdentifyRatelimiter(self)
+
+        reader = threading.Thread(target=self._read_loop, args=(asyncio.get_running_loop(),), daemon=True)
+        reader.start()
+
+        try:
+            await bot.start()
+        finally:
+            await bot.close()
+
+
+def _cluster_main(factory: BotFactory, cluster_id: int, shard_ids: List[int], shard_count: int, conn: Connection):
+    bot = factory(shard_ids=shard_ids, shard_count=shard_count)
+    cluster = Cluster(cluster_id, shard_ids, shard_count, conn)
+
+    try:
+        asyncio.run(cluster.start(bot))
+    except KeyboardInterrupt:
+        pass
+
+
+class ClusterLauncher:
+    """Spawns worker processes that each run a slice of the bots shards.
+
+    Parameters
+    -----------
+    factory: Callable[..., :class:`wharf.Bot`]
+        A picklable (module level) callable that gets passed ``shard_ids`` and ``shard_count``
+        as keyword arguments and returns the bot that cluster should run.
+    token: :class:`str`
+        The bot token, only used to look up the recommended shard count.
+    cluster_count: Optional[:class:`int`]
+        How many processes to spawn. Defaults to the amount of CPU cores.
+    shard_count: Optional[:class:`int`]
+        The total amount of shards. Defaults to the amount discord recommends.
+    """
+
+    def __init__(
+        self,
+        factory: BotFactory,
+        *,
+        token: str,
+        cluster_count: Optional[int] = None,
+        shard_count: Optional[int] = None,
+    ):
+        self.factory = factory
+        self.token = token
+        self.cluster_count = cluster_count or os.cpu_count() or 1
+        self.shard_count = shard_count
+
+        self.processes: List[multiprocessing.process.BaseProcess] = []
+        self._conns: List[Connection] = []
+        self._send_locks: List[threading.Lock] = []
+
+        # nonce, origin cluster -> responses collected so far
+        self._pending_queries: Dict[tuple[int, int], List[Any]] = {}
+        self._query_nonce = 0
+        self._query_lock = threading.Lock()
+
+    async def _fetch_gateway_info(self) -> Dict[str, Any]:
+        http = HTTPClient()
+        http.login(self.token, 0)
+
+        try:
+            return await http.get_gateway_bot()
+        finally:
+            await http.close()
+
+    def _send(self, cluster_id: int, payload: Dict[str, Any]):
+        with self._send_locks[cluster_id]:
+            self._conns[cluster_id].send(payload)
+
+    def _handle_query(self, cluster_id: int, payload: Dict[str, Any]):
+        others = [other for other in range(len(self._conns)) if other != cluster_id]
+
+        if not others:
+            self._send(cluster_id, {"op": ClusterOPCodes.RESULT, "nonce": payload["nonce"], "data": []})
+            return
+
+        with self._query_lock:
+            self._query_nonce += 1
+            nonce = self._query_nonce
+            self._pending_queries[(nonce, cluster_id)] = []
+
+        # Routes the responses back to the cluster that asked
+        forwarded = {**payload, "nonce": (nonce, cluster_id, payload["nonce"], len(others))}
+
+        for other in others:
+            self._send(other, forwarded)
+
+    def _handle_response(self, payload: Dict[str, Any]):
+        nonce, origin, origin_nonce, expected = payload["nonce"]
+
+        with self._query_lock:
+            responses = self._pending_queries.get((nonce, origin))
+
+            if responses is None:
+                return
+
+            responses.append(payload["data"])
+
+            if len(responses) < expected:
+                return
+
+            self._pending_queries.pop((nonce, origin))
+
+        self._send(origin, {"op": ClusterOPCodes.RESULT, "nonce": origin_nonce, "data": responses})
+
+    def _grant_identify(self, cluster_id: int, identify: _IdentifyCoordinator, payload: Dict[str, Any]):
+        identify.acquire(payload["shard_id"])
+        self._send(cluster_id, {"op": ClusterOPCodes.IDENTIFY_OK, "nonce": payload["nonce"]})
+
+    def _listen(self, cluster_id: int, identify: _IdentifyCoordinator):
+        conn = self._conns[cluster_id]
+
+        while True:
+            try:
+                payload: Dict[str, Any] = conn.recv()
+            except (EOFError, OSError):
+                _log.info("Cluster %d disconnected", cluster_id)
+                return
+
+            if payload["op"] == ClusterOPCodes.IDENTIFY:
+                # Identifies can wait for several windows, queries from the same cluster shouldn't wait along with them
+                threading.Thread(target=self._grant_identify, args=(cluster_id, identify, payload), daemon=True).start()
+
+            elif payload["op"] == ClusterOPCodes.QUERY:
+                self._handle_query(cluster_id, payload)
+
+            elif payload["op"] == ClusterOPCodes.RESPONSE:
+                self._handle_response(payload)
+
+    def run(self):
+        data = asyncio.run(self._fetch_gateway_info())
+
+        shard_count = self.shard_count or int(data["shards"])
+        cluster_count = min(self.cluster_count, shard_count)
+        identify = _IdentifyCoordinator(data["session_start_limit"]["max_concurrency"])
+
+        ctx = multiprocessing.get_context("spawn")
+        threads: List[threading.Thread] = []
+        child_conns: List[Connection] = []
+
+        for cluster_id in range(cluster_count):
+            shard_ids = list(range(cluster_id, shard_count, cluster_count))
+            parent_conn, child_conn = ctx.Pipe()
+
+            process = ctx.Process(
+                target=_cluster_main,
+                args=(self.factory, cluster_id, shard_ids, shard_count, child_conn),
+                name=f"wharf-cluster-{cluster_id}",
+            )
+
+            self._conns.append(parent_conn)
+            child_conns.append(child_conn)
+            self._send_locks.append(threading.Lock())
+            self.processes.append(process)
+
+            _log.info("Starting cluster %d with shards %s", cluster_id, shard_ids)
+
+        for cluster_id, process in enumerate(self.processes):
+            process.start()
+
+            # The child has its own copy now, without closing ours a dead cluster never shows up as EOF
+            child_conns[cluster_id].close()
+
+            thread = threading.Thread(target=self._listen, args=(cluster_id, identify), daemon=True)
+            thread.start()
+            threads.append(thread)
+
+        try:
+            for process in self.processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in self.processes:
+                process.terminate()
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+import copy
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple, Union
+
+__all__ = (
+    "Coalescer",
+    "KeepLatest",
+    "Batch",
+)
+
+Emit = Callable[..., None]
+Key = Union[str, Sequence[str], Callable[..., Hashable]]
+
+
+def _resolve_path(obj: Any, path: str) -> Any:
+    for part in path.split("."):
+        if obj is None:
+            return None
+
+        obj = obj.get(part) if isinstance(obj, dict) else getattr(obj, part, None)
+
+    return obj
+
+
+class Coalescer(ABC):
+    """The base for every coalescing policy. Policies hold on to events and hand merged results to ``emit``."""
+
+    def __init__(self):
+        self._emit: Optional[Emit] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def _bind(self, emit: Emit):
+        self._emit = emit
+
+    def _clone(self) -> Coalescer:
+        """A copy with the same settings and nothing pending, for listeners that coalesce on their own."""
+        clone = copy.copy(self)
+        clone._emit = None
+        clone._timer = None
+        clone._clear()
+        return clone
+
+    def _clear(self) -> None:
+        pass
+
+    @abstractmethod
+    def add(self, args: Tuple[Any, ...]) -> None:
+        """Takes in the arguments of one event."""
+
+    @abstractmethod
+    def flush(self) -> None:
+        """Hands whatever is pending to ``emit`` right away."""
+
+    def _schedule_flush(self, delay: float):
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+
+    def _on_timer(self):
+        self._timer = None
+        self.flush()
+
+    def cancel(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+
+class KeepLatest(Coalescer):
+    """Only keeps the newest event per key, handing them out once every ``window`` seconds.
+
+    Parameters
+    -----------
+    key: Union[:class:`str`, Sequence[:class:`str`], Callable[..., Hashable]]
+        Dotted paths looked up on the events first argument (a raw dict or a model), or a callable getting the
+        events arguments. Defaults to ``("guild_id", "user.id")`` which fits presence and member updates.
+    window: :class:`float`
+        How long to collect events for, in seconds.
+    as_list: :class:`bool`
+        Hand the listeners one list of every kept event instead of calling them once per key.
+    """
+
+    def __init__(self, *, key: Key = ("guild_id", "user.id"), window: float = 0.25, as_list: bool = False):
+        super().__init__()
+        self.window = window
+        self.as_list = as_list
+
+        if callable(key):
+            self._key = key
+        else:
+            paths = (key,) if isinstance(key, str) else tuple(key)
+            self._key = lambda *args: tuple(_resolve_path(args[0], path) for path in paths) if args else None
+
+        self._pending: Dict[Hashable, Tuple[Any, ...]] = {}
+
+    def _clear(self) -> None:
+        self._pending = {}
+
+    def add(self, args: Tuple[Any, ...]) -> None:
+        self._pending[self._key(*args)] = args
+        self._schedule_flush(self.window)
+
+    def flush(self) -> None:
+        pending = list(self._pending.values())
+        self._pending.clear()
+
+        if not pending or self._emit is None:
+            return
+
+        if self.as_list:
+            self._emit([args[0] if len(args) == 1 else args for args in pending])
+            return
+
+        for args in pending:
+            self._emit(*args)
+
+
+class Batch(Coalescer):
+    """Collects every event into a list that listeners get once every ``interval`` seconds.
+
+    Parameters
+    -----------
+    interval: :class:`float`
+        How long to collect events for, in seconds.
+    max_size: Optional[:class:`int`]
+        Hand out the batch early once it holds this many events.
+    """
+
+    def __init__(self, *, interval: float = 0.5, max_size: Optional[int] = None):
+        super().__init__()
+        self.interval = interval
+        self.max_size = max_size
+        self._items: List[Any] = []
+
+    def _clear(self) -> None:
+        self._items = []
+
+    def add(self, args: Tuple[Any, ...]) -> None:
+        self._items.append(args[0] if len(args) == 1 else args)
+
+        if self.max_size is not None and len(self._items) >= self.max_size:
+            self.cancel()
+            self.flush()
+        else:
+            self._schedule_flush(self.interval)
+
+    def flush(self) -> None:
+        items, self._items = self._items, []
+
+        if items and self._emit is not None:
+            self._emit(items)
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Type, Union
+
+__all__ = (
+    "JSONCodec",
+    "OrjsonCodec",
+    "MsgspecCodec",
+    "get_codec",
+    "set_codec",
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+Data = Union[str, bytes, bytearray, memoryview]
+
+
+class JSONCodec:
+    """The codec every JSON payload going in or out of wharf goes through. Uses the stdlib :mod:`json` module."""
+
+    name = "json"
+
+    def loads(self, data: Data) -> Any:
+        if isinstance(data, memoryview):
+            data = bytes(data)
+
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj, separators=(",", ":"))
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        return self.dumps(obj).encode("utf-8")
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise RuntimeError("orjson is not installed, install it with `pip install wharf[speed]`")
+
+    def loads(self, data: Data) -> Any:
+        return orjson.loads(data)  # type: ignore
+
+    def dumps(self, obj: Any) -> str:
+        return orjson.dumps(obj).decode("utf-8")  # type: ignore
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        return orjson.dumps(obj)  # type: ignore
+
+
+class MsgspecCodec(JSONCodec):
+    name = "msgspec"
+
+    def __init__(self):
+        if msgspec is None:
+            raise RuntimeError("msgspec is not installed, install it with `pip install msgspec`")
+
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder()
+
+    def loads(self, data: Data) -> Any:
+        return self._decoder.decode(data)
+
+    def dumps(self, obj: Any) -> str:
+        return self._encoder.encode(obj).decode("utf-8")
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+
+_CODECS: Dict[str, Type[JSONCodec]] = {
+    JSONCodec.name: JSONCodec,
+    OrjsonCodec.name: OrjsonCodec,
+    MsgspecCodec.name: MsgspecCodec,
+}
+
+
+def _default_codec() -> JSONCodec:
+    if orjson is not None:
+        return OrjsonCodec()
+
+    if msgspec is not None:
+        return MsgspecCodec()
+
+    return JSONCodec()
+
+
+_codec: JSONCodec = _default_codec()
+
+
+def get_codec() -> JSONCodec:
+    """Returns the codec new http clients and gateways will use. Picks the fastest one installed by default."""
+    return _codec
+
+
+def set_codec(codec: Union[str, JSONCodec]) -> None:
+    """Sets the codec new http clients and gateways will use.
+
+    Parameters
+    -----------
+    codec: Union[:class:`str`, :class:`JSONCodec`]
+        Either a codec instance or one of ``"json"``, ``"orjson"`` or ``"msgspec"``.
+    """
+    global _codec
+
+    if isinstance(codec, str):
+        if codec not in _CODECS:
+            raise ValueError(f"Unknown codec {codec!r}, pick one of {', '.join(_CODECS)}")
+
+        codec = _CODECS[codec]()
+
+    _codec = codec
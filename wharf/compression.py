@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import importlib
+from typing import Any, Optional, Union
+from zlib import decompressobj
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    # Only exists on python 3.14+, imported by name so type checkers don't take it for this module
+    zstd: Any = importlib.import_module("compression.zstd")
+except ImportError:
+    zstd = None
+
+__all__ = (
+    "ZlibStreamDecompressor",
+    "ZstdStreamDecompressor",
+    "resolve_compression",
+    "HAS_ZSTD",
+)
+
+ZLIB_SUFFIX = b"\x00\x00\xff\xff"
+HAS_ZSTD = zstandard is not None or zstd is not None
+
+
+class ZlibStreamDecompressor:
+    """Decodes a ``zlib-stream`` connection. One of these should live exactly as long as the connection does."""
+
+    name = "zlib-stream"
+
+    def __init__(self):
+        self._inflator = decompressobj()
+        # Holds frames until a full zlib message has arrived, reused for the whole connection
+        self._buffer = bytearray()
+
+    def decompress(self, data: bytes) -> Optional[bytes]:
+        """Feeds a binary frame into the stream, returns ``None`` until a full message has been received."""
+        if not self._buffer:
+            if data[-4:] == ZLIB_SUFFIX:
+                # The common case of a message fitting in a single frame, no need to copy it anywhere
+                return self._inflator.decompress(data)
+
+            self._buffer.extend(data)
+            return None
+
+        self._buffer.extend(data)
+
+        # Checked on the buffer, the suffix itself can be split over two frames
+        if self._buffer[-4:] != ZLIB_SUFFIX:
+            return None
+
+        try:
+            return self._inflator.decompress(self._buffer)
+        finally:
+            self._buffer.clear()
+
+
+class ZstdStreamDecompressor:
+    """Decodes a ``zstd-stream`` connection. One of these should live exactly as long as the connection does."""
+
+    name = "zstd-stream"
+
+    def __init__(self):
+        if zstandard is not None:
+            self._decompressor = zstandard.ZstdDecompressor().decompressobj()
+        elif zstd is not None:
+            self._decompressor = zstd.ZstdDecompressor()
+        else:
+            raise RuntimeError("zstd-stream compression needs zstandard installed, install it with `pip install zstandard`")
+
+    def decompress(self, data: bytes) -> Optional[bytes]:
+        """Feeds a binary frame into the stream, returns ``None`` until a full message has been received."""
+        # Discord flushes the stream after every message, a frame holding only part of one decodes to nothing yet
+        return self._decompressor.decompress(data) or None
+
+
+Decompressor = Union[ZlibStreamDecompressor, ZstdStreamDecompressor]
+
+_DECOMPRESSORS = {
+    ZlibStreamDecompressor.name: ZlibStreamDecompressor,
+    ZstdStreamDecompressor.name: ZstdStreamDecompressor,
+}
+
+
+def resolve_compression(compress: Optional[str]) -> Optional[str]:
+    """Turns ``"auto"`` into the fastest transport compression installed and validates everything else."""
+    if compress == "auto":
+        return ZstdStreamDecompressor.name if HAS_ZSTD else ZlibStreamDecompressor.name
+
+    if compress is not None and compress not in _DECOMPRESSORS:
+        raise ValueError(f"Unsupported transport compression {compress!r}")
+
+    return compress
+
+
+def make_decompressor(compress: str) -> Decompressor:
+    return _DECOMPRESSORS[compress]()
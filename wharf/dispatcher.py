@@ -3,10 +3,33 @@ from __future__ import annotations
 import asyncio
 import inspect
 import logging
-from collections import defaultdict
-from typing import TYPE_CHECKING, Any, Callable, Coroutine, Dict, List, TypeVar
-
-from .impl import Guild, Interaction, Message, TextChannel
+import time
+from collections import defaultdict, deque
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+)
+
+from .coalesce import Coalescer
+from .enums import OverflowPolicy
+from .executor import ExecutorListener, ListenerExecutors
+from .filters import ListenerFilter
+from .impl import Guild, Interaction, Member, TextChannel, User, check_channel_type
+from .stats import DispatcherStats
 
 if TYPE_CHECKING:
     from .impl.cache import Cache
@@ -18,25 +41,306 @@ CoroFunc = Func[Coroutine[Any, Any, Any]]
 
 _log = logging.getLogger(__name__)
 
+# event name, callback, args, kwargs
+_Job = Tuple[str, "CoroFunc", Tuple[Any, ...], Dict[str, Any]]
+
+
+_GUILD_EVENTS = {"GUILD_CREATE", "GUILD_UPDATE", "GUILD_DELETE"}
+
+# Parsers that only build models for listeners and never touch the cache, these can be skipped entirely
+# when every listener filters the event out. MESSAGE_CREATE only while there is no message cache.
+_SKIPPABLE_PARSERS = {"MESSAGE_CREATE", "INTERACTION_CREATE"}
+
+
+def _lane_key(event_name: str, data: Any) -> Any:
+    if not isinstance(data, dict):
+        return None
+
+    guild_id = data.get("guild_id")
+
+    if guild_id is None and event_name in _GUILD_EVENTS:
+        guild_id = data.get("id")
+
+    return guild_id
+
+
+class RawFrame(NamedTuple):
+    """What ``raw_frame`` listeners get for every DISPATCH, the frame exactly as discord sent it."""
+
+    event_name: str
+    sequence: Optional[int]
+    shard_id: int
+    # Decompressed but not decoded, ``bytes`` for ETF and compressed connections and ``str`` otherwise
+    frame: Union[str, bytes, None]
+
+
+class MemberChunkIterator:
+    """Streams the members discord sends back for a guild member request, one chunk at a time.
+
+    Usually made through :meth:`wharf.Bot.request_members`.
+    """
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        nonce: str,
+        request: Callable[[], Awaitable[None]],
+        *,
+        timeout: Optional[float] = 30.0,
+    ):
+        self._dispatcher = dispatcher
+        self.nonce = nonce
+        self._request = request
+        self.timeout = timeout
+
+        self.not_found: List[int] = []
+        self._queue: asyncio.Queue[Optional[List[Member]]] = asyncio.Queue()
+        self._requested = False
+        self._done = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> List[Member]:
+        if self._done:
+            raise StopAsyncIteration
+
+        if not self._requested:
+            self._requested = True
+            self._dispatcher._member_chunks[self.nonce] = self
+            await self._request()
+
+        try:
+            chunk = await asyncio.wait_for(self._queue.get(), self.timeout)
+        except asyncio.TimeoutError:
+            self._finish()
+            raise
+
+        if chunk is None:
+            self._done = True
+            raise StopAsyncIteration
+
+        return chunk
+
+    async def flatten(self) -> List[Member]:
+        """Waits for every chunk and returns all the members at once."""
+        return [member async for chunk in self for member in chunk]
+
+    def _feed(self, data: Dict[str, Any], members: List[Member]):
+        self.not_found.extend(int(user_id) for user_id in data.get("not_found", []))
+        self._queue.put_nowait(members)
+
+        if data["chunk_index"] + 1 >= data["chunk_count"]:
+            self._queue.put_nowait(None)
+            self._finish()
+
+    def _finish(self):
+        self._dispatcher._member_chunks.pop(self.nonce, None)
+
+
+def _index_value(obj: Any, key: str) -> Any:
+    value = obj.get(key) if isinstance(obj, dict) else getattr(obj, key, None)
+
+    # Snowflakes show up as both strings and ints depending on where they come from
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+
+    return value
+
+
+class _Waiter:
+    __slots__ = ("future", "check", "values")
+
+    def __init__(self, future: asyncio.Future[Any], check: Optional[Callable[..., bool]], values: Tuple[Any, ...]):
+        self.future = future
+        self.check = check
+        self.values = values
+
+    def try_resolve(self, args: Tuple[Any, ...]) -> bool:
+        if self.future.done():
+            return True
+
+        try:
+            if self.check is not None and not self.check(*args):
+                return False
+        except Exception as e:
+            self.future.set_exception(e)
+            return True
+
+        if not args:
+            self.future.set_result(None)
+        elif len(args) == 1:
+            self.future.set_result(args[0])
+        else:
+            self.future.set_result(args)
+
+        return True
+
+
+class _EventWaiters:
+    """Every pending wait_for of one event, bucketed by the index values they were registered with."""
+
+    def __init__(self):
+        self.unindexed: List[_Waiter] = []
+        # index key names -> index values -> waiters
+        self.indexes: Dict[Tuple[str, ...], Dict[Tuple[Any, ...], List[_Waiter]]] = {}
+
+    def add(self, waiter: _Waiter, keys: Tuple[str, ...]):
+        if not keys:
+            self.unindexed.append(waiter)
+        else:
+            self.indexes.setdefault(keys, {}).setdefault(waiter.values, []).append(waiter)
+
+    def remove(self, waiter: _Waiter, keys: Tuple[str, ...]):
+        if not keys:
+            if waiter in self.unindexed:
+                self.unindexed.remove(waiter)
+            return
+
+        buckets = self.indexes.get(keys, {})
+        bucket = buckets.get(waiter.values, [])
+
+        if waiter in bucket:
+            bucket.remove(waiter)
+
+        if not bucket:
+            buckets.pop(waiter.values, None)
+
+        if not buckets:
+            self.indexes.pop(keys, None)
+
+    def resolve(self, args: Tuple[Any, ...]):
+        if self.unindexed:
+            self.unindexed = [waiter for waiter in self.unindexed if not waiter.try_resolve(args)]
+
+        if not self.indexes or not args:
+            return
+
+        for keys, buckets in list(self.indexes.items()):
+            values = tuple(_index_value(args[0], key) for key in keys)
+            bucket = buckets.get(values)
+
+            if bucket:
+                buckets[values] = [waiter for waiter in bucket if not waiter.try_resolve(args)]
+
+                if not buckets[values]:
+                    del buckets[values]
+
+            if not buckets:
+                del self.indexes[keys]
+
+    def __bool__(self) -> bool:
+        return bool(self.unindexed or self.indexes)
+
 
 class Dispatcher:
-    def __init__(self, cache: "Cache"):
+    """Parses gateway events and hands them to their callbacks.
+
+    By default every callback runs in its own task. Passing ``workers`` instead runs callbacks on that many
+    worker coroutines fed by a queue that holds at most ``max_queue_size`` callbacks, what happens once it
+    is full is decided by ``overflow``.
+
+    With ``ordered`` events are split into lanes by guild, events of the same guild run one after another
+    in the order discord sent them while different guilds still run in parallel.
+
+    Listeners subscribed with an ``executor`` run in a thread or process pool of ``executor_workers`` and
+    get a plain copy of the event instead of models.
+
+    Subscribing to ``raw_<event>`` gets an events decoded payload before any models are made, and ``raw_frame``
+    gets a :class:`RawFrame` of every event. Neither counts as wanting the event itself, so events that only
+    have raw listeners skip building models where the cache doesn't need them.
+
+    With ``stats`` every event received, parse and callback run is counted and timed, see :meth:`stats_snapshot`.
+    """
+
+    def __init__(
+        self,
+        cache: "Cache",
+        *,
+        workers: Optional[int] = None,
+        max_queue_size: int = 1000,
+        overflow: OverflowPolicy = OverflowPolicy.block,
+        droppable_events: Optional[Iterable[str]] = None,
+        ordered: bool = False,
+        stats: bool = False,
+        executor_workers: Optional[int] = None,
+    ):
         self.events: Dict[str, List[CoroFunc]] = defaultdict(list)
         self.cache = cache
 
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        self.overflow = overflow
+        self.droppable_events: Set[str] = set(droppable_events or ())
+        self.dropped_events = 0
+        # Set when a non droppable event got queued into a full queue, only then does drop_events block the reader
+        self._overflowed = False
+
+        self._queue: Deque[_Job] = deque()
+        self._queued = 0
+        self._worker_tasks: List[asyncio.Task[None]] = []
+        # Callbacks and cache fills running in their own task, kept so they aren't collected before finishing
+        self._tasks: Set[asyncio.Task[Any]] = set()
+        # Made once the workers start so they belong to the running loop
+        self._queue_ready: Optional[asyncio.Event] = None
+        self._has_capacity: Optional[asyncio.Event] = None
+
+        # Ordered mode keeps one lane of jobs per guild, each lane only ever runs one job at a time
+        self.ordered = ordered
+        self._lanes: Dict[Any, Deque[_Job]] = {}
+        self._ready_lanes: Deque[Any] = deque()
+        self._lane_key: Any = None
+
         self.event_parsers: Dict[str, Any] = {}
 
+        # Shards that haven't sent READY yet, "ready" is only dispatched once all of them have.
+        self._unready_shards: Set[int] = {0}
+
+        # Request members over the gateway as guilds come in instead of fetching them over REST
+        self.chunk_guilds: bool = False
+        self._member_chunks: Dict[str, MemberChunkIterator] = {}
+
+        self._waiters: Dict[str, _EventWaiters] = {}
+
+        # Events whose callbacks get merged results instead of every single event
+        self._coalescers: Dict[str, Coalescer] = {}
+        # event name -> filtered callback -> its own copy of the events coalescer
+        self._listener_coalescers: Dict[str, Dict[CoroFunc, Coalescer]] = {}
+
+        # event name -> callback -> the filter it was subscribed with
+        self._filters: Dict[str, Dict[CoroFunc, ListenerFilter]] = {}
+        # The raw event currently being handled, filters are only checked against its own payload
+        self._raw_event: Optional[str] = None
+        self._raw_data: Any = None
+
+        self.executors = ListenerExecutors(executor_workers)
+
+        self.stats: Optional[DispatcherStats] = DispatcherStats() if stats else None
+
         for attr, func in inspect.getmembers(self):
             if attr.startswith("parse_"):
                 self.event_parsers[attr[6:].upper()] = func
 
-    def add_callback(self, event_name: str, func: CoroFunc):
+    def add_callback(self, event_name: str, func: CoroFunc, *, filter: Optional[ListenerFilter] = None):
         self.events[event_name].append(func)
 
+        if filter is not None:
+            self._filters.setdefault(event_name, {})[func] = filter
+
         _log.info("Added callback for %r", event_name)
 
-    def subscribe(self, event_name: str, func: CoroFunc):
-        self.add_callback(event_name, func)
+    def subscribe(
+        self,
+        event_name: str,
+        func: CoroFunc,
+        *,
+        filter: Optional[ListenerFilter] = None,
+        executor: Optional[str] = None,
+    ):
+        if executor is not None:
+            func = ExecutorListener(func, executor, self.executors)
+
+        self.add_callback(event_name, func, filter=filter)
 
         _log.info("Subscribed to %r", event_name)
 
@@ -44,18 +348,473 @@ class Dispatcher:
         return self.events.get(event_name)
 
     def dispatch(self, event_name: str, *args, **kwargs):
+        waiters = self._waiters.get(event_name)
+
+        if waiters is not None:
+            waiters.resolve(args)
+
+            if not waiters:
+                del self._waiters[event_name]
+
+        coalescer = self._coalescers.get(event_name)
+
+        if coalescer is not None:
+            self._coalesce(event_name, coalescer, args)
+            return
+
+        self._dispatch_callbacks(event_name, *args, **kwargs)
+
+    def _coalesce(self, event_name: str, coalescer: Coalescer, args: Tuple[Any, ...]):
+        callbacks = self.get_event(event_name)
+
+        if not callbacks:
+            return
+
+        filters = self._filters.get(event_name)
+
+        if not filters:
+            coalescer.add(args)
+            return
+
+        # Filters have to be checked now, by the time the coalescer hands events out the payload is gone.
+        # Filtered listeners get a coalescer of their own so events they filter out never end up in their batches
+        if any(callback not in filters for callback in callbacks):
+            coalescer.add(args)
+
+        is_raw = event_name == self._raw_event
+        own = self._listener_coalescers.setdefault(event_name, {})
+
+        for callback, listener_filter in filters.items():
+            if is_raw and not self._matches(callback, listener_filter, self._raw_data):
+                continue
+
+            listener_coalescer = own.get(callback)
+
+            if listener_coalescer is None:
+                listener_coalescer = own[callback] = coalescer._clone()
+                listener_coalescer._bind(lambda *args, callback=callback: self._emit_coalesced(event_name, args, callback))
+
+            listener_coalescer.add(args)
+
+    def _emit_coalesced(self, event_name: str, args: Tuple[Any, ...], callback: Optional[CoroFunc] = None):
+        if callback is not None:
+            callbacks = [callback]
+        else:
+            filters = self._filters.get(event_name, {})
+            callbacks = [callback for callback in self.get_event(event_name) or () if callback not in filters]
+
+        for callback in callbacks:
+            if isinstance(callback, ExecutorListener):
+                self._schedule(event_name, callback, callback.snapshot(args), {})
+            else:
+                self._schedule(event_name, callback, args, {})
+
+    def _dispatch_callbacks(self, event_name: str, *args, **kwargs):
         event = self.get_event(event_name)
 
         if event is None:
             return
 
+        is_raw = event_name == self._raw_event
+        filters = self._filters.get(event_name) if is_raw else None
+
         for callback in event:
-            asyncio.create_task(callback(*args, **kwargs))
+            if filters:
+                listener_filter = filters.get(callback)
+
+                if listener_filter is not None and not self._matches(callback, listener_filter, self._raw_data):
+                    continue
+
+            if isinstance(callback, ExecutorListener):
+                # Snapshotted now, the models and raw payload may have changed by the time a pool gets to it
+                snapshot = callback.snapshot(args, self._raw_data) if is_raw else callback.snapshot(args)
+                self._schedule(event_name, callback, snapshot, {})
+            else:
+                self._schedule(event_name, callback, args, kwargs)
+
+        _log.debug("Dispatched event %r", event_name)
+
+    def coalesce(self, event_name: str, policy: Optional[Coalescer]):
+        """Sets how an events callbacks get merged, ``None`` goes back to calling them for every event.
+
+        Waiters still see every single event. Listeners subscribed with a filter coalesce on their own copy of
+        the policy, so they only get merged results of the events their filter lets through.
+        """
+        old = [self._coalescers.pop(event_name, None), *self._listener_coalescers.pop(event_name, {}).values()]
+
+        for coalescer in old:
+            if coalescer is not None:
+                coalescer.cancel()
+                coalescer.flush()
+
+        if policy is not None:
+            policy._bind(lambda *args: self._emit_coalesced(event_name, args))
+            self._coalescers[event_name] = policy
+
+    def _wanted(self, event_name: str, data: Any) -> bool:
+        """Whether anything at all listens to an event, checked against the raw payload before parsing it."""
+        if event_name in self._waiters:
+            return True
+
+        callbacks = self.events.get(event_name)
+
+        if not callbacks:
+            return False
+
+        filters = self._filters.get(event_name)
+
+        if not filters:
+            return True
+
+        return any(callback not in filters or self._matches(callback, filters[callback], data) for callback in callbacks)
+
+    def _matches(self, callback: CoroFunc, listener_filter: ListenerFilter, data: Any) -> bool:
+        # Filters run on the gateway reader, a check that raises only skips the event for its own listener
+        try:
+            return listener_filter.matches(data)
+        except Exception:
+            _log.exception("The filter of %r raised, skipping the event for it", callback)
+            return False
+
+    async def wait_for(
+        self,
+        event_name: str,
+        *,
+        check: Optional[Callable[..., bool]] = None,
+        timeout: Optional[float] = None,
+        **index: Any,
+    ) -> Any:
+        """Waits for the next ``event_name`` that passes ``check``.
+
+        Keyword arguments are index keys matched against the events first argument (its attribute, or key when
+        it is a raw dict), an event only runs the checks of waiters whose index values all match it.
+        """
+        keys = tuple(sorted(index))
+        values = tuple(int(v) if isinstance(v, str) and v.isdigit() else v for v in (index[key] for key in keys))
+
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), check, values)
+        waiters = self._waiters.setdefault(event_name, _EventWaiters())
+        waiters.add(waiter, keys)
+
+        try:
+            return await asyncio.wait_for(waiter.future, timeout)
+        finally:
+            waiters = self._waiters.get(event_name)
+
+            if waiters is not None:
+                waiters.remove(waiter, keys)
+
+                if not waiters:
+                    del self._waiters[event_name]
+
+    def handle_event(
+        self,
+        event_name: str,
+        data: Any,
+        *,
+        sequence: Optional[int] = None,
+        shard_id: int = 0,
+        frame: Union[str, bytes, None] = None,
+    ):
+        """Parses a raw gateway event and dispatches it, used by the gateway for every DISPATCH payload."""
+        lowered = event_name.lower()
+        stats = self.stats
+
+        if stats is not None:
+            stats.received(lowered)
+
+        raw_name = "raw_" + lowered
+        has_raw = raw_name in self.events or raw_name in self._waiters
+        has_frame = "raw_frame" in self.events or "raw_frame" in self._waiters
+
+        if (
+            event_name in _SKIPPABLE_PARSERS
+            and not (event_name == "MESSAGE_CREATE" and getattr(self.cache, "messages", None) is not None)
+            and not self._wanted(lowered, data)
+        ):
+            if not (has_raw or has_frame):
+                return
+
+            skip_parser = True
+        else:
+            skip_parser = False
+
+        if self.ordered:
+            self._lane_key = _lane_key(event_name, data)
+
+        self._raw_data = data
+
+        try:
+            if has_frame:
+                self.dispatch("raw_frame", RawFrame(event_name, sequence, shard_id, frame))
+
+            if has_raw:
+                # Set so listener filters get checked against the payload
+                self._raw_event = raw_name
+                self.dispatch(raw_name, data)
+
+            if skip_parser:
+                return
+
+            self._raw_event = lowered
+
+            parser = self.event_parsers.get(event_name)
+
+            if parser is None:
+                self.dispatch(lowered, data)
+            elif stats is None:
+                parser(data)
+            else:
+                start = time.perf_counter()
+
+                try:
+                    parser(data)
+                finally:
+                    stats.parsed(lowered, time.perf_counter() - start)
+        finally:
+            self._lane_key = None
+            self._raw_event = None
+            self._raw_data = None
+
+    def _schedule(self, event_name: str, callback: CoroFunc, args: Tuple[Any, ...], kwargs: Dict[str, Any]):
+        job: _Job = (event_name, callback, args, kwargs)
+
+        if self.workers is None:
+            if not self.ordered:
+                self._spawn(callback(*args, **kwargs) if self.stats is None else self._run_job(job), event_name)
+            elif self._add_to_lane(self._lane_key, job):
+                self._spawn(self._drain_lane(self._lane_key), event_name)
+
+            return
+
+        self._start_workers()
+
+        if self._queued >= self.max_queue_size:
+            if self.overflow is OverflowPolicy.drop_oldest:
+                self._drop_oldest()
+            elif self.overflow is OverflowPolicy.drop_events:
+                if event_name in self.droppable_events:
+                    self.dropped_events += 1
+                    return
+
+                self._overflowed = True
 
-        _log.info("Dispatched event %r", event_name)
+        if not self.ordered:
+            self._queue.append(job)
+        elif self._add_to_lane(self._lane_key, job):
+            self._ready_lanes.append(self._lane_key)
+
+        self._queued += 1
+        self._queue_ready.set()  # type: ignore
+
+        if self._queued >= self.max_queue_size:
+            self._has_capacity.clear()  # type: ignore
+
+    def _add_to_lane(self, key: Any, job: _Job) -> bool:
+        """Adds a job to a lane, returns ``True`` when the lane was idle and has to be started."""
+        lane = self._lanes.get(key)
+
+        if lane is None:
+            self._lanes[key] = deque((job,))
+            return True
+
+        lane.append(job)
+        return False
+
+    def _drop_oldest(self):
+        if not self.ordered:
+            self._queue.popleft()
+        else:
+            # Lanes waiting for a worker hold the oldest jobs, fall back to lanes that are running
+            key = self._ready_lanes[0] if self._ready_lanes else next(k for k, lane in self._lanes.items() if lane)
+            lane = self._lanes[key]
+            lane.popleft()
+
+            if not lane and key in self._ready_lanes:
+                self._ready_lanes.remove(key)
+                self._remove_lane(key, lane)
+
+        self._queued -= 1
+        self.dropped_events += 1
+
+    async def _run_job(self, job: _Job):
+        event_name, callback, args, kwargs = job
+
+        if self.stats is not None:
+            return await self._run_timed_job(job, self.stats)
+
+        try:
+            await callback(*args, **kwargs)
+        except Exception:
+            _log.exception("Callback %r for event %r raised an exception", callback, event_name)
+
+    async def _run_timed_job(self, job: _Job, stats: DispatcherStats):
+        event_name, callback, args, kwargs = job
+        callback_stats = stats.callback(event_name, callback)
+
+        callback_stats.in_flight += 1
+        start = time.perf_counter()
+
+        try:
+            await callback(*args, **kwargs)
+        except Exception:
+            callback_stats.exceptions += 1
+            _log.exception("Callback %r for event %r raised an exception", callback, event_name)
+        finally:
+            callback_stats.in_flight -= 1
+            callback_stats.timings.record(time.perf_counter() - start)
+
+    def _spawn(self, coro: Coroutine[Any, Any, Any], name: str):
+        task = asyncio.create_task(coro, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task[Any]):
+        self._tasks.discard(task)
+
+        if not task.cancelled() and task.exception() is not None:
+            _log.error("Task for %r raised an exception", task.get_name(), exc_info=task.exception())
+
+    async def _drain_lane(self, key: Any):
+        lane = self._lanes.get(key)
+
+        if lane is None:  # Closed before the drain got to run
+            return
+
+        while lane:
+            await self._run_job(lane.popleft())
+
+        self._remove_lane(key, lane)
+
+    def _remove_lane(self, key: Any, lane: Deque[_Job]):
+        # close() may have cleared the lanes already and a new lane may have taken the key since
+        if self._lanes.get(key) is lane:
+            del self._lanes[key]
+
+    def _start_workers(self):
+        if self._worker_tasks:
+            return
+
+        self._queue_ready = asyncio.Event()
+        self._has_capacity = asyncio.Event()
+        self._has_capacity.set()
+
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers or 0)]
+
+    async def _worker(self):
+        queue_ready = cast(asyncio.Event, self._queue_ready)
+        has_capacity = cast(asyncio.Event, self._has_capacity)
+
+        while True:
+            if not (self._ready_lanes if self.ordered else self._queue):
+                queue_ready.clear()
+                await queue_ready.wait()
+                continue
+
+            if self.ordered:
+                key = self._ready_lanes.popleft()
+                lane = self._lanes[key]
+                job = lane.popleft()
+            else:
+                key = lane = None
+                job = self._queue.popleft()
+
+            self._queued -= 1
+
+            if self._queued < self.max_queue_size:
+                has_capacity.set()
+
+            await self._run_job(job)
+
+            if lane is not None:
+                # Other workers never touch a lane that isn't ready, so it is safe to hand it back or drop it here
+                if lane:
+                    self._ready_lanes.append(key)
+                    queue_ready.set()
+                else:
+                    self._remove_lane(key, lane)
+
+    async def wait_for_capacity(self):
+        """Waits until the dispatch queue has room again, returns right away when it isn't full.
+
+        With ``drop_events`` this only waits after a non droppable event had to be queued into a full queue,
+        droppable events never stop the reader.
+        """
+        if self._has_capacity is None or self.overflow is OverflowPolicy.drop_oldest:
+            return
+
+        if self.overflow is OverflowPolicy.drop_events:
+            if not self._overflowed:
+                return
+
+            self._overflowed = False
+
+        await self._has_capacity.wait()
+
+    @property
+    def queue_depth(self) -> int:
+        """The amount of callbacks waiting for a worker."""
+        return self._queued
+
+    def stats_snapshot(self) -> Dict[str, Any]:
+        """Returns the dispatchers stats as plain dicts.
+
+        ``events`` maps every event name to how often it was received, how long parsing it took and, per
+        callback, its call count, exceptions, how many calls are running right now and a latency histogram.
+
+        Raises
+        -------
+        RuntimeError
+            The dispatcher wasn't made with ``stats=True``.
+        """
+        if self.stats is None:
+            raise RuntimeError("Dispatcher stats are turned off, pass stats=True to turn them on")
+
+        return {
+            "events": self.stats.snapshot(),
+            "queue_depth": self._queued,
+            "dropped_events": self.dropped_events,
+            "lanes": len(self._lanes),
+        }
+
+    async def close(self):
+        for coalescer in self._coalescers.values():
+            coalescer.cancel()
+
+        for coalescers in self._listener_coalescers.values():
+            for coalescer in coalescers.values():
+                coalescer.cancel()
+
+        for task in (*self._worker_tasks, *self._tasks):
+            task.cancel()
+
+        self.executors.shutdown()
+
+        self._worker_tasks = []
+        self._tasks.clear()
+        self._queue.clear()
+
+        # Lanes that are draining right now hold on to their deque, emptying it stops them after their current job
+        for lane in self._lanes.values():
+            lane.clear()
+
+        self._lanes.clear()
+        self._ready_lanes.clear()
+        self._queued = 0
 
     def parse_ready(self, data):
-        self.dispatch("ready")
+        shard_id = data.get("shard", [0, 1])[0]
+
+        self.dispatch("shard_ready", shard_id)
+        self._shard_settled(shard_id)
+
+    def _shard_settled(self, shard_id: int):
+        # A shard that sent READY, or one that stopped for good and never will
+        if shard_id in self._unready_shards:
+            self._unready_shards.discard(shard_id)
+
+            if not self._unready_shards:
+                self.dispatch("ready")
 
     def parse_interaction_create(self, data: Dict[str, Any]):
         interaction = Interaction(data, self.cache)
@@ -63,38 +822,140 @@ class Dispatcher:
         self.dispatch("interaction_create", interaction)
 
     def parse_guild_create(self, data: Dict[str, Any]):
-        guild = Guild(data, self.cache)
+        guild = self.cache.add_guild_payload(data)
 
-        asyncio.create_task(self.cache._handle_guild_caching(data))
+        # Only go over REST for whatever GUILD_CREATE didn't include
+        missing = self.cache._missing_guild_data(data, fetch_members=not self.chunk_guilds)
+
+        if missing:
+            self._spawn(self.cache.populate_server(guild.id, **missing), "guild_create")
 
         self.dispatch("guild_create", guild)
 
     def parse_message_create(self, data: Dict[str, Any]):
-        message = Message(data, self.cache)
+        message = self.cache.add_message(data)
 
         self.dispatch("message_create", message)
 
+    def parse_message_update(self, data: Dict[str, Any]):
+        message = self.cache.update_message(data)
+
+        # Updates are partial, without a cached message to patch listeners get the payload
+        self.dispatch("message_update", message or data)
+
+    def parse_message_delete(self, data: Dict[str, Any]):
+        message = self.cache.remove_message(int(data["id"]))
+
+        self.dispatch("message_delete", message or data)
+
+    def parse_message_delete_bulk(self, data: Dict[str, Any]):
+        messages = [
+            self.cache.remove_message(int(message_id))
+            or {"id": message_id, "channel_id": data["channel_id"], "guild_id": data.get("guild_id")}
+            for message_id in data["ids"]
+        ]
+
+        self.dispatch("message_delete_bulk", messages)
+
     def parse_guild_member_add(self, data: Dict[str, Any]):
-        member = self.cache.add_member(int(data["guild_id"]), data) 
+        member = self.cache.add_member(int(data["guild_id"]), data)
 
         self.dispatch("guild_member_add", member)
 
+    def parse_guild_members_chunk(self, data: Dict[str, Any]):
+        members = self.cache.add_members(int(data["guild_id"]), data["members"])
+
+        nonce = data.get("nonce")
+
+        if nonce is not None and nonce in self._member_chunks:
+            self._member_chunks[nonce]._feed(data, members)
+
+        self.dispatch("guild_members_chunk", members)
+
+    def parse_guild_update(self, data: Dict[str, Any]):
+        guild = self.cache.update_guild(data) or Guild(data, self.cache)
+
+        self.dispatch("guild_update", guild)
+
     def parse_guild_delete(self, data: Dict[str, Any]):
-        self.cache.remove_guild(int(data["id"]))
+        guild_id = int(data["id"])
+
+        if data.get("unavailable"):
+            # An outage, the guild comes back with a GUILD_CREATE so keep what is cached
+            guild = self.cache.update_guild({"id": guild_id, "unavailable": True})
+        else:
+            guild = self.cache.remove_guild(guild_id)
 
-        guild = Guild(data, self.cache)
+        self.dispatch("guild_delete", guild or Guild(data, self.cache))
 
-        self.dispatch("guild_delete", guild)
+    def parse_guild_member_update(self, data: Dict[str, Any]):
+        member = self.cache.update_member(int(data["guild_id"]), data)
+
+        self.dispatch("guild_member_update", member or data)
 
     def parse_guild_member_remove(self, data: Dict[str, Any]):
         member = self.cache.remove_member(int(data["guild_id"]), int(data["user"]["id"]))
 
+        self.dispatch("guild_member_remove", member or User(data["user"], self.cache))
+
+    def parse_guild_role_create(self, data: Dict[str, Any]):
+        role = self.cache.add_role(int(data["guild_id"]), data["role"])
+
+        self.dispatch("guild_role_create", role)
+
+    def parse_guild_role_update(self, data: Dict[str, Any]):
+        role = self.cache.update_role(int(data["guild_id"]), data["role"])
+
+        self.dispatch("guild_role_update", role)
+
+    def parse_guild_role_delete(self, data: Dict[str, Any]):
+        role = self.cache.remove_role(int(data["guild_id"]), int(data["role_id"]))
+
+        self.dispatch("guild_role_delete", role or data)
+
+    def parse_user_update(self, data: Dict[str, Any]):
+        user = self.cache.update_user(data)
+
+        self.dispatch("user_update", user)
+
+    def parse_channel_create(self, data: Dict[str, Any]):
+        if data.get("guild_id") is None:
+            self.dispatch("channel_create", check_channel_type(data, self.cache) or data)
+            return
+
+        channel = self.cache.add_channel(int(data["guild_id"]), data)
 
-        self.dispatch("guild_member_remove", member)
+        self.dispatch("channel_create", channel)
+
+    def parse_channel_update(self, data: Dict[str, Any]):
+        if data.get("guild_id") is None:
+            self.dispatch("channel_update", check_channel_type(data, self.cache) or data)
+            return
+
+        channel = self.cache.update_channel(int(data["guild_id"]), data)
+
+        self.dispatch("channel_update", channel)
 
     def parse_channel_delete(self, data: Dict[str, Any]):
-        self.cache.remove_channel(int(data["guild_id"]), int(data["id"]))
+        if data.get("guild_id") is None:
+            self.dispatch("channel_delete", check_channel_type(data, self.cache) or data)
+            return
+
+        channel = self.cache.remove_channel(int(data["guild_id"]), int(data["id"]))
+
+        self.dispatch("channel_delete", channel or TextChannel(data, self.cache))
+
+    def parse_thread_create(self, data: Dict[str, Any]):
+        thread = self.cache.add_channel(int(data["guild_id"]), data)
+
+        self.dispatch("thread_create", thread)
+
+    def parse_thread_update(self, data: Dict[str, Any]):
+        thread = self.cache.update_channel(int(data["guild_id"]), data)
+
+        self.dispatch("thread_update", thread)
 
-        channel = TextChannel(data, self.cache)
+    def parse_thread_delete(self, data: Dict[str, Any]):
+        thread = self.cache.remove_channel(int(data["guild_id"]), int(data["id"]))
 
-        self.dispatch("channel_delete", channel)
+        self.dispatch("thread_delete", thread or TextChannel(data, self.cache))
@@ -50,3 +50,22 @@ class ChannelTypes(Enum):
 
     def __int__(self) -> int:
         return self.value
+
+
+class ShardStatus(Enum):
+    disconnected = "disconnected"
+    connecting = "connecting"
+    identifying = "identifying"
+    resuming = "resuming"
+    ready = "ready"
+    # Closed with a fatal close code or an unexpected error, it won't reconnect
+    failed = "failed"
+
+
+class OverflowPolicy(Enum):
+    # Stop reading from the gateway until the dispatch queue has room again
+    block = "block"
+    # Throw away the oldest queued callback to make room
+    drop_oldest = "drop_oldest"
+    # Throw away new events listed as droppable, block for everything else
+    drop_events = "drop_events"
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import struct
+import zlib
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+__all__ = ("ETFCodec",)
+
+try:
+    import earl
+except ImportError:
+    earl = None
+
+
+FORMAT_VERSION = 131
+
+NEW_FLOAT_EXT = 70
+COMPRESSED = 80
+SMALL_INTEGER_EXT = 97
+INTEGER_EXT = 98
+FLOAT_EXT = 99
+ATOM_EXT = 100
+SMALL_TUPLE_EXT = 104
+LARGE_TUPLE_EXT = 105
+NIL_EXT = 106
+STRING_EXT = 107
+LIST_EXT = 108
+BINARY_EXT = 109
+SMALL_BIG_EXT = 110
+LARGE_BIG_EXT = 111
+SMALL_ATOM_EXT = 115
+MAP_EXT = 116
+ATOM_UTF8_EXT = 118
+SMALL_ATOM_UTF8_EXT = 119
+
+_ATOMS: Dict[str, Any] = {"nil": None, "true": True, "false": False}
+
+_unpack_uint16 = struct.Struct(">H").unpack_from
+_unpack_uint32 = struct.Struct(">I").unpack_from
+_unpack_int32 = struct.Struct(">i").unpack_from
+_unpack_double = struct.Struct(">d").unpack_from
+
+Data = Union[bytes, bytearray, memoryview]
+
+
+class _Decoder:
+    # Decodes what earl-etf can't, it gives the same shapes back
+    def __init__(self, data: bytes):
+        self.data = data
+        self.offset = 0
+
+        self._tags: Dict[int, Callable[[], Any]] = {
+            NEW_FLOAT_EXT: self._new_float,
+            SMALL_INTEGER_EXT: self._small_integer,
+            INTEGER_EXT: self._integer,
+            FLOAT_EXT: self._float,
+            ATOM_EXT: self._atom,
+            SMALL_TUPLE_EXT: self._small_tuple,
+            LARGE_TUPLE_EXT: self._large_tuple,
+            NIL_EXT: self._nil,
+            STRING_EXT: self._string,
+            LIST_EXT: self._list,
+            BINARY_EXT: self._binary,
+            SMALL_BIG_EXT: self._small_big,
+            LARGE_BIG_EXT: self._large_big,
+            SMALL_ATOM_EXT: self._small_atom,
+            MAP_EXT: self._map,
+            ATOM_UTF8_EXT: self._atom,
+            SMALL_ATOM_UTF8_EXT: self._small_atom,
+        }
+
+    def decode(self) -> Any:
+        tag = self.data[self.offset]
+        self.offset += 1
+
+        try:
+            return self._tags[tag]()
+        except KeyError:
+            raise ValueError(f"Unknown ETF tag {tag} at offset {self.offset - 1}") from None
+
+    def _read(self, size: int) -> bytes:
+        start = self.offset
+        self.offset += size
+        return self.data[start : self.offset]
+
+    def _uint8(self) -> int:
+        value = self.data[self.offset]
+        self.offset += 1
+        return value
+
+    def _uint16(self) -> int:
+        value = _unpack_uint16(self.data, self.offset)[0]
+        self.offset += 2
+        return value
+
+    def _uint32(self) -> int:
+        value = _unpack_uint32(self.data, self.offset)[0]
+        self.offset += 4
+        return value
+
+    def _new_float(self) -> float:
+        value = _unpack_double(self.data, self.offset)[0]
+        self.offset += 8
+        return value
+
+    def _float(self) -> float:
+        return float(self._read(31).rstrip(b"\x00"))
+
+    def _small_integer(self) -> int:
+        return self._uint8()
+
+    def _integer(self) -> int:
+        value = _unpack_int32(self.data, self.offset)[0]
+        self.offset += 4
+        return value
+
+    def _big(self, size: int) -> int:
+        sign = self._uint8()
+        value = int.from_bytes(self._read(size), "little")
+        return -value if sign else value
+
+    def _small_big(self) -> int:
+        return self._big(self._uint8())
+
+    def _large_big(self) -> int:
+        return self._big(self._uint32())
+
+    def _to_atom(self, name: bytes) -> Any:
+        atom = name.decode("utf-8")
+        return _ATOMS.get(atom, atom)
+
+    def _atom(self) -> Any:
+        return self._to_atom(self._read(self._uint16()))
+
+    def _small_atom(self) -> Any:
+        return self._to_atom(self._read(self._uint8()))
+
+    def _small_tuple(self) -> Tuple[Any, ...]:
+        return tuple(self.decode() for _ in range(self._uint8()))
+
+    def _large_tuple(self) -> Tuple[Any, ...]:
+        return tuple(self.decode() for _ in range(self._uint32()))
+
+    def _nil(self) -> List[Any]:
+        return []
+
+    def _string(self) -> str:
+        # earl-etf decodes these as text too
+        return self._read(self._uint16()).decode("utf-8")
+
+    def _list(self) -> List[Any]:
+        items = [self.decode() for _ in range(self._uint32())]
+
+        # The tail of a proper list is always NIL_EXT
+        self.decode()
+
+        return items
+
+    def _binary(self) -> str:
+        return self._read(self._uint32()).decode("utf-8")
+
+    def _map(self) -> Dict[Any, Any]:
+        decode = self.decode
+        return {decode(): decode() for _ in range(self._uint32())}
+
+
+def _decode(data: bytes) -> Any:
+    if data[0] != FORMAT_VERSION:
+        raise ValueError(f"Unknown ETF format version {data[0]}")
+
+    if data[1] == COMPRESSED:
+        data = bytes((FORMAT_VERSION,)) + zlib.decompress(data[6:])
+
+    decoder = _Decoder(data)
+    decoder.offset = 1
+
+    return decoder.decode()
+
+
+class ETFCodec:
+    """Encodes and decodes the Erlang term format the gateway speaks with ``encoding=etf``.
+
+    Needs `earl-etf <https://pypi.org/project/earl-etf/>`_, which decodes in C. earl-etf doesn't know the UTF-8 atoms
+    OTP 26 and later send by default, frames with those are decoded in Python instead, which is several times slower.
+    Binaries come back as :class:`str` like they do with json, snowflakes come back as :class:`int` instead of strings.
+    """
+
+    name = "etf"
+
+    def __init__(self):
+        if earl is None:
+            raise RuntimeError("The etf encoding needs earl-etf, install it with `pip install wharf[etf]`")
+
+    def loads(self, data: Data) -> Any:
+        data = bytes(data)
+
+        try:
+            return earl.unpack(data, encoding="utf-8", encode_binary_ext=True)  # type: ignore
+        except earl.DecodeError:  # type: ignore
+            return _decode(data)
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        return earl.pack(obj)  # type: ignore
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import multiprocessing
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .impl.models.base import Model
+
+__all__ = ("ListenerExecutors",)
+
+EXECUTOR_KINDS = ("thread", "process")
+
+_PLAIN = (str, int, float, bool, type(None))
+_MISSING: Any = object()
+
+
+def _plain(value: Any) -> Any:
+    """Copies plain data, anything that isn't plain data becomes ``None`` so nothing tied to the cache comes along."""
+    if isinstance(value, _PLAIN):
+        return value
+
+    if isinstance(value, Enum):
+        return value.value
+
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [_plain(item) for item in value]
+
+    return None
+
+
+def snapshot(value: Any, *, nested: bool = True) -> Any:
+    """Turns a dispatched value into plain picklable data.
+
+    Models that kept their raw payload hand back a copy of it, other models become a dict of their
+    plain fields with the leading underscore stripped. Models a model points to, like a members user,
+    are snapshotted one level deep with only their plain values.
+    """
+    if isinstance(value, (dict, list, tuple, set, frozenset, Enum, *_PLAIN)):
+        return _plain(value)
+
+    raw = getattr(value, "_payload", None)
+
+    if isinstance(raw, dict):
+        return _plain(raw)
+
+    fields = getattr(value, "__dict__", None)
+
+    if fields is None:
+        # Slotted models keep their fields in slots spread over every class they inherit from
+        slots = [name for cls in type(value).__mro__ for name in getattr(cls, "__slots__", ())]
+        fields = {name: getattr(value, name, None) for name in slots if name not in ("cache", "_payload")}
+
+        if not fields:
+            return repr(value)
+
+    # Private containers are a models own caches, like a guilds members, which are far too big to copy
+    plain = {
+        name.lstrip("_"): _plain(field)
+        for name, field in fields.items()
+        if isinstance(field, (Enum, *_PLAIN))
+        or (nested and not name.startswith("_") and isinstance(field, (dict, list, tuple, set, frozenset)))
+    }
+
+    if nested:
+        for name, field in fields.items():
+            if isinstance(field, Model):
+                plain[name.lstrip("_")] = snapshot(field, nested=False)
+
+    return plain
+
+
+class ListenerExecutors:
+    """Owns the thread and process pools listeners registered with an ``executor`` run in.
+
+    Pools are only made the first time a listener needs them.
+
+    Parameters
+    -----------
+    max_workers: Optional[:class:`int`]
+        How many threads or processes each pool gets, defaults to what :mod:`concurrent.futures` picks.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers
+        self._pools: Dict[str, Executor] = {}
+
+    def _get_pool(self, kind: str) -> Executor:
+        pool = self._pools.get(kind)
+
+        if pool is None:
+            if kind == "thread":
+                pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix="wharf-listener")
+            else:
+                # Forking a process that runs an event loop and a websocket isn't safe
+                pool = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+            self._pools[kind] = pool
+
+        return pool
+
+    async def run(self, kind: str, func: Callable[..., Any], args: Tuple[Any, ...]) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._get_pool(kind), func, *args)
+
+    def shutdown(self):
+        for pool in self._pools.values():
+            if sys.version_info >= (3, 9):
+                pool.shutdown(wait=False, cancel_futures=True)
+            else:
+                pool.shutdown(wait=False)
+
+        self._pools.clear()
+
+
+class ExecutorListener:
+    """A plain function subscribed to an event that runs in one of the :class:`ListenerExecutors` pools."""
+
+    def __init__(self, func: Callable[..., Any], kind: str, executors: ListenerExecutors):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"executor has to be one of {EXECUTOR_KINDS}, not {kind!r}")
+
+        if inspect.iscoroutinefunction(func):
+            raise TypeError("Listeners ran in an executor have to be regular functions, not coroutines")
+
+        functools.update_wrapper(self, func)
+        self.func = func
+        self.kind = kind
+        self.executors = executors
+
+    def snapshot(self, args: Tuple[Any, ...], raw: Any = _MISSING) -> Tuple[Any, ...]:
+        if raw is not _MISSING:
+            return (_plain(raw),)
+
+        return tuple(snapshot(arg) for arg in args)
+
+    async def __call__(self, *args: Any) -> Any:
+        return await self.executors.run(self.kind, self.func, args)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Optional, Tuple, Union
+
+__all__ = ("ListenerFilter",)
+
+Snowflakes = Union[int, str, Iterable[Union[int, str]]]
+
+
+def _snowflake_set(ids: Optional[Snowflakes]) -> Optional[FrozenSet[str]]:
+    if ids is None:
+        return None
+
+    if isinstance(ids, (int, str)):
+        return frozenset((str(ids),))
+
+    return frozenset(str(i) for i in ids)
+
+
+def _author(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    author = data.get("author") or data.get("user")
+
+    if author is None and data.get("member") is not None:
+        author = data["member"].get("user")
+
+    return author
+
+
+class ListenerFilter:
+    """Decides whether a listener cares about an event by looking at the raw gateway payload.
+
+    Filters are checked before any models are made, so events nobody wants are thrown away for almost free.
+    Every option that is set has to match.
+
+    Parameters
+    -----------
+    guild_id: Optional[Union[:class:`int`, Iterable[:class:`int`]]]
+        Only events from these guilds.
+    channel_id: Optional[Union[:class:`int`, Iterable[:class:`int`]]]
+        Only events from these channels.
+    author_bot: Optional[:class:`bool`]
+        Only events whose author is (or isn't) a bot.
+    prefix: Optional[Union[:class:`str`, Tuple[:class:`str`, ...]]]
+        Only messages whose content starts with this.
+    check: Optional[Callable[[Dict[:class:`str`, Any]], :class:`bool`]]
+        Any other check to run against the raw payload.
+    """
+
+    __slots__ = ("guild_ids", "channel_ids", "author_bot", "prefix", "check")
+
+    def __init__(
+        self,
+        *,
+        guild_id: Optional[Snowflakes] = None,
+        channel_id: Optional[Snowflakes] = None,
+        author_bot: Optional[bool] = None,
+        prefix: Optional[Union[str, Tuple[str, ...]]] = None,
+        check: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ):
+        self.guild_ids = _snowflake_set(guild_id)
+        self.channel_ids = _snowflake_set(channel_id)
+        self.author_bot = author_bot
+        self.prefix = prefix
+        self.check = check
+
+    def matches(self, data: Any) -> bool:
+        if not isinstance(data, dict):
+            return True
+
+        if self.guild_ids is not None and str(data.get("guild_id")) not in self.guild_ids:
+            return False
+
+        if self.channel_ids is not None and str(data.get("channel_id")) not in self.channel_ids:
+            return False
+
+        if self.author_bot is not None:
+            author = _author(data)
+
+            if author is None or bool(author.get("bot", False)) != self.author_bot:
+                return False
+
+        if self.prefix is not None and not (data.get("content") or "").startswith(self.prefix):
+            return False
+
+        if self.check is not None and not self.check(data):
+            return False
+
+        return True
+
+    @classmethod
+    def from_options(cls, **options: Any) -> Optional[ListenerFilter]:
+        """Makes a filter out of listen() keyword arguments, returns ``None`` when none of them were set."""
+        if all(value is None for value in options.values()):
+            return None
+
+        return cls(**options)
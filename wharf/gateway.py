@@ -1,27 +1,47 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
+import os
 import random
 import time
+from collections import deque
 from sys import platform as _os
-from typing import TYPE_CHECKING, Any, Dict, Optional, cast
-from zlib import decompressobj
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Tuple, Union, cast
+from urllib.parse import urlencode, urlsplit, urlunsplit
 
 from aiohttp import ClientWebSocketResponse, WSMessage, WSMsgType
 
 from .activities import Activity
-from .dispatcher import Dispatcher
-from .errors import GatewayReconnect
+from .compression import Decompressor, make_decompressor, resolve_compression
+from .dispatcher import Dispatcher, MemberChunkIterator
+from .enums import ShardStatus
+from .errors import GatewayReconnect, WebsocketClosed
+from .etf import ETFCodec
+from .impl.ratelimit import GatewayRatelimiter
 from .types.gateway import GatewayData
 
 if TYPE_CHECKING:
-    from .impl import Cache
+    from .impl import Cache, IdentifyLimiter
 
 
 DEFAULT_API_VERSION = 10
 
+# Close codes that mean reconnecting won't ever work
+FATAL_CLOSE_CODES = {
+    4004: "Authentication failed",
+    4010: "Invalid shard",
+    4011: "Sharding required",
+    4012: "Invalid API version",
+    4013: "Invalid intents",
+    4014: "Disallowed intents",
+}
+# Close codes that invalidate the session, a new one has to be identified
+NEW_SESSION_CLOSE_CODES = {4007, 4009}
+
+# How much each new heartbeat latency sample counts towards the average
+LATENCY_SMOOTHING = 0.2
+
 _log = logging.getLogger(__name__)
 
 
@@ -39,14 +59,41 @@ class OPCodes:
     HEARTBEAT_ACK = 11
 
 
+class SendPriority:
+    HEARTBEAT = 0
+    IDENTIFY = 1
+    REQUEST_MEMBERS = 2
+    NORMAL = 3
+    PRESENCE = 4
+
+
+_PRIORITIES = {
+    OPCodes.HEARTBEAT: SendPriority.HEARTBEAT,
+    OPCodes.IDENTIFY: SendPriority.IDENTIFY,
+    OPCodes.RESUME: SendPriority.IDENTIFY,
+    OPCodes.REQUEST_GUILD_MEMBERS: SendPriority.REQUEST_MEMBERS,
+    OPCodes.PRESENCE_UPDATE: SendPriority.PRESENCE,
+}
+
+_Outgoing = Tuple[Dict[str, Any], List["asyncio.Future[None]"]]
+
+
 class Gateway:  # This Class is in no way supposed to be used by itself. it should ALWAYS be used with `wharf.Bot`. so seriously, dont :sob:
     if TYPE_CHECKING:
         ws: ClientWebSocketResponse
         heartbeat_interval: int
-        resume_url: str
-        last_sequence: int
 
-    def __init__(self, dispatcher: Dispatcher, cache: Cache):
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        cache: Cache,
+        *,
+        shard_id: int = 0,
+        shard_count: int = 1,
+        identify_ratelimiter: Optional[IdentifyLimiter] = None,
+        compress: Optional[str] = "auto",
+        encoding: str = "json",
+    ):
         self._dispatcher = dispatcher
         self._cache = cache
         self._http = self._cache.http
@@ -55,24 +102,63 @@ class Gateway:  # This Class is in no way supposed to be used by itself. it shou
         self.token = self._cache.http._token
         self.intents = self._cache.http._intents
 
-        self.inflator = decompressobj()
+        # "auto" is resolved here so every connection this gateway makes uses the same compression
+        self.compress = resolve_compression(compress)
+        self._decompressor: Optional[Decompressor] = None
 
+        if encoding not in ("json", "etf"):
+            raise ValueError(f"Unsupported gateway encoding {encoding!r}")
+
+        self.encoding = encoding
+        self._etf = ETFCodec() if encoding == "etf" else None
+
+        self.shard_id = shard_id
+        self.shard_count = shard_count
+        self._identify_ratelimiter = identify_ratelimiter
+        self.status = ShardStatus.disconnected
+
+        self.ws = None  # type: ignore
         self.resume: bool = False
-        self._first_heartbeat = True
+        self.session_id: Optional[str] = None
+        self.resume_url: Optional[str] = None
+        self.last_sequence: Optional[int] = None
+        # The last frame received, decompressed but not decoded yet
+        self.raw_frame: Union[str, bytes, None] = None
+
+        self._heartbeat_task: Optional[asyncio.Task[None]] = None
+        self._heartbeat_acked = True
+        self._last_heartbeat_send: Optional[float] = None
+        self._last_heartbeat_ack: Optional[float] = None
+        self._latency: Optional[float] = None
+        self._average_latency: Optional[float] = None
+
+        # Outgoing commands wait here until the ratelimiter lets them through, most urgent lane first.
+        self._ratelimiter = GatewayRatelimiter()
+        self._lanes: List[Deque[_Outgoing]] = [deque() for _ in range(SendPriority.PRESENCE)]
+        # Only the newest presence is worth sending so they replace each other instead of queueing
+        self._pending_presence: Optional[_Outgoing] = None
+        self._send_event = asyncio.Event()
+        self._send_task: Optional[asyncio.Task[None]] = None
 
-    def decompress_data(self, data: bytes):
-        ZLIB_SUFFIX = b"\x00\x00\xff\xff"
+    def decompress_data(self, data: bytes) -> Optional[bytes]:
+        """Feeds a binary frame into the compression stream, returns ``None`` until a full message has been received."""
+        if self._decompressor is None:
+            return data
 
-        out_str: str = ""
+        return self._decompressor.decompress(data)
 
-        # Message should be compressed
-        if len(data) < 4 or data[-4:] != ZLIB_SUFFIX:
-            return out_str
+    def _reset_compression(self):
+        self._decompressor = make_decompressor(self.compress) if self.compress is not None else None
 
-        buff = self.inflator.decompress(data)
-        out_str = buff.decode("utf-8")
+    def _build_url(self, url: str) -> str:
+        params = {"v": DEFAULT_API_VERSION, "encoding": self.encoding}
 
-        return out_str
+        if self.compress is not None:
+            params["compress"] = self.compress
+
+        scheme, netloc, path, _, _ = urlsplit(url)
+
+        return urlunsplit((scheme, netloc, path or "/", urlencode(params), ""))
 
     @property
     def ping_payload(self):
@@ -89,6 +175,7 @@ class Gateway:  # This Class is in no way supposed to be used by itself. it shou
                 "intents": self.intents,
                 "properties": {"os": _os, "browser": "wharf", "device": "wharf"},
                 "large_threshold": 250,
+                "shard": [self.shard_id, self.shard_count],
             },
         }
 
@@ -106,6 +193,62 @@ class Gateway:  # This Class is in no way supposed to be used by itself. it shou
             },
         }
 
+    def request_members_payload(
+        self,
+        guild_id: int,
+        *,
+        query: Optional[str] = None,
+        limit: int = 0,
+        user_ids: Optional[List[int]] = None,
+        presences: bool = False,
+        nonce: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"guild_id": str(guild_id), "limit": limit, "presences": presences}
+
+        if user_ids is not None:
+            data["user_ids"] = [str(user_id) for user_id in user_ids]
+        else:
+            data["query"] = query or ""
+
+        if nonce is not None:
+            data["nonce"] = nonce
+
+        return {"op": OPCodes.REQUEST_GUILD_MEMBERS, "d": data}
+
+    def request_members(
+        self,
+        guild_id: int,
+        *,
+        query: Optional[str] = None,
+        limit: int = 0,
+        user_ids: Optional[List[int]] = None,
+        presences: bool = False,
+        timeout: Optional[float] = 30.0,
+    ) -> MemberChunkIterator:
+        """Requests a guilds members over the gateway and streams back the chunks discord answers with.
+
+        Parameters
+        -----------
+        guild_id: :class:`int`
+            The id of the guild to request members from, has to be on this shard.
+        query: Optional[:class:`str`]
+            Only return members whose username starts with this. Leave empty with a limit of 0 for every member.
+        limit: :class:`int`
+            The max amount of members to return, 0 for no limit.
+        user_ids: Optional[List[:class:`int`]]
+            The ids of specific members to return instead of using a query.
+        presences: :class:`bool`
+            Whether discord should send the members presences along.
+        timeout: Optional[:class:`float`]
+            How long to wait for each chunk.
+        """
+        nonce = os.urandom(8).hex()
+        payload = self.request_members_payload(
+            guild_id, query=query, limit=limit, user_ids=user_ids, presences=presences, nonce=nonce
+        )
+
+        return MemberChunkIterator(self._dispatcher, nonce, lambda: self.send(payload), timeout=timeout)
+
     async def _change_presence(self, *, status: str, activity: Optional[Activity] = None):
         activities = []
         if activity is not None:
@@ -121,47 +264,218 @@ class Gateway:  # This Class is in no way supposed to be used by itself. it shou
             },
         }
 
-        await self.ws.send_json(payload)
+        await self.send(payload)
+
+    async def _send_payload(self, payload: Dict[str, Any]):
+        if payload["op"] == OPCodes.HEARTBEAT:
+            self._last_heartbeat_send = time.perf_counter()
+
+        if self._etf is not None:
+            await self.ws.send_bytes(self._etf.dumps_bytes(payload))
+        else:
+            await self.ws.send_str(self._http.codec.dumps(payload))
 
     async def send(self, payload: Dict[str, Any]):
-        if not self.ws:
+        """Queues a command and waits until it has been sent.
+
+        Commands go out in order of urgency (heartbeats, identifies/resumes, member requests, everything else, presences)
+        while staying under the gateway ratelimit. Presence updates replace any presence that hasn't been sent yet.
+        """
+        if not self.ws or self.is_closed:
             return
 
-        await self.ws.send_json(payload)
+        await self._enqueue(payload)
+
+    def _enqueue(self, payload: Dict[str, Any]) -> asyncio.Future[None]:
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        priority = _PRIORITIES.get(payload["op"], SendPriority.NORMAL)
+
+        if priority == SendPriority.PRESENCE:
+            if self._pending_presence is not None:
+                self._pending_presence = (payload, self._pending_presence[1] + [future])
+            else:
+                self._pending_presence = (payload, [future])
+        else:
+            self._lanes[priority].append((payload, [future]))
+
+        self._send_event.set()
+
+        return future
+
+    def _enqueue_nowait(self, payload: Dict[str, Any]):
+        """Queues a command nothing waits on, failures get logged instead of going unnoticed."""
+        self._enqueue(payload).add_done_callback(self._log_send_error)
+
+    def _log_send_error(self, future: asyncio.Future[None]):
+        if not future.cancelled() and future.exception() is not None:
+            _log.error("Shard %d failed to send a command", self.shard_id, exc_info=future.exception())
+
+    def _next_outgoing(self) -> Tuple[Optional[_Outgoing], int]:
+        for priority, lane in enumerate(self._lanes):
+            if lane:
+                return lane[0], priority
+
+        return self._pending_presence, SendPriority.PRESENCE
+
+    def _pop_outgoing(self, priority: int):
+        if priority == SendPriority.PRESENCE:
+            self._pending_presence = None
+        else:
+            self._lanes[priority].popleft()
+
+    async def _send_loop(self):
+        while not self.is_closed:
+            outgoing, priority = self._next_outgoing()
+
+            if outgoing is None:
+                self._send_event.clear()
+                await self._send_event.wait()
+                continue
+
+            delay = self._ratelimiter.delay(urgent=priority <= SendPriority.IDENTIFY)
+
+            if delay > 0:
+                # Wake up early if something more urgent gets queued in the meantime
+                self._send_event.clear()
+
+                try:
+                    await asyncio.wait_for(self._send_event.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+
+                continue
+
+            self._pop_outgoing(priority)
+            self._ratelimiter.record()
+
+            payload, waiters = outgoing
+
+            try:
+                await self._send_payload(payload)
+            except Exception as e:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(e)
+            else:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
 
-        _log.info("Sent payload json %s to the gateway.", payload)
+                _log.debug("Sent payload with op %d to the gateway.", payload["op"])
+
+    def _start_send_loop(self):
+        self._stop_send_loop()
+
+        # Discord ratelimits every connection separately
+        self._ratelimiter = GatewayRatelimiter()
+        self._send_task = asyncio.create_task(self._send_loop())
+
+    def _stop_send_loop(self):
+        if self._send_task is not None:
+            self._send_task.cancel()
+            self._send_task = None
+
+        outgoing = [item for lane in self._lanes for item in lane]
+
+        if self._pending_presence is not None:
+            outgoing.append(self._pending_presence)
+
+        for lane in self._lanes:
+            lane.clear()
+
+        self._pending_presence = None
+
+        for _, waiters in outgoing:
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.cancel()
 
     async def receive(self):
         if not self.ws:
             return
 
-        msg: WSMessage = await self.ws.receive()
+        while True:
+            msg: WSMessage = await self.ws.receive()
+
+            if msg.type not in (WSMsgType.TEXT, WSMsgType.BINARY):
+                return
 
-        if msg.type in (WSMsgType.TEXT, WSMsgType.BINARY):
-            received_msg: str
+            received_msg: Optional[Union[str, bytes]]
 
             if msg.type == WSMsgType.BINARY:
                 received_msg = self.decompress_data(msg.data)
+
+                if received_msg is None:
+                    # Only part of a message, wait for the rest of it
+                    continue
             else:
                 received_msg = cast(str, msg.data)
 
-            self.gateway_payload = cast(GatewayData, json.loads(received_msg))
+            self.raw_frame = received_msg
 
-            self.last_sequence = self.gateway_payload.get("s")
+            if self._etf is not None:
+                self.gateway_payload = cast(GatewayData, self._etf.loads(received_msg))
+            else:
+                self.gateway_payload = cast(GatewayData, self._http.codec.loads(received_msg))
+
+            sequence = self.gateway_payload.get("s")
+
+            if sequence is not None:
+                self.last_sequence = sequence
 
             _log.debug("Received data from gateway: %s", self.gateway_payload)
 
             return True
 
     async def keep_heartbeat(self):
-        jitters = self.heartbeat_interval
-        if self._first_heartbeat:
-            jitters *= random.uniform(1.0, 0.0)
-            self._first_heartbeat = False
+        """Heartbeats for as long as the current connection lives. Only one of these ever runs per connection."""
+        interval = self.heartbeat_interval / 1000
+
+        # Jitter the first heartbeat so shards that connected together don't all beat at once
+        await asyncio.sleep(interval * random.random())
+
+        while not self.is_closed:
+            if not self._heartbeat_acked:
+                # Discord never acknowledged the last heartbeat so this connection is a zombie, force a resume
+                _log.warning("Shard %d missed a heartbeat ACK, reconnecting.", self.shard_id)
+
+                self.resume = self.session_id is not None
+                await self.ws.close(code=4000)
+                return
+
+            self._heartbeat_acked = False
+            await self._send_heartbeat()
+            await asyncio.sleep(interval)
+
+    async def _send_heartbeat(self):
+        await self.send(self.ping_payload)
+
+    def _ack_heartbeat(self):
+        self._heartbeat_acked = True
+        self._last_heartbeat_ack = time.perf_counter()
+
+        if self._last_heartbeat_send is None:
+            return
+
+        self._latency = self._last_heartbeat_ack - self._last_heartbeat_send
+
+        if self._average_latency is None:
+            self._average_latency = self._latency
+        else:
+            self._average_latency += LATENCY_SMOOTHING * (self._latency - self._average_latency)
+
+    def _start_heartbeat(self):
+        self._stop_heartbeat()
+
+        self._heartbeat_acked = True
+        self._heartbeat_task = asyncio.create_task(self.keep_heartbeat())
 
-        await self.ws.send_json(self.ping_payload)
-        await asyncio.sleep(jitters / 1000)
-        asyncio.create_task(self.keep_heartbeat())
+    def _stop_heartbeat(self):
+        if self._heartbeat_task is not None:
+            if self._heartbeat_task is not asyncio.current_task():
+                self._heartbeat_task.cancel()
+
+            self._heartbeat_task = None
 
     async def connect(self, url: Optional[str] = None):
         if not url:
@@ -169,9 +483,12 @@ class Gateway:  # This Class is in no way supposed to be used by itself. it shou
         else:
             self.url = url
 
-        self.ws = await self._http._session.ws_connect(self.url)
+        self.status = ShardStatus.connecting
+        # Every connection starts a brand new compression stream
+        self._reset_compression()
+        self.ws = await self._http._session.ws_connect(self._build_url(self.url))
 
-        _log.info(url)
+        _log.info("Shard %d connected to %s", self.shard_id, self.url)
 
         msg = await self.receive()
 
@@ -183,11 +500,18 @@ class Gateway:  # This Class is in no way supposed to be used by itself. it shou
             # Disconnect and DO NOT ATTEMPT a reconnection
             return await self.close(resume=False)
 
-        asyncio.create_task(self.keep_heartbeat())
+        self._start_send_loop()
+        self._start_heartbeat()
 
         if self.resume:
+            self.status = ShardStatus.resuming
             await self.send(self.resume_payload)
         else:
+            self.status = ShardStatus.identifying
+
+            if self._identify_ratelimiter is not None:
+                await self._identify_ratelimiter.acquire(self.shard_id)
+
             await self.send(self.identify_payload)
 
         return await self.listen_for_events()
@@ -196,6 +520,24 @@ class Gateway:  # This Class is in no way supposed to be used by itself. it shou
         if not self.ws:
             return
 
+        try:
+            await self._listen_for_events()
+        finally:
+            self._stop_heartbeat()
+            self._stop_send_loop()
+
+        code = self.ws.close_code
+
+        if code in FATAL_CLOSE_CODES:
+            raise WebsocketClosed(code, FATAL_CLOSE_CODES[code])
+
+        # Closed by discord or by a missed heartbeat, resume if the session is still around
+        if code in NEW_SESSION_CLOSE_CODES:
+            self.resume = False
+        elif code != 1000:
+            self.resume = self.session_id is not None
+
+    async def _listen_for_events(self):
         while not self.is_closed:
             res = await self.receive()
 
@@ -207,31 +549,44 @@ class Gateway:  # This Class is in no way supposed to be used by itself. it shou
                     if event_name == "READY":
                         self.session_id = event_data["session_id"]
                         self.resume_url = event_data["resume_gateway_url"]
+                        self.status = ShardStatus.ready
+
+                    if event_name == "GUILD_CREATE" and self._dispatcher.chunk_guilds and event_data.get("large"):
+                        # Small guilds send every member in GUILD_CREATE already.
+                        # Chunks are fed into the cache by the dispatcher, nothing has to wait on them here
+                        self._enqueue_nowait(self.request_members_payload(int(event_data["id"])))
 
                     if event_name == "RESUMED":
-                        _log.info("RESUMED!")
+                        self.status = ShardStatus.ready
+                        _log.info("Shard %d RESUMED!", self.shard_id)
 
 
-                    try:
-                        event = self._dispatcher.event_parsers[event_name]
-                    except KeyError:
-                        self._dispatcher.dispatch(event_name.lower(), event_data)
-                    else:
-                        event(event_data)
+                    self._dispatcher.handle_event(
+                        event_name,
+                        event_data,
+                        sequence=self.gateway_payload.get("s"),
+                        shard_id=self.shard_id,
+                        frame=self.raw_frame,
+                    )
+
+                    # Stops reading while the dispatcher is backed up so memory stays flat
+                    await self._dispatcher.wait_for_capacity()
 
                 elif self.gateway_payload["op"] == OPCodes.HEARTBEAT:
-                    await self.send(self.ping_payload)
+                    # Queued without waiting so reading never stalls behind the ratelimiter
+                    self._enqueue_nowait(self.ping_payload)
 
                 elif self.gateway_payload["op"] == OPCodes.RECONNECT:
                     _log.info("Gateway is reconnected! <3")
 
-                    await self.close(code=1012)
+                    self.resume = True
+                    await self.close(code=4000)
                     return
 
                 elif self.gateway_payload["op"] == OPCodes.HEARTBEAT_ACK:
-                    self._last_heartbeat_ack = time.perf_counter()
+                    self._ack_heartbeat()
 
-                    _log.info("Awknoledged heartbeat!")
+                    _log.debug("Shard %d acknowledged heartbeat!", self.shard_id)
 
                 elif self.gateway_payload["op"] == OPCodes.INVALID_SESSION:
                     self.resume = bool(self.gateway_payload.get("d"))
@@ -240,14 +595,28 @@ class Gateway:  # This Class is in no way supposed to be used by itself. it shou
                     return
 
     async def close(self, *, code: int = 1000, resume: bool = True):
+        self._stop_heartbeat()
+        self._stop_send_loop()
+
         if not self.ws:
             return
 
         if not self.is_closed:
             await self.ws.close(code=code)
+            self.status = ShardStatus.disconnected
 
             if resume:
-                raise GatewayReconnect(self.resume_url, resume)
+                raise GatewayReconnect(self.resume_url or self.url, resume)
+
+    @property
+    def latency(self) -> Optional[float]:
+        """The time in seconds between the last heartbeat and its acknowledgement, if there was one."""
+        return self._latency
+
+    @property
+    def average_latency(self) -> Optional[float]:
+        """An exponentially weighted moving average of the heartbeat latency in seconds."""
+        return self._average_latency
 
     @property
     def is_closed(self) -> bool:
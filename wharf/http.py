@@ -1,5 +1,4 @@
 import asyncio
-import json
 import logging
 import sys
 from dataclasses import dataclass
@@ -9,6 +8,7 @@ from urllib.parse import quote as urlquote
 import aiohttp
 
 from . import __version__
+from .codec import get_codec
 from .commands import InteractionCommand
 from .enums import MessageFlags
 from .errors import BucketMigrated, HTTPException, NotFound
@@ -73,25 +73,24 @@ class HTTPClient:
         self.loop = None
         self.ratelimiter = Ratelimiter()
         self.req_id = 0
+        self.codec = get_codec()
 
     def login(self, token: str, intents: int):
-        self._session = aiohttp.ClientSession(headers={"User-Agent": self.user_agent}, json_serialize=json.dumps)
+        self._session = aiohttp.ClientSession(headers={"User-Agent": self.user_agent}, json_serialize=self.codec.dumps)
 
         self._token = token
         self._intents = intents
         self.base_headers = {"Authorization": f"Bot {self._token}"}
 
-    @staticmethod
-    async def _text_or_json(resp: aiohttp.ClientResponse) -> Dict[str, Any]:
-        text = await resp.text()
+    async def _text_or_json(self, resp: aiohttp.ClientResponse) -> Dict[str, Any]:
+        body = await resp.read()
 
         if resp.content_type == "application/json":
-            return json.loads(text)
+            return self.codec.loads(body)
 
-        return text  # type: ignore
+        return body.decode(resp.get_encoding())  # type: ignore
 
-    @staticmethod
-    def _prepare_data(data: Optional[dict[str, Any]], files: Optional[List[File]]):
+    def _prepare_data(self, data: Optional[dict[str, Any]], files: Optional[List[File]]):
         pd = PreparedData()
 
         if data is not None and files is None:
@@ -100,7 +99,7 @@ class HTTPClient:
         if data is not None and files is not None:
             form_dat = aiohttp.FormData()
 
-            form_dat.add_field("payload_json", f"{json.dumps(data)}", content_type="application/json")
+            form_dat.add_field("payload_json", self.codec.dumps(data), content_type="application/json")
 
             for count, file in enumerate(files):
                 form_dat.add_field(f"files[{count}]", file.fp, filename=file.filename)
@@ -1,2 +1,5 @@
+from .messages import *
 from .models import *
+from .policies import *
 from .ratelimit import *
+from .storage import *
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import asyncio
 from logging import getLogger
-from typing import TYPE_CHECKING, Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Mapping, Optional
+from weakref import WeakValueDictionary
 
 import discord_typings as dt
 
-from ..impl import Guild, Member, Role, TextChannel, User
+from ..impl import Guild, Member, Message, Role, TextChannel, User
+from .messages import MessageCache
+from .policies import CachePolicy
+from .storage import GUILD_ENTITIES, Key, MemoryBackend, StorageBackend
 
 if TYPE_CHECKING:
     from ..http import HTTPClient
@@ -13,16 +18,220 @@ if TYPE_CHECKING:
 _log = getLogger(__name__)
 
 
+class _StoreView(Mapping[int, Any]):
+    # What the store attributes of the cache are on backends without dicts.
+    # Lookups, lengths and the guilds of per guild stores are all answered by the backend, nothing is scanned here
+    def __init__(self, cache: Cache, entity: str, guild_id: Optional[int] = None):
+        self._cache = cache
+        self._entity = entity
+        self._guild_id = guild_id
+
+    def _per_guild(self) -> bool:
+        return self._entity in GUILD_ENTITIES and self._guild_id is None
+
+    def __getitem__(self, key: int) -> Any:
+        if self._per_guild():
+            if not self._cache.storage.count(self._entity, guild_id=key):
+                raise KeyError(key)
+
+            return _StoreView(self._cache, self._entity, key)
+
+        value = self._cache._get(self._entity, key if self._guild_id is None else (self._guild_id, key))
+
+        if value is None:
+            raise KeyError(key)
+
+        return value
+
+    def __iter__(self) -> Iterator[int]:
+        if self._per_guild():
+            return self._cache.storage.guild_ids(self._entity)
+
+        return self._cache.storage.keys(self._entity, guild_id=self._guild_id)  # type: ignore
+
+    def __len__(self) -> int:
+        if self._per_guild():
+            return sum(1 for _ in self._cache.storage.guild_ids(self._entity))
+
+        return self._cache.storage.count(self._entity, guild_id=self._guild_id)
+
+
 class Cache:
-    def __init__(self, http: HTTPClient):
+    """
+    Holds every model the bot knows about.
+
+    Parameters
+    -----------
+    http: :class:`HTTPClient`
+        The http client models use for their requests.
+    keep_payloads: :class:`bool`
+        Keep the raw payload of every model around, for debugging.
+    policies: Optional[Dict[:class:`str`, :class:`CachePolicy`]]
+        How big stores can get and how long things stay in them, keyed by ``"users"``, ``"guilds"``,
+        ``"members"``, ``"channels"`` or ``"roles"``. Member, channel and role policies apply per guild.
+        Stores without one keep everything until discord says it's gone. Only the memory backend has policies.
+    max_messages: Optional[:class:`int`]
+        Keep this many of the newest messages around, see :class:`MessageCache`. Messages aren't cached without it.
+    max_messages_per_channel: :class:`int`
+        How many of those messages a single channel can keep.
+    storage: Optional[:class:`StorageBackend`]
+        Where users, guilds, members, channels and roles are kept, defaults to a :class:`MemoryBackend`.
+        Messages always stay in memory. Backends are called synchronously on the event loop.
+    """
+
+    def __init__(
+        self,
+        http: HTTPClient,
+        *,
+        keep_payloads: bool = False,
+        policies: Optional[Dict[str, CachePolicy]] = None,
+        max_messages: Optional[int] = None,
+        max_messages_per_channel: int = 100,
+        storage: Optional[StorageBackend] = None,
+    ):
         self.http = http
-        self.users: dict[dt.Snowflake, User] = {}
+        # Models normally drop their raw payloads once parsed, this keeps them around for debugging
+        self.keep_payloads = keep_payloads
+
+        # Users evicted by a users policy that members still point to, see `add_user`
+        self._user_refs: Optional[WeakValueDictionary[int, User]] = None
+
+        self.storage: StorageBackend = MemoryBackend()
+        self.set_storage(storage or self.storage)
+
+        self.messages: Optional[MessageCache] = None
+
+        if max_messages:
+            self.messages = MessageCache(max_messages, per_channel=max_messages_per_channel)
+
+        for store, policy in (policies or {}).items():
+            self.set_policy(store, policy)
+
+    def set_storage(self, storage: StorageBackend) -> None:
+        """
+        Switches the storage backend, meant to be called before anything is cached as nothing is moved over.
+
+        Parameters
+        -----------
+        storage: :class:`StorageBackend`
+            The new backend.
+        """
+        self.storage = storage
+
+        if isinstance(storage, MemoryBackend):
+            storage.on_guild_evict = self._forget_messages
+
+        self._track_users()
+
+    def set_policy(self, store: str, policy: Optional[CachePolicy]) -> None:
+        """
+        Sets or clears the policy of a store, whatever is cached already is moved over and trimmed to fit.
+
+        Parameters
+        -----------
+        store: :class:`str`
+            One of ``"users"``, ``"guilds"``, ``"members"``, ``"channels"`` or ``"roles"``.
+        policy: Optional[:class:`CachePolicy`]
+            The new policy, ``None`` goes back to keeping everything.
+        """
+        if not isinstance(self.storage, MemoryBackend):
+            raise ValueError(f"Cache policies only apply to the memory backend, not {type(self.storage).__name__}")
+
+        self.storage.set_policy(store, policy)
+        self._track_users()
+
+    def _track_users(self):
+        # Members hold on to their user, a users policy evicting it would otherwise split them from the cached copy
+        storage = self.storage
+
+        if not isinstance(storage, MemoryBackend) or "users" not in storage.policies:
+            self._user_refs = None
+        elif self._user_refs is None:
+            self._user_refs = WeakValueDictionary(storage.users.items())
+
+    def _store(self, store: str) -> Any:
+        # The memory backend hands out its dicts, other backends get a read only view that queries them
+        if isinstance(self.storage, MemoryBackend):
+            return getattr(self.storage, store)
+
+        return _StoreView(self, store)
 
-        # Guild Cache
-        self.guilds: Dict[int, Guild] = {}
-        self.members: Dict[int, Dict[int, Member]] = {}
-        self.channels: Dict[int, Dict[int, TextChannel]] = {}
-        self.roles: Dict[int, Dict[int, Role]] = {}
+    @property
+    def users(self) -> Mapping[int, User]:
+        return self._store("users")
+
+    @property
+    def guilds(self) -> Mapping[int, Guild]:
+        return self._store("guilds")
+
+    @property
+    def members(self) -> Mapping[int, Mapping[int, Member]]:
+        return self._store("members")
+
+    @property
+    def channels(self) -> Mapping[int, Mapping[int, TextChannel]]:
+        return self._store("channels")
+
+    @property
+    def roles(self) -> Mapping[int, Mapping[int, Role]]:
+        return self._store("roles")
+
+    def _load(self, entity: str, data: Dict[str, Any]) -> Any:
+        if entity == "users":
+            return User(data, self)
+        if entity == "guilds":
+            return Guild(data, self)
+        if entity == "channels":
+            return TextChannel(data, self)
+        if entity == "roles":
+            return Role(data, self)
+
+        # Backends give members back with their stored user, or only its id when it isn't stored
+        return Member(data, int(data["guild_id"]), self, user=User(data["user"], self))
+
+    def _get(self, entity: str, key: Key) -> Any:
+        value = self.storage.get(entity, key)
+
+        if value is None or self.storage.stores_models:
+            return value
+
+        return self._load(entity, value)
+
+    def _put(self, entity: str, key: Key, model: Any):
+        self.storage.put(entity, key, model if self.storage.stores_models else model._to_data())
+
+    def _delete(self, entity: str, key: Key) -> Any:
+        value = self.storage.delete(entity, key)
+
+        if value is None or self.storage.stores_models:
+            return value
+
+        return self._load(entity, value)
+
+    def _scan(self, entity: str, *, guild_id: Optional[int] = None, user_id: Optional[int] = None) -> List[Any]:
+        values = self.storage.scan(entity, guild_id=guild_id, user_id=user_id)
+
+        if self.storage.stores_models:
+            return list(values)
+
+        return [self._load(entity, data) for data in values]
+
+    def _forget_messages(self, guild_id: int) -> None:
+        if self.messages is None:
+            return
+
+        for channel in self.get_channels(guild_id):
+            self.messages.remove_channel(channel.id)
+
+    def _forget_guild(self, guild_id: int) -> None:
+        self._forget_messages(guild_id)
+
+        for entity in GUILD_ENTITIES:
+            self.storage.clear(entity, guild_id=guild_id)
+
+    def close(self) -> None:
+        """Closes the storage backend."""
+        self.storage.close()
 
     async def fetch_user(self, user_id: int):
         """
@@ -41,161 +250,353 @@ class Cache:
 
         user_data = await self.http.get_user(user_id)
 
-        user = User(user_data, self)
+        return self.update_user(user_data)
 
-        self.users[user_id] = user
-
-        return user
+    def remove_guild(self, guild_id: int) -> Optional[Guild]:
+        guild = self._delete("guilds", guild_id)
+        self._forget_guild(guild_id)
 
-    def remove_guild(self, guild_id: int) -> None:
-        guild = self.guilds[guild_id]
-
-        guild._members = {}
-        guild._channels = {}
-        self.channels.pop(guild_id)
-        self.members.pop(guild_id)
-        self.guilds.pop(guild_id)
-        self.roles.pop(guild_id)
-
-    def remove_channel(self, guild_id: int, channel_id: int) -> Guild:
-        
-        guild = self.guilds[guild_id]
-
-        guild._remove_channel(channel_id)
-        self.channels[guild_id].pop(channel_id)
-    
-        _log.info("Removed channel %s from cache", channel_id)
-    
         return guild
 
-    def remove_member(self, guild_id: int, member_id: int) -> Member:
-        guild = self.guilds[guild_id]
+    def remove_channel(self, guild_id: int, channel_id: int) -> Optional[TextChannel]:
+        channel = self._delete("channels", (guild_id, channel_id))
 
-        guild._remove_member(member_id)
-        mem = self.members[guild_id].pop(member_id)
+        if self.messages is not None:
+            self.messages.remove_channel(channel_id)
 
-        return mem
-    
-    def remove_role(self, guild_id: int, role_id: int):
-        if guild_id not in self.roles or role_id not in self.roles.values():
-            raise ValueError("Role or Guild does not appear there!")
+        _log.debug("Removed channel %s from cache", channel_id)
 
-        guild = self.guilds[guild_id]
+        return channel
 
-        guild._remove_role(role_id)
-        self.roles[guild_id].pop(role_id)
+    def remove_member(self, guild_id: int, member_id: int) -> Optional[Member]:
+        return self._delete("members", (guild_id, member_id))
 
-        return guild
+    def remove_role(self, guild_id: int, role_id: int) -> Optional[Role]:
+        role = self._delete("roles", (guild_id, role_id))
+
+        # Members don't get an update for roles that got deleted. Member.roles skips roles that aren't cached,
+        # so only backends holding the members themselves drop the id, others would have to rewrite every member
+        if role is not None and self.storage.stores_models:
+            for member in self._scan("members", guild_id=guild_id):
+                if role_id in member.role_ids:
+                    member.role_ids.remove(role_id)
+
+        return role
 
     def get_user(self, user_id: dt.Snowflake):
-        return self.users.get(user_id)
+        return self._get("users", int(user_id))
+
+    def get_user_members(self, user_id: int) -> List[Member]:
+        """Every cached member of a user, over all the guilds they share with the bot."""
+        return self._scan("members", user_id=user_id)
 
     def add_user(self, payload: Any):
-        user = self.users.get(payload["id"])
+        user_id = int(payload["id"])
+        user = self._get("users", user_id)
 
         if user:
             return user
 
-        user = User(payload, self)
-        self.users[user.id] = user
+        user = self._user_refs.get(user_id) if self._user_refs is not None else None
+
+        if user is None:
+            user = User(payload, self)
+        else:
+            # Evicted while members still had it, putting the same object back keeps them sharing it
+            user._from_data(payload)
+
+        self._put("users", user.id, user)
+
+        if self._user_refs is not None:
+            self._user_refs[user.id] = user
+
         return user
 
+    def update_user(self, payload: Any) -> User:
+        """Patches a cached user with whatever fields the payload has, caching it when it wasn't yet."""
+        user = self._get("users", int(payload["id"]))
+
+        if user is None:
+            return self.add_user(payload)
+
+        user._from_data(payload)
+        self._put("users", user.id, user)
+        return user
+
+    def get_message(self, message_id: int) -> Optional[Message]:
+        if self.messages is None:
+            return None
+
+        return self.messages.get(message_id)
+
+    def add_message(self, payload: Any) -> Message:
+        """Makes a message, keeping it in the message cache when there is one."""
+        message = Message(payload, self)
+
+        if self.messages is not None:
+            self.messages.add(message)
+
+        return message
+
+    def update_message(self, payload: Any) -> Optional[Message]:
+        """Patches a cached message with a MESSAGE_UPDATE payload, returns ``None`` when it isn't cached."""
+        message = self.get_message(int(payload["id"]))
+
+        if message is not None:
+            message._from_data(payload)
+
+        return message
+
+    def remove_message(self, message_id: int) -> Optional[Message]:
+        if self.messages is None:
+            return None
+
+        return self.messages.remove(message_id)
+
     def get_guild(self, guild_id: int):
-        return self.guilds.get(guild_id)
+        return self._get("guilds", guild_id)
+
+    def get_guilds(self) -> List[Guild]:
+        return self._scan("guilds")
 
     def add_guild(self, payload: Any):
-        guild = self.guilds.get(int(payload["id"]))
+        guild = self._get("guilds", int(payload["id"]))
         if guild:
             return guild
 
         guild = Guild(payload, self)
+        self._put("guilds", guild.id, guild)
+
+        return guild
+
+    def update_guild(self, payload: Any) -> Optional[Guild]:
+        """Patches a cached guild and its roles with a GUILD_UPDATE payload, returns ``None`` when it isn't cached."""
+        guild = self._get("guilds", int(payload["id"]))
+
+        if guild is None:
+            return None
+
+        guild._from_data(payload)
+        self._put("guilds", guild.id, guild)
 
-        id = int(guild.id)
-        self.guilds[id] = guild
+        for role in payload.get("roles", ()):
+            self.update_role(guild.id, role)
 
         return guild
 
     def get_channel(self, guild_id: int, channel_id: int) -> Optional[TextChannel]:
-        return self.channels[guild_id].get(channel_id)
+        return self._get("channels", (guild_id, channel_id))
 
-    def add_channel(self, guild_id: int, payload: Any) -> TextChannel:
-        if guild_id not in self.channels:
-            self.channels[guild_id] = {}
+    def get_channels(self, guild_id: int) -> List[TextChannel]:
+        return self._scan("channels", guild_id=guild_id)
 
-        channel = self.channels[guild_id].get(payload["id"])
+    def add_channel(self, guild_id: int, payload: Any) -> TextChannel:
+        channel = self._get("channels", (guild_id, int(payload["id"])))
 
         if channel:
             return channel
 
         channel = TextChannel(payload, self)
-        guild = self.guilds[guild_id]
+        self._put("channels", (guild_id, channel.id), channel)
 
-        self.channels[guild_id][channel.id] = channel
-        guild._add_channel(channel)
-        _log.info("added channel %s from cache", channel.id)
+        _log.debug("added channel %s to cache", channel.id)
 
         return channel
 
-    def add_role(self, guild_id: int, payload: Any):
-        if guild_id not in self.roles:
-            self.roles[guild_id] = {}
+    def update_channel(self, guild_id: int, payload: Any) -> TextChannel:
+        """Patches a cached channel with whatever fields the payload has, caching it when it wasn't yet."""
+        channel = self._get("channels", (guild_id, int(payload["id"])))
 
-        role = self.roles[guild_id].get(payload["id"])
+        if channel is None:
+            return self.add_channel(guild_id, payload)
+
+        channel._from_data(payload)
+        self._put("channels", (guild_id, channel.id), channel)
+        return channel
+
+    def add_role(self, guild_id: int, payload: Any):
+        role = self._get("roles", (guild_id, int(payload["id"])))
 
         if role:
             return role
 
         role = Role(payload, self)
-        guild = self.guilds[guild_id]
+        self._put("roles", (guild_id, role.id), role)
+
+        return role
 
-        self.roles[guild_id][role.id] = role
-        guild._add_role(role)
+    def update_role(self, guild_id: int, payload: Any) -> Role:
+        """Patches a cached role with whatever fields the payload has, caching it when it wasn't yet."""
+        role = self._get("roles", (guild_id, int(payload["id"])))
 
+        if role is None:
+            return self.add_role(guild_id, payload)
+
+        role._from_data(payload)
+        self._put("roles", (guild_id, role.id), role)
         return role
 
     def get_role(self, guild_id: int, role_id: int) -> Optional[Role]:
-        return self.roles[guild_id].get(role_id)
+        return self._get("roles", (guild_id, role_id))
+
+    def get_roles(self, guild_id: int) -> List[Role]:
+        return self._scan("roles", guild_id=guild_id)
 
     def get_member(self, guild_id: int, member_id: int) -> Optional[Member]:
-        return self.members[guild_id].get(member_id)
+        return self._get("members", (guild_id, member_id))
 
-    def add_member(self, guild_id: int, payload: Any):
-        if guild_id not in self.members:
-            self.members[guild_id] = {}
+    def get_members(self, guild_id: int) -> List[Member]:
+        return self._scan("members", guild_id=guild_id)
 
-        member = self.members[guild_id].get(payload["user"]["id"])
+    def add_member(self, guild_id: int, payload: Any):
+        member = self._get("members", (guild_id, int(payload["user"]["id"])))
 
         if member:
             return member
 
-        guild = self.guilds[guild_id]
-        member = Member(payload, guild, self)
+        member = Member(payload, guild_id, self)
+
+        self._put("members", (guild_id, member.id), member)
+
+        return member
+
+    def update_member(self, guild_id: int, payload: Any) -> Optional[Member]:
+        """
+        Patches a cached member and their shared user with a GUILD_MEMBER_UPDATE payload.
+
+        Members that weren't cached yet get cached, whether their guild is cached or not.
+        """
+        self.update_user(payload["user"])
+
+        member = self._get("members", (guild_id, int(payload["user"]["id"])))
+
+        if member is None:
+            return self.add_member(guild_id, payload)
 
-        self.members[guild_id][member.id] = member
-        guild._add_member(member)
-    
+        member._from_data(payload)
+        self._put("members", (guild_id, member.id), member)
         return member
 
-    async def populate_server(self, guild_id: int) -> Guild:
-        guild = self.guilds[guild_id]
+    def add_members(self, guild_id: int, payloads: Iterable[Any]) -> List[Member]:
+        """
+        Adds a whole batch of members to a guilds cache at once, like the ones in a member chunk.
+
+        Parameters
+        -----------
+        guild_id: :class:`int`
+            The id of the guild the members are in.
+        payloads: Iterable[Any]
+            The raw member payloads.
 
-        members = await self.http.get_guild_members(guild_id)
-        channels = await self.http.get_guild_channels(guild_id)
-        roles = await self.http.get_guild_roles(guild_id)
+        Returns
+        -----------
+        List[:class:`Member`]
+            The cached member objects
+        """
+        added: List[Member] = []
+        new: List[Member] = []
+
+        for payload in payloads:
+            member_id = int(payload["user"]["id"])
+            member = self._get("members", (guild_id, member_id))
+
+            if member is None:
+                member = Member(payload, guild_id, self)
+                new.append(member)
+
+            added.append(member)
+
+        # One write for the whole batch, which backends like sqlite do in a single transaction
+        self.storage.put_many(
+            "members",
+            (((guild_id, member.id), member if self.storage.stores_models else member._to_data()) for member in new),
+        )
+
+        return added
+
+    async def populate_server(
+        self,
+        guild_id: int,
+        *,
+        fetch_members: bool = True,
+        fetch_channels: bool = True,
+        fetch_roles: bool = True,
+    ) -> Guild:
+        guild = self.get_guild(guild_id)
+
+        async def _nothing() -> List[Any]:
+            return []
+
+        members, channels, roles = await asyncio.gather(
+            self.http.get_guild_members(guild_id) if fetch_members else _nothing(),
+            self.http.get_guild_channels(guild_id) if fetch_channels else _nothing(),
+            self.http.get_guild_roles(guild_id) if fetch_roles else _nothing(),
+        )
 
         for channel in channels:
             self.add_channel(guild_id, channel)
         for role in roles:
             self.add_role(guild_id, role)
 
-        for member in members:
-            self.add_user(member['user'])  # type: ignore # Not sure how to fix `"Literal['user']" is incompatible with "slice"` but ill deal with that later 📌
-            self.add_member(guild_id, member)
+        self.add_members(guild_id, members)
 
         return guild
 
-    async def _handle_guild_caching(self, data: Dict[str, Any]):
+    def add_guild_payload(self, data: Dict[str, Any]) -> Guild:
+        """
+        Caches a guild along with everything GUILD_CREATE sends with it, without making any requests.
+
+        Parameters
+        -----------
+        data: Dict[str, Any]
+            The raw GUILD_CREATE payload.
+
+        Returns
+        -----------
+        :class:`Guild`
+            The cached guild object
+        """
+        guild = self.add_guild(data)
+        guild_id = guild.id
+
+        for role in data.get("roles", ()):
+            self.add_role(guild_id, role)
+
+        # Channels and threads in GUILD_CREATE don't come with a guild id
+        for channel in data.get("channels", ()):
+            channel["guild_id"] = data["id"]
+            self.add_channel(guild_id, channel)
+
+        for thread in data.get("threads", ()):
+            thread.setdefault("guild_id", data["id"])
+            self.add_channel(guild_id, thread)
+
+        self.add_members(guild_id, data.get("members", ()))
+
+        return guild
+
+    def _missing_guild_data(self, data: Dict[str, Any], *, fetch_members: bool = True) -> Dict[str, bool]:
+        if data.get("unavailable"):
+            return {}
+
+        missing = {
+            "fetch_channels": "channels" not in data,
+            "fetch_roles": "roles" not in data,
+            # Large guilds only send a handful of members
+            "fetch_members": fetch_members and ("members" not in data or bool(data.get("large"))),
+        }
+
+        if not any(missing.values()):
+            return {}
+
+        return missing
+
+    async def _handle_guild_caching(self, data: Dict[str, Any], *, fetch_members: bool = True):
         _log.info("Adding guild %s to cache!", data["id"])
-        self.add_guild(data)
-        _log.info("Populating guild %s's cache", data["id"])
-        await self.populate_server(int(data["id"]))
+        self.add_guild_payload(data)
+
+        missing = self._missing_guild_data(data, fetch_members=fetch_members)
+
+        if missing:
+            _log.info("Fetching the rest of guild %s's cache", data["id"])
+            await self.populate_server(int(data["id"]), **missing)
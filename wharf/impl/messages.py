@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from collections import OrderedDict, deque
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from .models import Message
+
+__all__ = ("MessageCache",)
+
+
+class MessageCache:
+    """
+    Keeps the newest messages of every channel around, so edits and deletes can be looked up without REST.
+
+    Every channel has a ring buffer of message ids next to one id to message index shared by all of them,
+    adding, looking up and evicting a message are all O(1).
+
+    Parameters
+    -----------
+    max_messages: :class:`int`
+        How many messages are kept over every channel, the oldest ones go first.
+    per_channel: :class:`int`
+        How many messages a single channel can keep.
+    """
+
+    def __init__(self, max_messages: int = 1000, *, per_channel: int = 100):
+        if max_messages < 1 or per_channel < 1:
+            raise ValueError("max_messages and per_channel have to be at least 1")
+
+        self.max_messages = max_messages
+        self.per_channel = per_channel
+
+        # Oldest first over every channel, so the global cap evicts from the front
+        self._messages: "OrderedDict[int, Message]" = OrderedDict()
+        # Ids of deleted messages stay in their ring until they reach its front or the ring gets compacted,
+        # so how many messages a channel has is counted on its own
+        self._channels: Dict[int, Deque[int]] = {}
+        self._counts: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __contains__(self, message_id: int) -> bool:
+        return message_id in self._messages
+
+    def get(self, message_id: int) -> Optional[Message]:
+        return self._messages.get(message_id)
+
+    def add(self, message: Message) -> Message:
+        if message.id in self._messages:
+            self._messages[message.id] = message
+            return message
+
+        ring = self._channels.get(message.channel_id)
+
+        if ring is None:
+            ring = self._channels[message.channel_id] = deque()
+
+        count = self._counts.get(message.channel_id, 0)
+
+        if count >= self.per_channel:
+            # The front of a ring is always cached, deleted ids get trimmed off as soon as they reach it
+            self._messages.pop(ring.popleft(), None)
+            self._trim(ring)
+            count -= 1
+
+        ring.append(message.id)
+        self._counts[message.channel_id] = count + 1
+        self._messages[message.id] = message
+
+        if len(self._messages) > self.max_messages:
+            _, oldest = self._messages.popitem(last=False)
+            self._release(oldest.channel_id)
+
+        return message
+
+    def remove(self, message_id: int) -> Optional[Message]:
+        message = self._messages.pop(message_id, None)
+
+        if message is not None:
+            self._release(message.channel_id)
+
+        return message
+
+    def remove_channel(self, channel_id: int) -> List[Message]:
+        """Forgets every message of a channel, returns the ones that were cached."""
+        removed: List[Message] = []
+
+        self._counts.pop(channel_id, None)
+
+        for message_id in self._channels.pop(channel_id, ()):
+            message = self._messages.pop(message_id, None)
+
+            if message is not None:
+                removed.append(message)
+
+        return removed
+
+    def channel_messages(self, channel_id: int) -> List[Message]:
+        """The cached messages of a channel, oldest first."""
+        return [message for message in map(self._messages.get, self._channels.get(channel_id, ())) if message is not None]
+
+    def _trim(self, ring: Deque[int]):
+        # Drops the ids of messages that aren't cached anymore off the front of a ring
+        while ring and ring[0] not in self._messages:
+            ring.popleft()
+
+    def _release(self, channel_id: int):
+        count = self._counts.get(channel_id)
+
+        if count is None:
+            return
+
+        if count <= 1:
+            del self._channels[channel_id], self._counts[channel_id]
+            return
+
+        count = self._counts[channel_id] = count - 1
+        ring = self._channels[channel_id]
+        self._trim(ring)
+
+        # Deletes in the middle of a ring would pile up when its front never goes, drop them once they're half of it
+        if len(ring) > 2 * count:
+            self._channels[channel_id] = deque(message_id for message_id in ring if message_id in self._messages)
@@ -1,3 +1,4 @@
+from .base import *
 from .channel import *
 from .embed import *
 from .guild import *
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    from ..cache import Cache
+
+__all__ = ("Model",)
+
+
+class Model:
+    """The base every cached model builds on.
+
+    Models only keep the fields they parse out of a payload, the payload itself is thrown away unless
+    the cache was made with ``keep_payloads`` which is meant for debugging.
+    """
+
+    __slots__ = ("cache", "_payload")
+
+    def __init__(self, payload: Dict[str, Any], cache: "Cache"):
+        self.cache = cache
+        self._payload: Optional[Dict[str, Any]] = payload if getattr(cache, "keep_payloads", False) else None
+
+    @property
+    def payload(self) -> Optional[Dict[str, Any]]:
+        """The payload this model was made from, only kept when the cache has ``keep_payloads`` turned on."""
+        return self._payload
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 from ...enums import ChannelTypes
+from .base import Model
 from .user import User
 
 if TYPE_CHECKING:
@@ -10,18 +11,22 @@ if TYPE_CHECKING:
     from .guild import Guild
 
 
-class Channel:
+class Channel(Model):
+    __slots__ = ("_id", "_type")
+
     def __init__(self, payload: Dict[str, Any], cache: Cache):
-        self.cache = cache
+        super().__init__(payload, cache)
         self._from_data(payload)
 
     def _from_data(self, payload: Dict[str, Any]):
-        self._id = payload.get("id")
-        self._type = payload.get("type")
+        if "id" in payload:
+            self._id = payload["id"]
+        if "type" in payload:
+            self._type = payload["type"]
 
     @property
     def id(self) -> int:
-        return int(self._id)  # type: ignore
+        return int(self._id)
 
     @property
     def type(self) -> ChannelTypes:
@@ -29,29 +34,70 @@ class Channel:
 
 
 class TextChannel(Channel):
+    __slots__ = ("_name", "_guild_id", "topic", "position", "parent_id", "nsfw")
+
     def __init__(self, payload: Dict[str, Any], cache: Cache):
+        self._name: Optional[str] = None
+        self._guild_id: Optional[int] = None
+        self.topic: Optional[str] = None
+        self.position: Optional[int] = None
+        self.parent_id: Optional[int] = None
+        self.nsfw: bool = False
+
         super().__init__(payload, cache)
-        self._payload = payload
+
+    def _from_data(self, payload: Dict[str, Any]):
+        """Sets the fields the payload has and leaves the rest alone, so partial updates can be patched in."""
+        super()._from_data(payload)
+
+        if "name" in payload:
+            self._name = payload["name"]
+        if payload.get("guild_id") is not None:
+            self._guild_id = int(payload["guild_id"])
+        if "topic" in payload:
+            self.topic = payload["topic"]
+        if "position" in payload:
+            self.position = payload["position"]
+        if "parent_id" in payload:
+            self.parent_id = int(payload["parent_id"]) if payload["parent_id"] is not None else None
+        if "nsfw" in payload:
+            self.nsfw = payload["nsfw"]
+
+    def _to_data(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "type": self._type,
+            "name": self._name,
+            "guild_id": self._guild_id,
+            "topic": self.topic,
+            "position": self.position,
+            "parent_id": self.parent_id,
+            "nsfw": self.nsfw,
+        }
 
     @property
     def name(self) -> Optional[str]:
-        return self._payload.get("name")
+        return self._name
+
+    @property
+    def guild_id(self) -> Optional[int]:
+        return self._guild_id
 
     @property
     def guild(self) -> Optional[Guild]:
-        return self.cache.get_guild(self._payload.get("guild_id"))  # type: ignore # No idea how to fix.
+        return self.cache.get_guild(self._guild_id)  # type: ignore # No idea how to fix.
 
 
 class DMChannel(Channel):
+    __slots__ = ("recipients",)
+
     def __init__(self, payload: Dict[str, Any], cache: Cache):
         super().__init__(payload, cache)
-        self._payload = payload
+        self.recipients: List[User] = [User(recipient, cache) for recipient in payload.get("recipients", ())]
 
     def set_recipients(self):
-        self.recipients = []
-
-        for recipient in self._payload["recipients"]:
-            self.recipients.append(User(recipient, self.cache))
+        # Recipients are made along with the channel now, kept so older code keeps working
+        return self.recipients
 
 
 def check_channel_type(data: Any, cache: "Cache"):
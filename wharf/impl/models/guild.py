@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 from ...asset import Asset
+from .base import Model
 from .channel import TextChannel
 from .member import Member
 from .role import Role
@@ -11,23 +12,51 @@ if TYPE_CHECKING:
     from ..cache import Cache
 
 
-class Guild:
+class Guild(Model):
+    __slots__ = ("id", "name", "icon_hash", "banner_hash", "owner_id", "unavailable")
+
     def __init__(self, data: Dict[str, Any], cache: "Cache"):
+        super().__init__(data, cache)
+
+        self.id: int = int(data["id"])
+        self.name: Optional[str] = None
+        self.icon_hash: Optional[str] = None
+        self.banner_hash: Optional[str] = None
+        self.owner_id: Optional[int] = None
+        self.unavailable: Optional[bool] = None
+
         self._from_data(data)
-        self.cache = cache
-        self._members: Dict[int, Member] = {}
-        self._channels: Dict[int, TextChannel] = {}
-        self._roles: Dict[int, Role] = {}
 
     def _from_data(self, guild: Dict[str, Any]):
-        self.name = guild.get("name")
-        self.id: int = int(guild["id"])
-        self.icon_hash = guild.get("icon")
-        self.banner_hash = guild.get("banner")
-        self.unavailable = guild.get("unavailable")
+        """Sets the fields the payload has and leaves the rest alone, so partial updates can be patched in."""
+        if "name" in guild:
+            self.name = guild["name"]
+        if "icon" in guild:
+            self.icon_hash = guild["icon"]
+        if "banner" in guild:
+            self.banner_hash = guild["banner"]
+        if "owner_id" in guild:
+            self.owner_id = int(guild["owner_id"])
+
+        # Only an outage sends this, a guild that is available again just leaves it out
+        self.unavailable = guild.get("unavailable", False)
+
+    def _to_data(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "id": self.id,
+            "name": self.name,
+            "icon": self.icon_hash,
+            "banner": self.banner_hash,
+            "unavailable": self.unavailable,
+        }
+
+        if self.owner_id is not None:
+            data["owner_id"] = self.owner_id
+
+        return data
 
     async def fetch_member(self, member_id: int):
-        return Member(await self.cache.http.get_member(member_id, self.id), self.cache)
+        return Member(await self.cache.http.get_member(member_id, self.id), self.id, self.cache)
 
     async def ban(
         self,
@@ -46,49 +75,26 @@ class Guild:
         payload = await self.cache.http.create_role(self.id, name=name, reason=reason)
         return Role(payload, self.cache)
 
-    def _add_member(self, member: Member):
-        """
-        This function is meant to be used internally with the websocket to add to cache.
-        i dont honestly recommend using this at any point.
-        shouldn't even be necessary to use it lol
-        """
-
-        self._members[member.id] = member
-
-    def _add_channel(self, channel: TextChannel):
-        """
-        This function is meant to be used internally with the websocket to add to cache.
-        i dont honestly recommend using this at any point either.
-        shouldn't even be necessary to use it lol
-        """
-
-        self._channels[channel.id] = channel
-
-    def _add_role(self, role: Role):
-        self._roles[role.id] = role
-
-    def _remove_member(self, member_id: int):
-        self._members.pop(member_id)
-
-    def _remove_channel(self, channel_id: int):
-        self._channels.pop(channel_id)
-
-    def _remove_role(self, role_id: int):
-        self._roles.pop(role_id)
-
     @property
     def members(self) -> List[Member]:
         """
         A list of all the members this server has.
         """
-        return list(self._members.values())
+        return self.cache.get_members(self.id)
 
     @property
     def channels(self) -> List[TextChannel]:
         """
         A list of all the channels this server has.
         """
-        return list(self._channels.values())
+        return self.cache.get_channels(self.id)
+
+    @property
+    def roles(self) -> List[Role]:
+        """
+        A list of all the roles this server has.
+        """
+        return self.cache.get_roles(self.id)
 
     @property
     def icon(self) -> Optional[Asset]:
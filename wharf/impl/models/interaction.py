@@ -23,6 +23,8 @@ class Interaction:
         self.type:str  = payload["type"]
         self.command: Optional[InteractionCommand] = None
         self.options: List[InteractionOption] = []
+        # Only set for component interactions like button clicks
+        self.custom_id: Optional[str] = payload.get("data", {}).get("custom_id")
 
         if self.type == 2:
             self.command = InteractionCommand._from_json(payload["data"])
@@ -38,14 +40,18 @@ class Interaction:
             self._user = payload["user"]
 
 
+    @property
+    def user_id(self) -> int:
+        return int(self._user["id"])
+
     @property
     def user(self):
-        return self.cache.get_user(self._user["id"])
+        return self.cache.get_user(int(self._user["id"]))
 
     @property
     def member(self):
         if self._member:
-            return self.cache.get_member(self.guild_id, self._member["id"])
+            return self.cache.get_member(self.guild_id, self.user_id)
 
         return None
 
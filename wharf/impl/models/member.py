@@ -1,43 +1,88 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 from ...asset import Asset
-
+from .base import Model
 from .role import Role
+from .user import User
 
 if TYPE_CHECKING:
     from ..cache import Cache   
     from .guild import Guild
 
 
-class Member:
-    def __init__(self, payload: Dict[str, Any], guild: Guild, cache: "Cache"):
-        self.cache = cache
-        self._payload = payload
-        self._from_data(payload)
+class Member(Model):
+    __slots__ = ("guild_id", "user", "nick", "guild_avatar", "joined_at", "role_ids")
 
-        self.guild: Guild = guild
+    def __init__(self, payload: Dict[str, Any], guild_id: int, cache: "Cache", *, user: Optional[User] = None):
+        super().__init__(payload, cache)
+        # The guild is looked up through the cache, so members never hold on to a guild that was replaced
+        # and can be cached while their guild isn't
+        self.guild_id: int = guild_id
 
+        # Every guild the user is in shares the one user object from the cache, so there is only one to update
+        self.user: User = user if user is not None else cache.update_user(payload["user"])
 
-        self._roles = []
+        self.nick: Optional[str] = None
+        self.guild_avatar: Optional[str] = None
+        self.joined_at: Optional[str] = None
+        self.role_ids: List[int] = []
+
+        self._from_data(payload)
 
     def __str__(self) -> str:
         return f"{self.name}#{self.discriminator}"
 
     def _from_data(self, payload: Dict[str, Any]):
-        self.guild_avatar = payload.get("avatar")
-        self.joined_at = payload["joined_at"]
-        self.discriminator = payload["user"]["discriminator"]
-        self.id = int(payload["user"]["id"])
-        self.name = payload["user"]["username"]
-        self._avatar = payload["user"].get("avatar")
+        """
+        Sets the guild specific fields the payload has and leaves the rest alone, so partial updates can be patched in.
+        The user is updated through the cache.
+        """
+        if "avatar" in payload:
+            self.guild_avatar = payload["avatar"]
+        if "nick" in payload:
+            self.nick = payload["nick"]
+        if "joined_at" in payload:
+            self.joined_at = payload["joined_at"]
+        if "roles" in payload:
+            self.role_ids = [int(role_id) for role_id in payload["roles"]]
+
+    def _to_data(self) -> Dict[str, Any]:
+        # Only the users id, the user itself is stored on its own
+        return {
+            "guild_id": self.guild_id,
+            "user": {"id": self.user.id},
+            "nick": self.nick,
+            "avatar": self.guild_avatar,
+            "joined_at": self.joined_at,
+            "roles": self.role_ids,
+        }
+
+    @property
+    def guild(self) -> Optional[Guild]:
+        return self.cache.get_guild(self.guild_id)
+
+    @property
+    def id(self) -> int:
+        return self.user.id
+
+    @property
+    def name(self) -> Optional[str]:
+        return self.user.name
+
+    @property
+    def discriminator(self) -> Optional[str]:
+        return self.user.discriminator
+
+    @property
+    def roles(self) -> List[Role]:
+        roles = (self.cache.get_role(self.guild_id, role_id) for role_id in self.role_ids)
+        return [role for role in roles if role is not None]
 
     @property
     def avatar(self) -> Optional[Asset]:
-        if self._avatar is not None:
-            return Asset._from_avatar(self.id, self._avatar, self.cache)
-        return None
+        return self.user.avatar
 
     async def add_role(self, guild_id: int, role_id: int, *, reason: str) -> Role:
         role_payload = await self.cache.http.add_guild_member_role(guild_id=guild_id, member_id=self.id, role_id=role_id, reason=reason)
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Dict, Optional
 
+from .base import Model
 from .guild import Guild
 from .user import User
 
@@ -13,26 +14,51 @@ if TYPE_CHECKING:
     from .member import Member
 
 
-class Message:
+class Message(Model):
+    __slots__ = ("_id", "_content", "_author_id", "_channel_id", "_guild_id", "_edited_at")
+
     def __init__(self, data: Dict[str, str], cache: "Cache"):
-        self._data = data
+        super().__init__(data, cache)
+
+        self._id = int(data["id"])
+        self._author_id = int(data["author"]["id"])  # type: ignore
+        self._channel_id = int(data["channel_id"])
+        self._content = ""
+        self._guild_id: Optional[int] = None
+        self._edited_at: Optional[str] = None
+
         self._from_data(data)
-        self.cache = cache
 
     def _from_data(self, message: Dict[str, str]):
-        self._content = message["content"]
-        self._author_id = int(message["author"]["id"])  # type: ignore
-        self._channel_id = int(message["channel_id"])
-
+        """Sets the fields the payload has and leaves the rest alone, so MESSAGE_UPDATE payloads can be patched in."""
+        if "content" in message:
+            self._content = message["content"]
+        if "edited_timestamp" in message:
+            self._edited_at = message["edited_timestamp"]
         if message.get("guild_id") is not None:
-            self._guild_id = int(message.get("guild_id"))  # type: ignore
+            self._guild_id = int(message["guild_id"])
+
+    @property
+    def id(self) -> int:
+        return self._id
+
+    @property
+    def edited_at(self) -> Optional[str]:
+        return self._edited_at
 
     @property
     def guild(self) -> Optional[Guild]:
+        if self._guild_id is None:
+            return None
+
         return self.cache.get_guild(self._guild_id)
 
     @property
     def channel(self) -> Optional[TextChannel]:
+        # Only guild channels are cached
+        if self._guild_id is None:
+            return None
+
         return self.cache.get_channel(self._guild_id, self.channel_id)
 
     @property
@@ -50,6 +76,14 @@ class Message:
         
         return self.cache.get_member(self._guild_id, self._author_id)
 
+    @property
+    def user_id(self) -> int:
+        return self._author_id
+
+    @property
+    def guild_id(self) -> Optional[int]:
+        return self._guild_id
+
     @property
     def channel_id(self) -> int:
         return int(self._channel_id)
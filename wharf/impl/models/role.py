@@ -1,19 +1,48 @@
 from typing import TYPE_CHECKING, Any, Dict
 
+from .base import Model
+
 if TYPE_CHECKING:
     from ..cache import Cache
 
 
-class Role:
+class Role(Model):
+    __slots__ = ("_id", "_name", "_color", "_hoist", "_position", "_permissions")
+
     def __init__(self, payload: Dict[str, Any], cache: "Cache"):
+        super().__init__(payload, cache)
+
+        self._id = payload["id"]
+        self._name = ""
+        self._color = 0
+        self._hoist = False
+        self._position = 0
+        self._permissions = "0"
+
         self._from_data(payload)
-        self.cache = cache
 
     def _from_data(self, payload: Dict[str, Any]):
-        self._name = payload["name"]
-        self._id = payload["id"]
-        self._color = payload["color"]
-        self._hoist = payload["hoist"]
+        """Sets the fields the payload has and leaves the rest alone, so partial updates can be patched in."""
+        if "name" in payload:
+            self._name = payload["name"]
+        if "color" in payload:
+            self._color = payload["color"]
+        if "hoist" in payload:
+            self._hoist = payload["hoist"]
+        if "position" in payload:
+            self._position = payload["position"]
+        if "permissions" in payload:
+            self._permissions = payload["permissions"]
+
+    def _to_data(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self._name,
+            "color": self._color,
+            "hoist": self._hoist,
+            "position": self._position,
+            "permissions": self._permissions,
+        }
 
     @property
     def name(self) -> str:
@@ -30,3 +59,11 @@ class Role:
     @property
     def hoist(self) -> bool:
         return self._hoist
+
+    @property
+    def position(self) -> int:
+        return self._position
+
+    @property
+    def permissions(self) -> int:
+        return int(self._permissions)
@@ -3,25 +3,54 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Any, Dict, Optional
 
 from ...asset import Asset
+from .base import Model
 
 if TYPE_CHECKING:
     from ..cache import Cache
 
 
-class User:
+class User(Model):
+    # Weakly referenced so the cache can find users a users policy evicted while members still point to them
+    __slots__ = ("id", "name", "discriminator", "avatar_decoration", "bot", "_avatar", "_banner", "__weakref__")
+
     def __init__(self, payload: Dict[str, Any], cache: "Cache"):
-        self.payload = payload
-        self.cache = cache
+        super().__init__(payload, cache)
+
+        self.id = int(payload["id"])
+        self.name: Optional[str] = None
+        self.discriminator: Optional[str] = None
+        self.avatar_decoration: Optional[str] = None
+        self.bot: bool = False
+        self._avatar: Optional[str] = None
+        self._banner: Optional[str] = None
 
         self._from_data(payload)
 
     def _from_data(self, payload: Dict[str, Any]):
-        self.name = payload["username"]
-        self.id = payload["id"]
-        self.discriminator = payload["discriminator"]
-        self.avatar_decoration = payload["avatar_decoration"]
-        self._avatar = payload.get("avatara")
-        self._banner = payload.get("banner")
+        """Sets the fields the payload has and leaves the rest alone, so partial updates can be patched in."""
+        if "username" in payload:
+            self.name = payload["username"]
+        if "discriminator" in payload:
+            self.discriminator = payload["discriminator"]
+        if "avatar_decoration" in payload:
+            self.avatar_decoration = payload["avatar_decoration"]
+        if "bot" in payload:
+            self.bot = payload["bot"]
+        if "avatar" in payload:
+            self._avatar = payload["avatar"]
+        if "banner" in payload:
+            self._banner = payload["banner"]
+
+    def _to_data(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "username": self.name,
+            "discriminator": self.discriminator,
+            "avatar_decoration": self.avatar_decoration,
+            "bot": self.bot,
+            "avatar": self._avatar,
+            "banner": self._banner,
+        }
 
     @property
     def avatar(self) -> Optional[Asset]:
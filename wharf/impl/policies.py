@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, MutableMapping, Optional
+
+__all__ = (
+    "CachePolicy",
+    "LRUPolicy",
+    "TTLPolicy",
+    "NeverCache",
+)
+
+OnEvict = Callable[[Any, Any], None]
+
+_MISSING: Any = object()
+
+
+class CachePolicy(ABC):
+    """Decides how big a cache store can get and how long things stay in it.
+
+    Stores without a policy are plain dicts, so there is nothing to pay for when none is set.
+    """
+
+    @abstractmethod
+    def make_store(self, on_evict: Optional[OnEvict] = None) -> MutableMapping[Any, Any]:
+        """Makes an empty store, ``on_evict`` is called with the key and value of everything the policy throws out."""
+
+
+class LRUPolicy(CachePolicy):
+    """Keeps at most ``max_size`` entries, throwing out whatever was used least recently.
+
+    Parameters
+    -----------
+    max_size: :class:`int`
+        How many entries a store can hold.
+    """
+
+    def __init__(self, max_size: int):
+        if max_size < 1:
+            raise ValueError("max_size has to be at least 1, use NeverCache to not cache anything")
+
+        self.max_size = max_size
+
+    def make_store(self, on_evict: Optional[OnEvict] = None) -> MutableMapping[Any, Any]:
+        return _LRUStore(self.max_size, on_evict)
+
+
+class TTLPolicy(CachePolicy):
+    """Forgets entries ``ttl`` seconds after they were last added or updated.
+
+    Parameters
+    -----------
+    ttl: :class:`float`
+        How long entries live for, in seconds.
+    max_size: Optional[:class:`int`]
+        Also keep at most this many entries, throwing out the oldest first.
+    """
+
+    def __init__(self, ttl: float, *, max_size: Optional[int] = None):
+        self.ttl = ttl
+        self.max_size = max_size
+
+    def make_store(self, on_evict: Optional[OnEvict] = None) -> MutableMapping[Any, Any]:
+        return _TTLStore(self.ttl, self.max_size, on_evict)
+
+
+class NeverCache(CachePolicy):
+    """Doesn't cache anything, every lookup misses."""
+
+    def make_store(self, on_evict: Optional[OnEvict] = None) -> MutableMapping[Any, Any]:
+        return _NeverStore()
+
+
+class _LRUStore(OrderedDict):
+    def __init__(self, max_size: int, on_evict: Optional[OnEvict] = None):
+        super().__init__()
+        self.max_size = max_size
+        self._on_evict = on_evict
+
+    def __getitem__(self, key: Any) -> Any:
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        value = super().get(key, _MISSING)
+
+        if value is _MISSING:
+            return default
+
+        self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: Any, value: Any):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+
+        if len(self) > self.max_size:
+            old_key, old_value = self.popitem(last=False)
+
+            if self._on_evict is not None:
+                self._on_evict(old_key, old_value)
+
+
+class _TTLStore(OrderedDict):
+    # Every entry lives equally long, so insertion order is also expiry order and only the front ever expires
+    def __init__(self, ttl: float, max_size: Optional[int] = None, on_evict: Optional[OnEvict] = None):
+        super().__init__()
+        self.ttl = ttl
+        self.max_size = max_size
+        self._on_evict = on_evict
+        self._deadlines: Dict[Any, float] = {}
+
+    def _evict_oldest(self):
+        key, value = self.popitem(last=False)
+        del self._deadlines[key]
+
+        if self._on_evict is not None:
+            self._on_evict(key, value)
+
+    def _purge(self):
+        now = time.monotonic()
+
+        # The ordered dicts own linked order, walking a plain dict from the front gets slower the more it deleted.
+        # Goes around __len__ and __iter__, they purge themselves
+        while OrderedDict.__len__(self) and self._deadlines[next(OrderedDict.__iter__(self))] <= now:
+            self._evict_oldest()
+
+    def __getitem__(self, key: Any) -> Any:
+        self._purge()
+        return super().__getitem__(key)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        self._purge()
+        return super().get(key, default)
+
+    def __contains__(self, key: Any) -> bool:
+        self._purge()
+        return super().__contains__(key)
+
+    def __iter__(self):
+        self._purge()
+        return super().__iter__()
+
+    def __len__(self) -> int:
+        self._purge()
+        return super().__len__()
+
+    def __setitem__(self, key: Any, value: Any):
+        # Updating an entry restarts its time to live, both orders have to move along
+        self._deadlines.pop(key, None)
+        self._deadlines[key] = time.monotonic() + self.ttl
+
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+
+        self._purge()
+
+        if self.max_size is not None and len(self) > self.max_size:
+            self._evict_oldest()
+
+    def __delitem__(self, key: Any):
+        super().__delitem__(key)
+        del self._deadlines[key]
+
+    def pop(self, key: Any, default: Any = _MISSING) -> Any:
+        self._deadlines.pop(key, None)
+
+        if default is _MISSING:
+            return super().pop(key)
+
+        return super().pop(key, default)
+
+    def clear(self):
+        super().clear()
+        self._deadlines.clear()
+
+    def keys(self):
+        self._purge()
+        return super().keys()
+
+    def values(self):
+        self._purge()
+        return super().values()
+
+    def items(self):
+        self._purge()
+        return super().items()
+
+
+class _NeverStore(dict):
+    def __setitem__(self, key: Any, value: Any):
+        pass
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        return default
+
+    def update(self, *args: Any, **kwargs: Any):
+        pass
@@ -1,6 +1,8 @@
 import asyncio
+import time
+from collections import deque
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Optional, Protocol
 
 from aiohttp import ClientResponse
 
@@ -142,3 +144,66 @@ class Ratelimiter:
         self.url_buckets.pop(url)
 
         bucket.migrate(hash)
+
+
+class IdentifyLimiter(Protocol):
+    """Anything shards can wait on before identifying, like :class:`IdentifyRatelimiter` or a cluster asking its launcher."""
+
+    async def acquire(self, shard_id: int) -> None:
+        ...
+
+
+class IdentifyRatelimiter:
+    """Staggers gateway identifies so every ``shard_id % max_concurrency`` bucket only identifies once per window."""
+
+    def __init__(self, max_concurrency: int = 1, *, delay: float = 5.0):
+        self.max_concurrency = max_concurrency
+        self.delay = delay
+        self._locks: dict[int, asyncio.Lock] = {}
+        self._last_identify: dict[int, float] = {}
+
+    async def acquire(self, shard_id: int):
+        key = shard_id % self.max_concurrency
+
+        if key not in self._locks:
+            self._locks[key] = asyncio.Lock()
+
+        async with self._locks[key]:
+            loop = asyncio.get_running_loop()
+            wait = self._last_identify.get(key, 0.0) + self.delay - loop.time()
+
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            self._last_identify[key] = loop.time()
+
+
+class GatewayRatelimiter:
+    """Keeps a single gateway connection under discords limit of ``limit`` commands every ``per`` seconds.
+
+    ``reserved`` commands of the window can only be used by urgent commands like heartbeats and identifies
+    so a flood of other commands can never starve them.
+    """
+
+    def __init__(self, limit: int = 120, per: float = 60.0, *, reserved: int = 5):
+        self.limit = limit
+        self.per = per
+        self.reserved = reserved
+        self._sent: deque[float] = deque()
+
+    def delay(self, *, urgent: bool = False) -> float:
+        """Returns how long to wait before the next command may be sent, ``0`` if it can be sent right away."""
+        now = time.monotonic()
+
+        while self._sent and now - self._sent[0] >= self.per:
+            self._sent.popleft()
+
+        limit = self.limit if urgent else self.limit - self.reserved
+
+        if len(self._sent) < limit:
+            return 0.0
+
+        return self._sent[len(self._sent) - limit] + self.per - now
+
+    def record(self):
+        self._sent.append(time.monotonic())
@@ -0,0 +1,455 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import Any, Callable, Dict, Iterable, Iterator, List, MutableMapping, Optional, Protocol, Tuple, Union
+
+from ..codec import JSONCodec, get_codec
+from .policies import CachePolicy
+
+__all__ = (
+    "StorageBackend",
+    "MemoryBackend",
+    "SQLiteBackend",
+)
+
+# Entities living in one guild are keyed by ``(guild_id, id)``, users and guilds by their id alone
+GUILD_ENTITIES = ("members", "channels", "roles")
+ENTITIES = ("users", "guilds", *GUILD_ENTITIES)
+
+Key = Union[int, Tuple[int, int]]
+
+
+def _check_entity(entity: str):
+    if entity not in ENTITIES:
+        raise ValueError(f"Unknown cache entity {entity!r}, has to be one of {ENTITIES}")
+
+
+class StorageBackend(Protocol):
+    """Where the :class:`Cache` keeps what it caches.
+
+    Backends store ``"users"`` and ``"guilds"`` by their id and ``"members"``, ``"channels"`` and ``"roles"``
+    by ``(guild_id, id)``. Backends with ``stores_models`` set hold the models themselves, the others get
+    plain payloads the cache turns back into models whenever something is read. Member payloads only hold
+    their users id when stored, those backends give them back with the whole stored user in ``"user"``.
+
+    Every method is called on the event loop and has to return quickly.
+    Subclassing this gets the default :meth:`put_many` and :meth:`close`.
+    """
+
+    stores_models: bool
+
+    def get(self, entity: str, key: Key) -> Optional[Any]:
+        ...
+
+    def put(self, entity: str, key: Key, value: Any) -> None:
+        ...
+
+    def put_many(self, entity: str, items: Iterable[Tuple[Key, Any]]) -> None:
+        """Stores a whole batch at once, like a member chunk. Backends that can do this cheaper should."""
+        for key, value in items:
+            self.put(entity, key, value)
+
+    def delete(self, entity: str, key: Key) -> Optional[Any]:
+        """Removes an entry, returning what was stored or ``None`` when there was nothing."""
+        ...
+
+    def keys(self, entity: str, *, guild_id: Optional[int] = None) -> Iterator[Key]:
+        """
+        Goes over the keys stored for an entity without loading anything, the keys of one guild are plain ids.
+        """
+        ...
+
+    def count(self, entity: str, *, guild_id: Optional[int] = None) -> int:
+        """How many entries are stored for an entity, or only in one guild."""
+        ...
+
+    def guild_ids(self, entity: str) -> Iterator[int]:
+        """The guilds that have any members, channels or roles stored."""
+        ...
+
+    def scan(self, entity: str, *, guild_id: Optional[int] = None, user_id: Optional[int] = None) -> Iterator[Any]:
+        """
+        Goes over everything stored for an entity.
+
+        Parameters
+        -----------
+        entity: :class:`str`
+            What to go over.
+        guild_id: Optional[:class:`int`]
+            Only what is in this guild, or this guild itself for ``"guilds"``.
+        user_id: Optional[:class:`int`]
+            Only this users members over every guild, or this user itself for ``"users"``.
+        """
+        ...
+
+    def clear(self, entity: str, *, guild_id: Optional[int] = None) -> None:
+        """Removes everything stored for an entity, or only what is in one guild."""
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryBackend(StorageBackend):
+    """Keeps models in dicts, which is what the cache uses unless it's given another backend.
+
+    Parameters
+    -----------
+    policies: Optional[Dict[:class:`str`, :class:`CachePolicy`]]
+        Policies for the stores, see :meth:`set_policy`.
+    """
+
+    stores_models = True
+
+    def __init__(self, policies: Optional[Dict[str, CachePolicy]] = None):
+        self.policies: Dict[str, CachePolicy] = {}
+
+        self.users: MutableMapping[int, Any] = {}
+        self.guilds: MutableMapping[int, Any] = {}
+        self.members: Dict[int, MutableMapping[int, Any]] = {}
+        self.channels: Dict[int, MutableMapping[int, Any]] = {}
+        self.roles: Dict[int, MutableMapping[int, Any]] = {}
+
+        # Called with a guilds id right before a policy evicts it, everything cached in it goes with it
+        self.on_guild_evict: Optional[Callable[[int], None]] = None
+
+        for entity, policy in (policies or {}).items():
+            self.set_policy(entity, policy)
+
+    def _new_store(self, entity: str) -> MutableMapping[Any, Any]:
+        policy = self.policies.get(entity)
+
+        if policy is None:
+            return {}
+
+        return policy.make_store(self._evict_guild if entity == "guilds" else None)
+
+    def _guild_store(self, entity: str, guild_id: int) -> MutableMapping[int, Any]:
+        stores: Dict[int, MutableMapping[int, Any]] = getattr(self, entity)
+        guild_store = stores.get(guild_id)
+
+        if guild_store is None:
+            guild_store = stores[guild_id] = self._new_store(entity)
+
+        return guild_store
+
+    def _evict_guild(self, guild_id: int, guild: Any):
+        if self.on_guild_evict is not None:
+            self.on_guild_evict(guild_id)
+
+        for entity in GUILD_ENTITIES:
+            self.clear(entity, guild_id=guild_id)
+
+    def set_policy(self, entity: str, policy: Optional[CachePolicy]) -> None:
+        """
+        Sets or clears the policy of a store, whatever is cached already is moved over and trimmed to fit.
+
+        Parameters
+        -----------
+        entity: :class:`str`
+            One of ``"users"``, ``"guilds"``, ``"members"``, ``"channels"`` or ``"roles"``.
+            Member, channel and role policies apply to each guild on its own.
+        policy: Optional[:class:`CachePolicy`]
+            The new policy, ``None`` goes back to keeping everything.
+        """
+        _check_entity(entity)
+
+        if policy is None:
+            self.policies.pop(entity, None)
+        else:
+            self.policies[entity] = policy
+
+        if entity not in GUILD_ENTITIES:
+            new = self._new_store(entity)
+            new.update(getattr(self, entity))
+            setattr(self, entity, new)
+            return
+
+        stores: Dict[int, MutableMapping[int, Any]] = getattr(self, entity)
+
+        for guild_id, old in list(stores.items()):
+            new = stores[guild_id] = self._new_store(entity)
+            new.update(old)
+
+    def get(self, entity: str, key: Key) -> Optional[Any]:
+        if entity in GUILD_ENTITIES:
+            guild_id, id = key  # type: ignore
+            store = getattr(self, entity).get(guild_id)
+            return None if store is None else store.get(id)
+
+        return getattr(self, entity).get(key)
+
+    def put(self, entity: str, key: Key, value: Any) -> None:
+        if entity in GUILD_ENTITIES:
+            guild_id, id = key  # type: ignore
+            self._guild_store(entity, guild_id)[id] = value
+        else:
+            getattr(self, entity)[key] = value
+
+    def delete(self, entity: str, key: Key) -> Optional[Any]:
+        if entity in GUILD_ENTITIES:
+            guild_id, id = key  # type: ignore
+            return getattr(self, entity).get(guild_id, {}).pop(id, None)
+
+        return getattr(self, entity).pop(key, None)
+
+    def keys(self, entity: str, *, guild_id: Optional[int] = None) -> Iterator[Key]:
+        _check_entity(entity)
+
+        if entity not in GUILD_ENTITIES:
+            yield from list(getattr(self, entity))
+        elif guild_id is not None:
+            yield from list(getattr(self, entity).get(guild_id, ()))
+        else:
+            for store_guild_id, store in list(getattr(self, entity).items()):
+                yield from ((store_guild_id, id) for id in list(store))
+
+    def count(self, entity: str, *, guild_id: Optional[int] = None) -> int:
+        _check_entity(entity)
+
+        if entity not in GUILD_ENTITIES:
+            return len(getattr(self, entity))
+
+        stores: Dict[int, MutableMapping[int, Any]] = getattr(self, entity)
+
+        if guild_id is not None:
+            return len(stores.get(guild_id, ()))
+
+        return sum(len(store) for store in stores.values())
+
+    def guild_ids(self, entity: str) -> Iterator[int]:
+        if entity not in GUILD_ENTITIES:
+            raise ValueError(f"Only {GUILD_ENTITIES} are stored per guild, not {entity!r}")
+
+        yield from [guild_id for guild_id, store in getattr(self, entity).items() if len(store)]
+
+    def scan(self, entity: str, *, guild_id: Optional[int] = None, user_id: Optional[int] = None) -> Iterator[Any]:
+        _check_entity(entity)
+
+        if entity in GUILD_ENTITIES:
+            stores = getattr(self, entity)
+            guild_stores = [stores.get(guild_id, {})] if guild_id is not None else list(stores.values())
+
+            for store in guild_stores:
+                if user_id is None:
+                    yield from list(store.values())
+                elif entity == "members":
+                    member = store.get(user_id)
+
+                    if member is not None:
+                        yield member
+
+            return
+
+        id = guild_id if entity == "guilds" else user_id
+        store = getattr(self, entity)
+
+        if id is None:
+            yield from list(store.values())
+        elif store.get(id) is not None:
+            yield store[id]
+
+    def clear(self, entity: str, *, guild_id: Optional[int] = None) -> None:
+        _check_entity(entity)
+
+        if guild_id is None:
+            getattr(self, entity).clear()
+        elif entity in GUILD_ENTITIES:
+            getattr(self, entity).pop(guild_id, None)
+        else:
+            self.delete(entity, guild_id)
+
+
+# The primary keys start with guild_id, so they are the guild_id index of every guild entity
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS guilds (id INTEGER PRIMARY KEY, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS members (
+    guild_id INTEGER NOT NULL, user_id INTEGER NOT NULL, data TEXT NOT NULL, PRIMARY KEY (guild_id, user_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS members_user_id ON members (user_id);
+CREATE TABLE IF NOT EXISTS channels (
+    guild_id INTEGER NOT NULL, id INTEGER NOT NULL, data TEXT NOT NULL, PRIMARY KEY (guild_id, id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS roles (
+    guild_id INTEGER NOT NULL, id INTEGER NOT NULL, data TEXT NOT NULL, PRIMARY KEY (guild_id, id)
+) WITHOUT ROWID;
+"""
+
+_KEY_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "users": ("id",),
+    "guilds": ("id",),
+    "members": ("guild_id", "user_id"),
+    "channels": ("guild_id", "id"),
+    "roles": ("guild_id", "id"),
+}
+
+# Which column the guild_id and user_id filters of `scan` go over for every entity
+_FILTER_COLUMNS: Dict[str, Dict[str, str]] = {
+    "users": {"user_id": "id"},
+    "guilds": {"guild_id": "id"},
+    "members": {"guild_id": "guild_id", "user_id": "user_id"},
+    "channels": {"guild_id": "guild_id"},
+    "roles": {"guild_id": "guild_id"},
+}
+
+
+# What reads select from, members are joined with their users so loading them doesn't take a query for every user
+_TABLES: Dict[str, str] = {entity: entity for entity in ENTITIES}
+_TABLES["members"] = "members LEFT JOIN users ON users.id = members.user_id"
+
+_COLUMNS: Dict[str, str] = {entity: f"{entity}.data" for entity in ENTITIES}
+_COLUMNS["members"] = "members.data, users.data"
+
+
+class SQLiteBackend(StorageBackend):
+    """Keeps payloads in an SQLite database instead of the Python heap, so huge member sets don't take up memory.
+
+    Members are indexed by guild and by user, so a guilds members or a users members over every guild
+    are index lookups, and members are read joined with their users in the same query.
+    Cache policies don't apply to this backend.
+
+    Queries block the event loop while they run, which is fine for ``":memory:"`` or a file on a local disk
+    where they take microseconds. Don't point it at a network filesystem, and keep in mind that ``guild.members``
+    of a huge guild decodes every member it returns.
+
+    Parameters
+    -----------
+    path: :class:`str`
+        The database file, ``":memory:"`` keeps it in memory outside of Python objects.
+    codec: Optional[:class:`JSONCodec`]
+        What payloads get encoded with, defaults to :func:`get_codec`.
+    """
+
+    stores_models = False
+
+    def __init__(self, path: str = ":memory:", *, codec: Optional[JSONCodec] = None):
+        self.path = path
+        self.codec = codec or get_codec()
+
+        # Autocommit, every write is its own transaction unless it's a batch
+        self._db = sqlite3.connect(path, isolation_level=None)
+
+        if path != ":memory:":
+            # WAL with NORMAL only syncs on checkpoints, a cache can afford losing its last writes on a crash
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+
+        self._db.executescript(_SCHEMA)
+
+        self._get_sql: Dict[str, str] = {}
+        self._put_sql: Dict[str, str] = {}
+        self._delete_sql: Dict[str, str] = {}
+
+        for entity, columns in _KEY_COLUMNS.items():
+            where = " AND ".join(f"{entity}.{column} = ?" for column in columns)
+            names = ", ".join(columns)
+            placeholders = ", ".join("?" * len(columns))
+
+            self._get_sql[entity] = f"SELECT {_COLUMNS[entity]} FROM {_TABLES[entity]} WHERE {where}"
+            self._delete_sql[entity] = f"DELETE FROM {entity} WHERE {where}"
+            self._put_sql[entity] = f"INSERT OR REPLACE INTO {entity} ({names}, data) VALUES ({placeholders}, ?)"
+
+    def _key(self, entity: str, key: Key) -> Tuple[int, ...]:
+        _check_entity(entity)
+        return tuple(key) if entity in GUILD_ENTITIES else (key,)  # type: ignore
+
+    def get(self, entity: str, key: Key) -> Optional[Any]:
+        row = self._db.execute(self._get_sql[entity], self._key(entity, key)).fetchone()
+        return None if row is None else self._load(row)
+
+    def put(self, entity: str, key: Key, value: Any) -> None:
+        self._db.execute(self._put_sql[entity], (*self._key(entity, key), self.codec.dumps(value)))
+
+    def put_many(self, entity: str, items: Iterable[Tuple[Key, Any]]) -> None:
+        rows: List[Tuple[Any, ...]] = [(*self._key(entity, key), self.codec.dumps(value)) for key, value in items]
+
+        # One transaction for the whole batch instead of one per row
+        with self._db:
+            self._db.execute("BEGIN")
+            self._db.executemany(self._put_sql[entity], rows)
+
+    def delete(self, entity: str, key: Key) -> Optional[Any]:
+        params = self._key(entity, key)
+        row = self._db.execute(self._get_sql[entity], params).fetchone()
+
+        if row is None:
+            return None
+
+        self._db.execute(self._delete_sql[entity], params)
+        return self._load(row)
+
+    def _load(self, row: Tuple[Any, ...]) -> Any:
+        data = self.codec.loads(row[0])
+
+        # Members come with their user joined in, when the user is stored
+        if len(row) > 1 and row[1] is not None:
+            data["user"] = self.codec.loads(row[1])
+
+        return data
+
+    def keys(self, entity: str, *, guild_id: Optional[int] = None) -> Iterator[Key]:
+        _check_entity(entity)
+
+        columns = _KEY_COLUMNS[entity]
+
+        if entity in GUILD_ENTITIES and guild_id is None:
+            yield from self._db.execute(f"SELECT {', '.join(columns)} FROM {entity}").fetchall()
+            return
+
+        if entity in GUILD_ENTITIES:
+            rows = self._db.execute(f"SELECT {columns[1]} FROM {entity} WHERE guild_id = ?", (guild_id,)).fetchall()
+        else:
+            rows = self._db.execute(f"SELECT {columns[0]} FROM {entity}").fetchall()
+
+        yield from (id for (id,) in rows)
+
+    def count(self, entity: str, *, guild_id: Optional[int] = None) -> int:
+        _check_entity(entity)
+
+        # Counting one guilds rows only goes over its part of the primary key
+        if entity in GUILD_ENTITIES and guild_id is not None:
+            return self._db.execute(f"SELECT COUNT(*) FROM {entity} WHERE guild_id = ?", (guild_id,)).fetchone()[0]
+
+        return self._db.execute(f"SELECT COUNT(*) FROM {entity}").fetchone()[0]
+
+    def guild_ids(self, entity: str) -> Iterator[int]:
+        if entity not in GUILD_ENTITIES:
+            raise ValueError(f"Only {GUILD_ENTITIES} are stored per guild, not {entity!r}")
+
+        yield from (guild_id for (guild_id,) in self._db.execute(f"SELECT DISTINCT guild_id FROM {entity}").fetchall())
+
+    def scan(self, entity: str, *, guild_id: Optional[int] = None, user_id: Optional[int] = None) -> Iterator[Any]:
+        _check_entity(entity)
+
+        conditions: List[str] = []
+        params: List[int] = []
+
+        for name, value in (("guild_id", guild_id), ("user_id", user_id)):
+            if value is None:
+                continue
+
+            column = _FILTER_COLUMNS[entity].get(name)
+
+            if column is None:
+                raise ValueError(f"{entity} can't be filtered by {name}")
+
+            conditions.append(f"{entity}.{column} = ?")
+            params.append(value)
+
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        # Fetched up front, callers are free to write to the database while going over the results
+        for row in self._db.execute(f"SELECT {_COLUMNS[entity]} FROM {_TABLES[entity]}{where}", params).fetchall():
+            yield self._load(row)
+
+    def clear(self, entity: str, *, guild_id: Optional[int] = None) -> None:
+        _check_entity(entity)
+
+        if guild_id is None:
+            self._db.execute(f"DELETE FROM {entity}")
+        else:
+            self._db.execute(f"DELETE FROM {entity} WHERE {_FILTER_COLUMNS[entity]['guild_id']} = ?", (guild_id,))
+
+    def close(self) -> None:
+        self._db.close()
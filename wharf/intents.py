@@ -12,6 +12,7 @@ __all__ = (
     "flag",
     "FlagMeta",
     "Flag",
+    "Intents",
 )
 
 
@@ -82,11 +83,14 @@ class Flag(metaclass=FlagMeta):
         self.value = type(self).default_value
 
         for flag_name, enabled in kwds.items():
-            if hasattr(self, flag_name) and flag_name in self.__members__:
-                self.set(self.__members__[flag_name].value, enabled)
-            else:
+            # Members are upper case, keyword arguments are usually written in lower case
+            member = self.__members__.get(flag_name) or self.__members__.get(flag_name.upper())
+
+            if member is None:
                 raise ValueError(f"Invalid flag member {flag_name}!")
 
+            self.set(member.value, enabled)
+
     def set(self, value: int, toggle: bool):
         if toggle:
             self.value |= value
@@ -123,6 +127,9 @@ class Flag(metaclass=FlagMeta):
 
 
 class Intents(Flag):
+    # Set by `Intents.auto`, the bot adds whatever its listeners need once it connects
+    automatic: bool = False
+
     if t.TYPE_CHECKING:
 
         def __init__(
@@ -233,3 +240,128 @@ class Intents(Flag):
         self.GUILD_PRESENCES = False
         self.MESSAGE_CONTENT = False
         return self
+
+    @classmethod
+    def auto(cls: type[Self], **kwds: bool) -> Self:
+        """Intents worked out from the events the bot listens to once it connects, same as ``Bot(intents="auto")``.
+
+        Keyword arguments turn intents on no matter what, like ``message_content=True`` which listeners
+        can't be checked for.
+        """
+        self = cls(**kwds)
+        self.automatic = True
+        return self
+
+    @classmethod
+    def for_events(cls: type[Self], events: t.Iterable[str]) -> Self:
+        """The smallest intents that get every one of these events, from guilds and DMs alike."""
+        value = EVENT_INTENTS["guild_create"]
+
+        for event in events:
+            value |= _required_intents(event)
+
+        return cls.from_value(value)
+
+    def covers(self, event: str) -> bool:
+        """Whether any of the intents an event can come in through are enabled."""
+        required = _required_intents(event)
+
+        return not required or bool(self.value & required)
+
+    @classmethod
+    def required_for(cls: type[Self], event: str) -> Self:
+        return cls.from_value(_required_intents(event))
+
+
+def _required_intents(event: str) -> int:
+    if event.startswith("raw_"):
+        event = event[4:]
+
+    return EVENT_INTENTS.get(event, 0)
+
+
+def _events(intents: int, *events: str) -> dict[str, int]:
+    return dict.fromkeys(events, intents)
+
+
+# Which intents make discord send an event, events sent for guilds and DMs need both.
+# Events that aren't in here, like "ready", always get sent.
+EVENT_INTENTS: dict[str, int] = {
+    **_events(
+        Intents.GUILDS,
+        "guild_create",
+        "guild_update",
+        "guild_delete",
+        "guild_role_create",
+        "guild_role_update",
+        "guild_role_delete",
+        "channel_create",
+        "channel_update",
+        "channel_delete",
+        "thread_create",
+        "thread_update",
+        "thread_delete",
+        "thread_list_sync",
+        "thread_member_update",
+        "stage_instance_create",
+        "stage_instance_update",
+        "stage_instance_delete",
+    ),
+    **_events(
+        Intents.GUILD_MEMBERS,
+        "guild_member_add",
+        "guild_member_update",
+        "guild_member_remove",
+        "guild_members_chunk",
+        "thread_members_update",
+    ),
+    **_events(
+        Intents.GUILD_BANS,
+        "guild_ban_add",
+        "guild_ban_remove",
+        "guild_audit_log_entry_create",
+    ),
+    **_events(Intents.GUILD_EMOJIS_AND_STICKERS, "guild_emojis_update", "guild_stickers_update"),
+    **_events(
+        Intents.GUILD_INTEGRATIONS,
+        "guild_integrations_update",
+        "integration_create",
+        "integration_update",
+        "integration_delete",
+    ),
+    **_events(Intents.GUILD_WEBHOOKS, "webhooks_update"),
+    **_events(Intents.GUILD_INVITES, "invite_create", "invite_delete"),
+    **_events(Intents.GUILD_VOICE_STATES, "voice_state_update"),
+    **_events(Intents.GUILD_PRESENCES, "presence_update"),
+    **_events(Intents.GUILD_MESSAGES, "message_delete_bulk"),
+    **_events(
+        Intents.GUILD_MESSAGES | Intents.DIRECT_MESSAGES,
+        "message_create",
+        "message_update",
+        "message_delete",
+    ),
+    **_events(Intents.GUILDS | Intents.DIRECT_MESSAGES, "channel_pins_update"),
+    **_events(
+        Intents.GUILD_MESSAGE_REACTIONS | Intents.DIRECT_MESSAGE_REACTIONS,
+        "message_reaction_add",
+        "message_reaction_remove",
+        "message_reaction_remove_all",
+        "message_reaction_remove_emoji",
+    ),
+    **_events(Intents.GUILD_MESSAGE_TYPING | Intents.DIRECT_MESSAGE_TYPING, "typing_start"),
+    **_events(
+        Intents.GUILD_SCHEDULED_EVENTS,
+        "guild_scheduled_event_create",
+        "guild_scheduled_event_update",
+        "guild_scheduled_event_delete",
+        "guild_scheduled_event_user_add",
+        "guild_scheduled_event_user_remove",
+    ),
+    **_events(
+        Intents.AUTO_MODERATION_CONFIGURATION,
+        "auto_moderation_rule_create",
+        "auto_moderation_rule_update",
+        "auto_moderation_rule_delete",
+    ),
+    **_events(Intents.AUTO_MODERATION_EXECUTION, "auto_moderation_action_execution"),
+}
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 from collections import defaultdict
-from typing import TYPE_CHECKING, Any, Callable, Coroutine, Dict, List, Optional, TypeVar
+from typing import TYPE_CHECKING, Any, Callable, Coroutine, Dict, List, Optional, Tuple, TypeVar, Union
 
 from .errors import BotNotAvailable
+from .filters import ListenerFilter, Snowflakes
 
 if TYPE_CHECKING:
     from .bot import Bot
@@ -19,6 +20,8 @@ class Plugin:
         self.description = description
 
         self._listeners: Dict[str, List[CoroFunc]] = defaultdict(list)
+        self._filters: Dict[CoroFunc, ListenerFilter] = {}
+        self._executors: Dict[CoroFunc, str] = {}
 
         self._bot: Optional[Bot] = None
 
@@ -33,10 +36,30 @@ class Plugin:
     def bot(self, bot: Bot):
         self._bot = bot
 
-    def listen(self, event_name: str):
+    def listen(
+        self,
+        event_name: str,
+        *,
+        guild_id: Optional[Snowflakes] = None,
+        channel_id: Optional[Snowflakes] = None,
+        author_bot: Optional[bool] = None,
+        prefix: Optional[Union[str, Tuple[str, ...]]] = None,
+        check: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        executor: Optional[str] = None,
+    ):
+        listener_filter = ListenerFilter.from_options(
+            guild_id=guild_id, channel_id=channel_id, author_bot=author_bot, prefix=prefix, check=check
+        )
+
         def inner(func: CoroFunc):
             self._listeners[event_name].append(func)
 
+            if listener_filter is not None:
+                self._filters[func] = listener_filter
+
+            if executor is not None:
+                self._executors[func] = executor
+
             return func
 
         return inner
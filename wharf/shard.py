@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import aiohttp
+
+from .enums import ShardStatus
+from .errors import GatewayReconnect, WebsocketClosed
+from .etf import ETFCodec
+from .gateway import Gateway
+from .impl.ratelimit import IdentifyLimiter, IdentifyRatelimiter
+
+if TYPE_CHECKING:
+    from .bot import Bot
+
+__all__ = ("ShardManager",)
+
+_log = logging.getLogger(__name__)
+
+# A connection that stayed up this long was healthy, the next reconnect doesn't wait
+HEALTHY_CONNECTION = 30.0
+
+# Errors a shard gets over by reconnecting
+RETRYABLE_ERRORS = (OSError, asyncio.TimeoutError, aiohttp.ClientError)
+
+
+class _Backoff:
+    """Exponential backoff with jitter, so shards that lost their connection together don't retry together."""
+
+    def __init__(self, base: float = 1.0, maximum: float = 60.0):
+        self.base = base
+        self.maximum = maximum
+        self.attempts = 0
+
+    def delay(self) -> float:
+        delay = min(self.maximum, self.base * 2**self.attempts)
+        self.attempts += 1
+
+        # Never less than half of it, so a failing shard can't spin
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def reset(self):
+        self.attempts = 0
+
+
+class ShardManager:
+    """Runs every shard the bot owns on one event loop against the bots shared cache and dispatcher.
+
+    Parameters
+    -----------
+    bot: :class:`wharf.Bot`
+        The bot these shards belong to.
+    shard_ids: Optional[List[:class:`int`]]
+        The shards this manager should run. Defaults to every shard.
+    shard_count: Optional[:class:`int`]
+        The total amount of shards. Defaults to the amount discord recommends.
+    compress: Optional[:class:`str`]
+        The transport compression every shard should use, ``"zlib-stream"``, ``"zstd-stream"`` or ``None`` to turn it off.
+        Defaults to ``"auto"`` which picks zstd-stream when zstandard is installed.
+    encoding: :class:`str`
+        The payload encoding every shard should use, either ``"json"`` or ``"etf"``. ``"etf"`` needs earl-etf.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        *,
+        shard_ids: Optional[List[int]] = None,
+        shard_count: Optional[int] = None,
+        identify_ratelimiter: Optional[IdentifyLimiter] = None,
+        compress: Optional[str] = "auto",
+        encoding: str = "json",
+    ):
+        self.bot = bot
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self.identify_ratelimiter = identify_ratelimiter
+        self.compress = compress
+        self.encoding = encoding
+
+        if encoding == "etf":
+            # Fails right away instead of once the shards start when earl-etf isn't installed
+            ETFCodec()
+
+        self.shards: Dict[int, Gateway] = {}
+        self.running = False
+
+        # How long shards wait between reconnects that come right after each other
+        self.reconnect_delay = 1.0
+        self.max_reconnect_delay = 60.0
+
+    async def _run_shard(self, gateway: Gateway, url: str) -> Optional[BaseException]:
+        """Keeps one shard connected until the manager closes, returns the error that stopped it for good."""
+        gateway_url: Optional[str] = url
+        backoff = _Backoff(self.reconnect_delay, self.max_reconnect_delay)
+        loop = asyncio.get_running_loop()
+
+        while self.running:
+            started = loop.time()
+
+            try:
+                await gateway.connect(gateway_url)
+            except GatewayReconnect as gr:
+                gateway_url = gr.url if gateway.resume else url
+            except WebsocketClosed as exc:
+                _log.error("Shard %d was closed with fatal code %d (%s), stopping it", gateway.shard_id, exc.code, exc.msg)
+                return self._stop_shard(gateway, exc)
+            except RETRYABLE_ERRORS as exc:
+                _log.warning("Shard %d lost its connection: %r", gateway.shard_id, exc)
+
+                # The session is still around on discords end, it can be resumed
+                gateway.resume = gateway.session_id is not None
+                gateway_url = gateway.resume_url if gateway.resume and gateway.resume_url else url
+            except Exception as exc:
+                _log.exception("Shard %d stopped because of an unexpected error", gateway.shard_id)
+                return self._stop_shard(gateway, exc)
+            else:
+                # The connection dropped, the gateway already figured out if the session can be resumed
+                gateway_url = gateway.resume_url if gateway.resume and gateway.resume_url else url
+
+            if not self.running:
+                break
+
+            if loop.time() - started >= HEALTHY_CONNECTION:
+                backoff.reset()
+                _log.info("Reconnecting shard %d", gateway.shard_id)
+                continue
+
+            delay = backoff.delay()
+            _log.info("Reconnecting shard %d in %.2f seconds", gateway.shard_id, delay)
+            await asyncio.sleep(delay)
+
+        return None
+
+    def _stop_shard(self, gateway: Gateway, error: BaseException) -> BaseException:
+        gateway.status = ShardStatus.failed
+
+        # The other shards can still get ready without it, unless it was the last one
+        if any(shard.status is not ShardStatus.failed for shard in self.shards.values()):
+            self.bot.dispatcher._shard_settled(gateway.shard_id)
+
+        return error
+
+    async def start(self):
+        data = await self.bot.http.get_gateway_bot()
+
+        if self.shard_count is None:
+            self.shard_count = int(data["shards"])
+
+        if self.shard_ids is None:
+            self.shard_ids = list(range(self.shard_count))
+
+        if self.identify_ratelimiter is None:
+            self.identify_ratelimiter = IdentifyRatelimiter(data["session_start_limit"]["max_concurrency"])
+
+        for shard_id in self.shard_ids:
+            self.shards[shard_id] = Gateway(
+                self.bot.dispatcher,
+                self.bot.cache,
+                shard_id=shard_id,
+                shard_count=self.shard_count,
+                identify_ratelimiter=self.identify_ratelimiter,
+                compress=self.compress,
+                encoding=self.encoding,
+            )
+
+        self.bot.dispatcher._unready_shards = set(self.shard_ids)
+        self.running = True
+
+        _log.info("Launching shards %s out of %d", self.shard_ids, self.shard_count)
+
+        # Shards handle their own errors, one stopping leaves the others running
+        results = await asyncio.gather(*(self._run_shard(gateway, data["url"]) for gateway in self.shards.values()))
+        errors = [error for error in results if error is not None]
+
+        if self.running and errors and len(errors) == len(results):
+            # Nothing is left running, most likely a bad token or intents, so it's worth raising
+            raise errors[0]
+
+    async def close(self):
+        self.running = False
+
+        for gateway in self.shards.values():
+            await gateway.close(code=1000, resume=False)
+
+    def get_shard(self, shard_id: int) -> Optional[Gateway]:
+        return self.shards.get(shard_id)
+
+    def shard_for_guild(self, guild_id: int) -> Optional[Gateway]:
+        if self.shard_count is None:
+            return None
+
+        return self.shards.get((guild_id >> 22) % self.shard_count)
+
+    @property
+    def latencies(self) -> Dict[int, Optional[float]]:
+        """A mapping of shard ids to their latest heartbeat latency."""
+        return {shard_id: gateway.latency for shard_id, gateway in self.shards.items()}
+
+    @property
+    def average_latencies(self) -> Dict[int, Optional[float]]:
+        """A mapping of shard ids to their average heartbeat latency."""
+        return {shard_id: gateway.average_latency for shard_id, gateway in self.shards.items()}
+
+    @property
+    def statuses(self) -> Dict[int, ShardStatus]:
+        """A mapping of shard ids to the state their connection is in."""
+        return {shard_id: gateway.status for shard_id, gateway in self.shards.items()}
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+__all__ = ("DispatcherStats",)
+
+# Upper bounds in seconds, the last bucket catches everything slower
+HISTOGRAM_BUCKETS: Tuple[float, ...] = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Timings:
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets: List[int] = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+
+    def record(self, elapsed: float):
+        self.count += 1
+        self.total += elapsed
+
+        if elapsed > self.max:
+            self.max = elapsed
+
+        self.buckets[bisect_left(HISTOGRAM_BUCKETS, elapsed)] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        histogram = {str(bound): count for bound, count in zip(HISTOGRAM_BUCKETS, self.buckets)}
+        histogram["+Inf"] = self.buckets[-1]
+
+        return {
+            "count": self.count,
+            "total": self.total,
+            "average": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "histogram": histogram,
+        }
+
+
+class _CallbackStats:
+    __slots__ = ("timings", "exceptions", "in_flight")
+
+    def __init__(self):
+        self.timings = _Timings()
+        self.exceptions = 0
+        self.in_flight = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"exceptions": self.exceptions, "in_flight": self.in_flight, **self.timings.snapshot()}
+
+
+class _EventStats:
+    __slots__ = ("received", "parse", "callbacks")
+
+    def __init__(self):
+        self.received = 0
+        self.parse = _Timings()
+        # Keyed by the callback itself, listeners that share a name still get their own stats
+        self.callbacks: Dict[Any, _CallbackStats] = defaultdict(_CallbackStats)
+
+    def snapshot(self) -> Dict[str, Any]:
+        callbacks: Dict[str, Any] = {}
+
+        for callback, stats in self.callbacks.items():
+            name = base = _callback_name(callback)
+            count = 1
+
+            while name in callbacks:
+                count += 1
+                name = f"{base}#{count}"
+
+            callbacks[name] = stats.snapshot()
+
+        return {
+            "received": self.received,
+            "parse": self.parse.snapshot(),
+            "callbacks": callbacks,
+        }
+
+
+def _callback_name(callback: Any) -> str:
+    qualname = getattr(callback, "__qualname__", None)
+
+    if qualname is None:
+        return repr(callback)
+
+    module = getattr(callback, "__module__", None)
+    return f"{module}.{qualname}" if module else qualname
+
+
+class DispatcherStats:
+    """Counters and timing histograms the dispatcher keeps per event when stats are turned on.
+
+    Times are in seconds and measured with :func:`time.perf_counter`.
+    """
+
+    def __init__(self):
+        self.events: Dict[str, _EventStats] = defaultdict(_EventStats)
+
+    def received(self, event_name: str):
+        self.events[event_name].received += 1
+
+    def parsed(self, event_name: str, elapsed: float):
+        self.events[event_name].parse.record(elapsed)
+
+    def callback(self, event_name: str, callback: Any) -> _CallbackStats:
+        return self.events[event_name].callbacks[callback]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns a copy of every stat as plain dicts, safe to serialize or hand to a metrics exporter."""
+        return {name: stats.snapshot() for name, stats in self.events.items()}
+
+    def reset(self):
+        self.events.clear()